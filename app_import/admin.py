@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Edital, ImportedData
+from .models import Edital, EditalSchema, ImportedData, ImportJob
 
 @admin.register(Edital)
 class EditalAdmin(admin.ModelAdmin):
@@ -12,7 +12,9 @@ class EditalAdmin(admin.ModelAdmin):
         'uploaded_by', 
         'uploaded_at', 
         'last_modified_by', 
-        'last_modified_at'
+        'last_modified_at',
+        'total_linhas',
+        'tamanho_bytes',
     )
     
     # Filtros que aparecerão na barra lateral direita
@@ -27,7 +29,12 @@ class EditalAdmin(admin.ModelAdmin):
         'uploaded_by', 
         'uploaded_at', 
         'last_modified_by', 
-        'last_modified_at'
+        'last_modified_at',
+        # Resumo da importação, mantido pela importação (ou pelo comando atualizar_resumo_editais)
+        'total_linhas',
+        'total_colunas',
+        'tamanho_bytes',
+        'duracao_importacao',
     )
 
     def get_queryset(self, request):
@@ -42,6 +49,8 @@ class ImportedDataAdmin(admin.ModelAdmin):
     """
     list_display = ('id', 'edital', 'get_data_preview')
     list_filter = ('edital',)
+    # O esquema do edital é necessário para ler as linhas no formato compacto
+    list_select_related = ('edital', 'edital__schema')
     search_fields = ('edital__numero_ano',)
     
     # Torna os campos de dados somente leitura
@@ -51,8 +60,58 @@ class ImportedDataAdmin(admin.ModelAdmin):
         """
         Retorna uma prévia dos dados JSON para facilitar a visualização na lista.
         """
-        if isinstance(obj.dados_linha, dict):
-            preview = str(list(obj.dados_linha.items())[:3])
+        dados = obj.dados
+        if isinstance(dados, dict):
+            preview = str(list(dados.items())[:3])
             return (preview[:100] + '...') if len(preview) > 100 else preview
         return "Dados inválidos"
-    get_data_preview.short_description = 'Prévia dos Dados da Linha'
\ No newline at end of file
+    get_data_preview.short_description = 'Prévia dos Dados da Linha'
+
+@admin.register(EditalSchema)
+class EditalSchemaAdmin(admin.ModelAdmin):
+    """
+    Configurações para o modelo EditalSchema no painel de administração.
+    O esquema é gerado pela importação, por isso todos os campos são somente leitura.
+    """
+    list_display = ('edital', 'total_linhas', 'atualizado_em')
+    search_fields = ('edital__numero_ano',)
+    readonly_fields = (
+        'edital',
+        'colunas',
+        'campos_texto',
+        'campos_dropdown',
+        'campos_polo',
+        'valores_campos',
+        'cidades_polo',
+        'valores_polo_origem',
+        'total_linhas',
+        'atualizado_em'
+    )
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """
+    Configurações para o modelo ImportJob no painel de administração.
+    Permite acompanhar a fila de importações em segundo plano.
+    """
+    list_display = ('__str__', 'tipo', 'numero_ano', 'status', 'linhas_gravadas', 'criado_por', 'criado_em', 'concluido_em')
+    list_filter = ('status', 'tipo', 'criado_em')
+    search_fields = ('numero_ano', 'nome_arquivo', 'criado_por__username')
+    readonly_fields = (
+        'criado_por',
+        'criado_em',
+        'iniciado_em',
+        'concluido_em',
+        'linhas_lidas',
+        'linhas_gravadas',
+        'batimento_em',
+        'tentativas',
+        'edital',
+        'acao',
+        'mensagens',
+        'erro'
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('criado_por', 'edital')
@@ -0,0 +1,128 @@
+"""
+API de leitura dos inscritos de um edital, em JSON.
+
+`GET /api/editais/<id>/inscritos/` aceita os mesmos filtros da página de
+detalhes (filtro_*, texto_*, cidade_polo e polo_origem), mais:
+
+- `fields=Nome,CPF`: devolve só essas colunas, extraídas de `dados_linha` no
+  próprio SQL;
+- `apos=<id>` / `antes=<id>` e `limite=<n>`: paginação por cursor, com os
+  links da página seguinte e da anterior na resposta.
+
+A resposta traz um ETag calculado a partir de `Edital.last_modified_at` e dos
+parâmetros; com `If-None-Match`, um edital que não mudou devolve 304 sem
+consultar os inscritos. As consultas vão para a réplica, como nas páginas
+de leitura (ver app_import_django/replicas.py).
+"""
+import hashlib
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_GET
+
+from app_import_django.replicas import usar_replica
+
+from .filtros import aplicar_filtros, possui_filtros, valor_campo
+from .models import Edital, ImportedData
+from .paginacao import (
+    PARAMETRO_ANTES, PARAMETRO_APOS, TAMANHO_PAGINA, contar_com_cache, ler_cursor, paginar_por_cursor,
+)
+from .schema import obter_schema
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_LIMITE = 'limite'
+
+LIMITE_MAXIMO = 1000
+
+
+def etag_inscritos(request, edital_id):
+    ultima_modificacao = Edital.objects.filter(pk=edital_id).values_list('last_modified_at', flat=True).first()
+    if ultima_modificacao is None:
+        return None
+    parametros = sorted(request.GET.lists())
+    conteudo = f"{edital_id}:{ultima_modificacao.timestamp()}:{parametros!r}"
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def ler_limite(valor):
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        return TAMANHO_PAGINA
+    return min(max(limite, 1), LIMITE_MAXIMO)
+
+
+def url_pagina(request, parametro, cursor):
+    parametros = request.GET.copy()
+    parametros.pop(PARAMETRO_APOS, None)
+    parametros.pop(PARAMETRO_ANTES, None)
+    parametros[parametro] = cursor
+    return request.build_absolute_uri(f"{request.path}?{parametros.urlencode()}")
+
+
+def erro(mensagem, status):
+    return JsonResponse({'erro': mensagem}, status=status)
+
+
+@require_GET
+def api_inscritos(request, edital_id):
+    # Mesmo controle de acesso das páginas, mas sem redirecionar para o login
+    if not request.user.is_authenticated:
+        return erro("Autenticação necessária.", 401)
+    return _inscritos(request, edital_id)
+
+
+# Abaixo da verificação de login, para a sessão e o usuário continuarem vindo do primário;
+# acima do `condition`, para o ETag também ser calculado na réplica
+@usar_replica
+@condition(etag_func=etag_inscritos)
+def _inscritos(request, edital_id):
+    edital = get_object_or_404(Edital, pk=edital_id)
+    schema = obter_schema(edital)
+
+    campos = [campo.strip() for campo in request.GET.get(PARAMETRO_CAMPOS, '').split(',') if campo.strip()]
+    desconhecidos = [campo for campo in campos if campo not in schema.colunas]
+    if desconhecidos:
+        return erro(f"Campos inexistentes neste edital: {', '.join(desconhecidos)}.", 400)
+
+    inscritos = aplicar_filtros(ImportedData.objects.filter(edital=edital), request.GET, schema)
+    if campos:
+        # Cada coluna vira uma expressão dados_linha ->> 'campo'; o resto do JSON não sai do banco
+        projecao = {f'campo_{indice}': valor_campo(campo, schema) for indice, campo in enumerate(campos)}
+        inscritos = inscritos.values('id', **projecao)
+    else:
+        inscritos = inscritos.values('id', 'dados_linha')
+
+    pagina = paginar_por_cursor(
+        inscritos,
+        apos=ler_cursor(request.GET.get(PARAMETRO_APOS)),
+        antes=ler_cursor(request.GET.get(PARAMETRO_ANTES)),
+        tamanho=ler_limite(request.GET.get(PARAMETRO_LIMITE)),
+    )
+
+    if campos:
+        resultados = [
+            {'id': item['id'], 'dados': {campo: item[f'campo_{indice}'] for indice, campo in enumerate(campos)}}
+            for item in pagina
+        ]
+    else:
+        resultados = [{'id': item['id'], 'dados': schema.como_dict(item['dados_linha'])} for item in pagina]
+
+    if possui_filtros(request.GET):
+        total = contar_com_cache(edital, inscritos, request.GET)
+    else:
+        total = schema.total_linhas
+
+    return JsonResponse({
+        'edital': {
+            'id': edital.pk,
+            'tipo': edital.tipo,
+            'numero_ano': edital.numero_ano,
+            'ultima_modificacao': edital.last_modified_at.isoformat(),
+        },
+        'total': total,
+        'campos': campos or schema.colunas,
+        'inscritos': resultados,
+        'proxima': url_pagina(request, PARAMETRO_APOS, pagina.cursor_proximo) if pagina.has_next else None,
+        'anterior': url_pagina(request, PARAMETRO_ANTES, pagina.cursor_anterior) if pagina.has_previous else None,
+    }, json_dumps_params={'ensure_ascii': False})
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AppImportConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_import'
+
+    def ready(self):
+        from django.db.models.signals import pre_delete
+        from .models import Edital
+        from .particoes import remover_particao_do_edital
+
+        # Apagar um edital remove a partição dos seus inscritos, em vez de apagá-los linha a linha
+        pre_delete.connect(remover_particao_do_edital, sender=Edital, dispatch_uid="remover_particao_do_edital")
@@ -0,0 +1,151 @@
+"""
+Valores normalizados para os filtros de texto (nome, CPF, RG...).
+
+Na importação, cada campo de dados pessoais é gravado em `BuscaTexto` já sem
+acentos, em minúsculas e, para documentos, só com letras e números. A busca
+`texto_*` vira então um LIKE '%termo%' sobre essa tabela, atendido pelo
+índice de trigramas, em vez de normalizar o valor de cada linha a cada
+requisição.
+
+A mesma tabela responde à busca global (`buscar_em_todos_editais`): em quais
+editais aparece um CPF ou um nome, numa única consulta sobre todos os editais.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q, TextField, Value
+from django.db.models.functions import Left
+
+from .filtros import (
+    CAMPOS_DOCUMENTO, condicao_preenchida, eh_campo_documento, expressao_normalizada, normalizar_busca,
+    valor_campo,
+)
+from .models import TAMANHO_PREFIXO_BUSCA, BuscaTexto, ImportedData
+from .particoes import consultar_tabela
+from .schema import CAMPO_TEXTO, classificar_campo
+
+# Busca global: por documento (prefixo do número, só letras e dígitos) ou por nome (trecho do nome)
+TIPO_BUSCA_DOCUMENTO = 'documento'
+TIPO_BUSCA_NOME = 'nome'
+
+CAMPOS_NOME = ['nome']
+
+TAMANHO_MINIMO_TERMO = 3
+
+LIMITE_RESULTADOS_GLOBAIS = 200
+
+
+def campos_de_busca(colunas):
+    return [campo for campo in colunas if classificar_campo(campo) == CAMPO_TEXTO]
+
+
+def indexar_busca(schema, ids=None, tabela=None):
+    """
+    Grava em `BuscaTexto` os valores normalizados dos campos de texto do
+    edital, com um INSERT ... SELECT por campo (os dados não passam pelo
+    Python), e registra no esquema quais campos foram indexados.
+
+    Com `ids` (lista ou subconsulta de ids de `ImportedData`), apenas essas
+    linhas são reindexadas, desde que os campos de texto não tenham mudado.
+
+    Com `tabela`, as linhas são lidas dela em vez da tabela de `ImportedData`
+    (a tabela nova de uma substituição, antes da troca de partição).
+    """
+    edital = schema.edital
+    campos = campos_de_busca(schema.colunas)
+    if set(campos) != set(schema.campos_busca or []):
+        ids = None
+
+    inscritos = ImportedData.objects.filter(edital=edital)
+    buscas = BuscaTexto.objects.filter(edital=edital)
+    if ids is not None:
+        inscritos = inscritos.filter(pk__in=ids)
+        buscas = buscas.filter(inscrito_id__in=ids)
+
+    quote_name = connection.ops.quote_name
+    insert = "INSERT INTO {tabela} ({inscrito}, {edital}, {campo}, {valor}) ".format(
+        tabela=quote_name(BuscaTexto._meta.db_table),
+        inscrito=quote_name(BuscaTexto._meta.get_field('inscrito').column),
+        edital=quote_name(BuscaTexto._meta.get_field('edital').column),
+        campo=quote_name(BuscaTexto._meta.get_field('campo').column),
+        valor=quote_name(BuscaTexto._meta.get_field('valor').column),
+    )
+
+    # As consultas são montadas antes de apagar os valores antigos: num banco sem suporte
+    # à normalização (NotSupportedError), o índice do edital fica como estava.
+    consultas = []
+    for campo in campos:
+        expressao = valor_campo(campo, schema)
+        linhas = (
+            inscritos
+            .filter(condicao_preenchida(expressao))
+            .values_list(
+                'id',
+                'edital_id',
+                Value(campo, output_field=TextField()),
+                expressao_normalizada(expressao, eh_campo_documento(campo)),
+            )
+        )
+        if tabela is not None:
+            linhas = consultar_tabela(linhas, tabela)
+        consultas.append(linhas.query.sql_with_params())
+
+    buscas.delete()
+    with connection.cursor() as cursor:
+        for sql, params in consultas:
+            cursor.execute(insert + sql, params)
+
+    schema.campos_busca = campos
+    schema.save(update_fields=['campos_busca', 'atualizado_em'])
+    return campos
+
+
+def tipo_da_busca(termo):
+    # Só dígitos e a pontuação de CPF/RG: busca por documento; qualquer outra coisa, por nome
+    if re.fullmatch(r'[\d\s./-]+', termo):
+        return TIPO_BUSCA_DOCUMENTO
+    return TIPO_BUSCA_NOME
+
+
+def condicao_campos(palavras):
+    condicao = Q(pk__in=[])
+    for palavra in palavras:
+        condicao |= Q(campo__icontains=palavra)
+    return condicao
+
+
+def normalizar_termo_global(termo, tipo):
+    return normalizar_busca(termo, documento=tipo == TIPO_BUSCA_DOCUMENTO).strip()
+
+
+def buscar_em_todos_editais(termo, tipo=None, limite=LIMITE_RESULTADOS_GLOBAIS):
+    """
+    Linhas de `BuscaTexto` de qualquer edital que correspondem ao termo, com o
+    edital e o inscrito já carregados (uma única consulta).
+
+    Documentos são comparados pelo prefixo do valor normalizado (o CPF
+    completo é uma igualdade), atendido pelo índice B-tree do início de
+    `valor`; nomes, por trecho (LIKE '%termo%'), atendido pelo índice de
+    trigramas.
+    """
+    tipo = tipo or tipo_da_busca(termo)
+    normalizado = normalizar_termo_global(termo, tipo)
+    if len(normalizado) < TAMANHO_MINIMO_TERMO:
+        return BuscaTexto.objects.none()
+    if tipo == TIPO_BUSCA_DOCUMENTO:
+        # O índice só tem o início do valor: a condição sobre ele usa o índice, e a
+        # condição sobre o valor inteiro confere termos maiores que esse início
+        condicao = (
+            condicao_campos(CAMPOS_DOCUMENTO)
+            & Q(inicio_valor__startswith=normalizado[:TAMANHO_PREFIXO_BUSCA])
+            & Q(valor__startswith=normalizado)
+        )
+    else:
+        condicao = condicao_campos(CAMPOS_NOME) & Q(valor__contains=normalizado)
+    return (
+        BuscaTexto.objects
+        .alias(inicio_valor=Left('valor', TAMANHO_PREFIXO_BUSCA))
+        .filter(condicao)
+        .select_related('edital', 'edital__schema', 'inscrito')
+        .order_by('-edital__last_modified_at', 'edital_id', 'inscrito_id')[:limite]
+    )
@@ -0,0 +1,109 @@
+"""
+Gerador de editais sintéticos, para testes de carga e benchmarks.
+
+Os arquivos imitam as planilhas reais: nomes com acentos, CPF e RG em vários
+formatos, polos no formato "SIGLA - Cidade", delimitador ';' ou ',' e
+codificação UTF-8 ou latin-1. Com a mesma semente, o conteúdo gerado é
+sempre o mesmo.
+"""
+import csv
+import random
+
+COLUNAS = [
+    "Nome", "CPF", "RG", "E-mail", "Telefone", "Data de Nascimento", "Curso",
+    "Polo de Inscrição - Cidade", "Polo de Origem", "Modalidade", "Situação",
+    "Cor/Raça", "Sexo", "Escola Pública", "Renda Familiar",
+]
+
+PRENOMES = [
+    "José", "João", "Maria", "Ana", "Antônio", "Francisca", "Luíza", "Sebastião", "Conceição", "Inês",
+    "Cícero", "Luís", "Fábio", "Márcia", "Sônia", "Vitória", "Júlia", "Ângela", "Íris", "Raí",
+]
+
+SOBRENOMES = [
+    "da Silva", "Conceição", "Araújo", "Gonçalves", "Magalhães", "Simões", "Brandão", "Falcão",
+    "Guimarães", "Assunção", "Lins", "Cavalcanti", "Albuquerque", "Barbosa", "Peçanha", "Loureiro",
+]
+
+POLOS = [
+    "LP - Recife", "LF - Garanhuns", "BSI - Carpina", "LC - São Lourenço da Mata",
+    "LP - Jaboatão dos Guararapes", "LF - Vitória de Santo Antão", "BSI - Petrolina", "LC - Serra Talhada",
+]
+
+CURSOS = ["Licenciatura em Pedagogia", "Licenciatura em Física", "Sistemas de Informação", "Licenciatura em Computação"]
+
+DELIMITADORES = (";", ",")
+
+CODIFICACOES = ("utf-8", "latin-1")
+
+
+def gerar_cpf(rng):
+    """
+    CPF com dígitos verificadores válidos, formatado ou só com os números.
+    """
+    numeros = [rng.randint(0, 9) for _ in range(9)]
+    for tamanho in (9, 10):
+        soma = sum(digito * peso for digito, peso in zip(numeros, range(tamanho + 1, 1, -1)))
+        numeros.append((soma * 10 // 11) % 10)
+    cpf = "".join(str(digito) for digito in numeros)
+    if rng.random() < 0.2:
+        return cpf
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+def gerar_rg(rng):
+    numero = rng.randint(1000000, 99999999)
+    formato = rng.randrange(3)
+    if formato == 0:
+        return f"{numero:,}".replace(",", ".")
+    if formato == 1:
+        return f"{numero}-{rng.randint(0, 9)}"
+    return f"{numero} SDS/PE"
+
+
+def linha_sintetica(i, rng=random):
+    nome = f"{rng.choice(PRENOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    polo = rng.choice(POLOS)
+    return [
+        nome,
+        gerar_cpf(rng),
+        gerar_rg(rng),
+        f"inscrito{i}@exemplo.com",
+        f"(81) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1970, 2005)}",
+        rng.choice(CURSOS),
+        polo,
+        polo.split(" - ")[1],
+        rng.choice(["Ampla Concorrência", "Cotas"]),
+        rng.choice(["Deferido", "Indeferido", "Em análise"]),
+        rng.choice(["Parda", "Preta", "Branca", "Amarela", "Indígena"]),
+        rng.choice(["F", "M"]),
+        rng.choice(["Sim", "Não"]),
+        rng.choice(["Até 1 SM", "1 a 3 SM", "Acima de 3 SM"]),
+    ]
+
+
+def escrever_edital(arquivo, linhas, delimitador=";", semente=0):
+    """
+    Escreve em `arquivo` (aberto em modo texto) o cabeçalho e `linhas`
+    inscrições sintéticas.
+    """
+    rng = random.Random(semente)
+    writer = csv.writer(arquivo, delimiter=delimitador)
+    writer.writerow(COLUNAS)
+    for i in range(linhas):
+        writer.writerow(linha_sintetica(i, rng))
+
+
+def gerar_edital_csv(caminho, linhas, delimitador=";", codificacao="utf-8", semente=0):
+    with open(caminho, "w", encoding=codificacao, newline="") as arquivo:
+        escrever_edital(arquivo, linhas, delimitador, semente)
+    return caminho
+
+
+def variacao(indice):
+    """
+    (delimitador, codificação) do i-ésimo arquivo de uma série, alternando
+    entre todas as combinações.
+    """
+    return DELIMITADORES[indice % 2], CODIFICACOES[(indice // 2) % 2]
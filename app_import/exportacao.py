@@ -0,0 +1,93 @@
+"""
+Exportação dos inscritos de um edital em CSV, em streaming.
+
+As linhas são lidas do banco aos poucos (`.iterator()`) e enviadas ao
+cliente em blocos, então a memória usada não depende do tamanho do edital e
+o download começa assim que o primeiro bloco fica pronto. `agerar_csv` e
+`alinhas_para_exportar` são as versões assíncronas, usadas pela view ASGI.
+"""
+import csv
+
+# Linhas lidas do banco por vez
+TAMANHO_BLOCO_BANCO = 2000
+
+# Linhas de CSV agrupadas em cada bloco enviado ao cliente
+LINHAS_POR_BLOCO = 500
+
+
+class Echo:
+    """
+    Pseudo-arquivo cujo write() apenas devolve o texto, para usar o
+    csv.writer sem acumular a saída em memória.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _novo_writer():
+    return csv.writer(Echo(), delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+
+def _formatar_linha(writer, cabecalho, dados_linha):
+    if not isinstance(dados_linha, dict):
+        return None
+    return writer.writerow([dados_linha.get(coluna, '') for coluna in cabecalho])
+
+
+def gerar_csv(cabecalho, linhas, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Gera o CSV (com BOM, para o Excel reconhecer o UTF-8) em blocos de texto.
+    `linhas` é um iterável de dicionários `dados_linha`.
+    """
+    writer = _novo_writer()
+
+    yield "\ufeff" + writer.writerow(cabecalho)
+
+    bloco = []
+    for dados_linha in linhas:
+        linha = _formatar_linha(writer, cabecalho, dados_linha)
+        if linha is None:
+            continue
+        bloco.append(linha)
+        if len(bloco) >= linhas_por_bloco:
+            yield "".join(bloco)
+            bloco = []
+    if bloco:
+        yield "".join(bloco)
+
+
+async def agerar_csv(cabecalho, linhas, linhas_por_bloco=LINHAS_POR_BLOCO):
+    # Mesmo CSV de `gerar_csv`, a partir de um iterável assíncrono de linhas
+    writer = _novo_writer()
+
+    yield "\ufeff" + writer.writerow(cabecalho)
+
+    bloco = []
+    async for dados_linha in linhas:
+        linha = _formatar_linha(writer, cabecalho, dados_linha)
+        if linha is None:
+            continue
+        bloco.append(linha)
+        if len(bloco) >= linhas_por_bloco:
+            yield "".join(bloco)
+            bloco = []
+    if bloco:
+        yield "".join(bloco)
+
+
+def linhas_para_exportar(inscritos, schema=None, chunk_size=TAMANHO_BLOCO_BANCO):
+    linhas = inscritos.values_list('dados_linha', flat=True).iterator(chunk_size=chunk_size)
+    if schema is not None and schema.compacto:
+        return (schema.como_dict(dados_linha) for dados_linha in linhas)
+    return linhas
+
+
+async def alinhas_para_exportar(inscritos, schema=None, chunk_size=TAMANHO_BLOCO_BANCO):
+    compacto = schema is not None and schema.compacto
+    async for dados_linha in inscritos.values_list('dados_linha', flat=True).aiterator(chunk_size=chunk_size):
+        yield schema.como_dict(dados_linha) if compacto else dados_linha
+
+
+def nome_arquivo_exportacao(edital):
+    return f"edital_{edital.tipo}_{edital.numero_ano.replace('/', '-')}_filtrado.csv"
@@ -0,0 +1,172 @@
+"""
+Contagens das opções dos filtros (facetas) da página de detalhes.
+
+Sem filtros, as contagens já estão no `EditalSchema` montado na importação
+(que também alimenta a página de estatísticas do edital). Com filtros, elas
+são calculadas sobre os inscritos filtrados em uma única consulta agrupada
+(campo, valor) e guardadas no cache do Django, com a chave de
+`chave_cache_filtros` (edital + `last_modified_at` + filtros), então
+substituir o edital invalida as contagens antigas.
+"""
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import connection
+
+from .filtros import eh_campo_polo, eh_campo_polo_origem, extrair_cidade_do_polo, possui_filtros
+from .paginacao import TEMPO_CACHE_CONTAGEM, chave_cache_filtros
+from .schema import TAMANHO_MAXIMO_VALOR_FILTRO
+
+SQL_CONTAGEM = """
+    SELECT valores.key, valores.value, COUNT(*)
+    FROM ({inscritos}) AS inscritos
+    CROSS JOIN LATERAL jsonb_each_text(inscritos.dados_linha) AS valores
+    WHERE valores.key = ANY(%s) AND valores.value <> '' AND LENGTH(valores.value) <= %s
+    GROUP BY valores.key, valores.value
+"""
+
+# Valores exibidos por campo na página de estatísticas; o restante é somado em "Outros"
+LIMITE_VALORES_ESTATISTICA = 50
+
+# Formato compacto: a "chave" é a posição do valor na lista (a partir de 0)
+SQL_CONTAGEM_COMPACTO = """
+    SELECT valores.posicao - 1, valores.value, COUNT(*)
+    FROM ({inscritos}) AS inscritos
+    CROSS JOIN LATERAL jsonb_array_elements_text(inscritos.dados_linha) WITH ORDINALITY AS valores(value, posicao)
+    WHERE valores.posicao - 1 = ANY(%s) AND valores.value <> '' AND LENGTH(valores.value) <= %s
+    GROUP BY valores.posicao, valores.value
+"""
+
+
+def contagens_do_schema(schema):
+    return {
+        'campos': schema.valores_campos,
+        'cidades': schema.cidades_polo,
+        'polo_origem': schema.valores_polo_origem,
+    }
+
+
+def contar_facetas(inscritos, schema):
+    """
+    Conta, entre os `inscritos` (já filtrados), os valores de cada campo de
+    dropdown, as cidades dos polos e os polos de origem, no mesmo formato das
+    contagens do `EditalSchema`.
+    """
+    campos_origem = [campo for campo in schema.colunas if eh_campo_polo_origem(campo)]
+    campos = list(schema.valores_campos) + campos_origem
+    if not campos:
+        return {'campos': {}, 'cidades': {}, 'polo_origem': {}}
+
+    sql, params = inscritos.order_by().values('dados_linha').query.sql_with_params()
+    if schema.compacto:
+        consulta = SQL_CONTAGEM_COMPACTO
+        chaves = [schema.colunas.index(campo) for campo in campos]
+    else:
+        consulta = SQL_CONTAGEM
+        chaves = campos
+    with connection.cursor() as cursor:
+        cursor.execute(
+            consulta.format(inscritos=sql),
+            (*params, chaves, TAMANHO_MAXIMO_VALOR_FILTRO),
+        )
+        linhas = cursor.fetchall()
+    if schema.compacto:
+        linhas = [(schema.colunas[posicao], valor, total) for posicao, valor, total in linhas]
+
+    valores_campos = defaultdict(dict)
+    cidades = Counter()
+    polo_origem = Counter()
+    for campo, valor, total in linhas:
+        if eh_campo_polo_origem(campo):
+            polo_origem[valor] += total
+            continue
+        valores_campos[campo][valor] = total
+        if eh_campo_polo(campo):
+            cidade = extrair_cidade_do_polo(valor)
+            if cidade:
+                cidades[cidade.strip()] += total
+
+    return {
+        'campos': dict(valores_campos),
+        'cidades': dict(cidades),
+        'polo_origem': dict(polo_origem),
+    }
+
+
+def contar_facetas_com_cache(edital, schema, inscritos, parametros):
+    if not possui_filtros(parametros):
+        return contagens_do_schema(schema)
+
+    chave = chave_cache_filtros('facetas', edital, parametros)
+    contagens = cache.get(chave)
+    if contagens is None:
+        contagens = contar_facetas(inscritos, schema)
+        cache.set(chave, contagens, TEMPO_CACHE_CONTAGEM)
+    return contagens
+
+
+def opcoes_com_contagem(schema, contagens):
+    """
+    Opções de cada filtro como pares (valor, quantidade). A lista de opções é
+    sempre a do edital inteiro; as que não aparecem no resultado filtrado
+    ficam com quantidade 0.
+    """
+    contagens_campos = contagens['campos']
+    return {
+        'campos': {
+            campo: [
+                (valor, contagens_campos.get(campo, {}).get(valor, 0))
+                for valor in valores
+            ]
+            for campo, valores in schema.campos_filtro.items()
+        },
+        'cidades': [
+            (cidade, contagens['cidades'].get(cidade, 0))
+            for cidade in schema.cidades_disponiveis
+        ],
+        'polo_origem': [
+            (polo, contagens['polo_origem'].get(polo, 0))
+            for polo in schema.lista_polo_origem
+        ],
+    }
+
+
+def _agrupar(titulo, contagens, total, limite, com_nao_informado=True):
+    ordenados = sorted(contagens.items(), key=lambda item: (-item[1], item[0]))
+    linhas = [
+        (valor, quantidade, quantidade * 100 / total if total else 0)
+        for valor, quantidade in ordenados[:limite]
+    ]
+    outros = sum(quantidade for _, quantidade in ordenados[limite:])
+    # Cada linha tem no máximo um valor por campo; o que falta são células vazias
+    # (ou longas demais para virar opção de filtro)
+    nao_informado = max(total - sum(contagens.values()), 0) if com_nao_informado else 0
+    return {
+        'titulo': titulo,
+        'linhas': linhas,
+        'outros': outros,
+        'nao_informado': nao_informado,
+        'distintos': len(ordenados),
+    }
+
+
+def estatisticas_do_schema(schema, limite=LIMITE_VALORES_ESTATISTICA):
+    """
+    Quantidade de inscritos por valor de cada campo de dropdown, por cidade dos
+    polos e por polo de origem, lida das contagens gravadas no `EditalSchema`
+    (atualizadas a cada importação ou substituição), sem percorrer os inscritos.
+    """
+    total = schema.total_linhas
+    grupos = []
+    if schema.cidades_polo:
+        # Com mais de um campo de polo, o mesmo inscrito aparece uma vez em cada campo
+        grupos.append(_agrupar(
+            "Cidade do polo", schema.cidades_polo, total, limite,
+            com_nao_informado=len(schema.campos_polo) == 1,
+        ))
+    if schema.valores_polo_origem:
+        grupos.append(_agrupar("Polo de origem", schema.valores_polo_origem, total, limite))
+    for campo in schema.colunas:
+        if campo in schema.valores_campos:
+            grupos.append(_agrupar(campo, schema.valores_campos[campo], total, limite))
+    return grupos
@@ -0,0 +1,262 @@
+"""
+Motor de filtros dos inscritos de um edital.
+
+Converte os parâmetros GET usados em `detalhe_edital` (filtro_*, texto_*,
+cidade_polo e polo_origem) em expressões SQL sobre `ImportedData.dados_linha`,
+de modo que o PostgreSQL devolva apenas as linhas que atendem aos filtros.
+As regras de comparação reproduzem as do filtro antigo feito em Python:
+busca sem acentos e sem diferenciar maiúsculas, e documentos comparados
+apenas pelos seus caracteres alfanuméricos.
+"""
+import re
+import unicodedata
+
+from django.db import NotSupportedError
+from django.db.models import CharField, Func, IntegerField, Q, Value
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce, Lower
+from django.db.models.lookups import Exact, GreaterThan, IsNull
+
+from .models import BuscaTexto
+
+CAMPOS_DADOS_PESSOAIS = [
+    'nome', 'cpf', 'rg', 'identidade', 'documento', 'endereco', 'endereço',
+    'email', 'e-mail', 'telefone', 'celular', 'contato', 'nascimento',
+    'data de nascimento', 'filiação', 'mae', 'mãe', 'pai'
+]
+
+CAMPOS_DOCUMENTO = ['cpf', 'rg', 'identidade', 'documento']
+
+CAMPOS_POLO = ['polo', 'pólo']
+
+CAMPO_POLO_ORIGEM = 'polo de origem'
+
+PADRAO_CIDADE_POLO = r'[A-Z]+\s*-\s*(.+)'
+
+PREFIXOS_FILTRO = ('filtro_', 'texto_', 'cidade_polo', 'polo_origem')
+
+# Marcas combinantes do bloco "Combining Diacritical Marks" (U+0300 a U+036F): os acentos,
+# o til e a cedilha que a decomposição NFD separa das letras latinas.
+MARCAS_COMBINANTES = '[\u0300-\u036f]'
+
+
+def remover_acentos(texto):
+    if not texto or not isinstance(texto, str):
+        return texto
+    return ''.join(c for c in unicodedata.normalize('NFD', texto)
+                  if unicodedata.category(c) != 'Mn')
+
+
+def extrair_cidade_do_polo(valor_polo):
+    match = re.search(PADRAO_CIDADE_POLO, valor_polo)
+    if match:
+        return match.group(1).strip()
+    return valor_polo
+
+
+def normalizar_busca(valor, documento=False):
+    """
+    Normaliza um termo de busca do mesmo jeito que `expressao_normalizada`
+    normaliza a coluna no banco.
+    """
+    normalizado = remover_acentos(str(valor).lower())
+    if documento:
+        normalizado = re.sub(r'[^a-zA-Z0-9]', '', normalizado)
+    return normalizado
+
+
+def eh_campo_documento(campo):
+    return any(keyword in campo.lower() for keyword in CAMPOS_DOCUMENTO)
+
+
+def eh_campo_polo(campo):
+    return (
+        any(keyword in campo.lower() for keyword in CAMPOS_POLO)
+        and not eh_campo_polo_origem(campo)
+    )
+
+
+def eh_campo_polo_origem(campo):
+    return campo.strip().lower() == CAMPO_POLO_ORIGEM
+
+
+class NormalizarNFD(Func):
+    # NORMALIZE só existe no PostgreSQL (e exige um banco com codificação UTF8).
+    function = 'NORMALIZE'
+    template = '%(function)s(%(expressions)s, NFD)'
+    output_field = CharField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(
+            'Os filtros e a indexação de texto normalizam os valores com NORMALIZE(..., NFD), '
+            f'que exige PostgreSQL (banco atual: {connection.vendor}).'
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, **extra_context)
+
+
+class RegexpReplace(Func):
+    function = 'REGEXP_REPLACE'
+    output_field = CharField()
+
+
+class RegexpCaptura(Func):
+    # Primeiro grupo de captura de uma expressão regular (NULL se não casar).
+    function = 'REGEXP_MATCH'
+    template = '(%(function)s(%(expressions)s))[1]'
+    output_field = CharField()
+
+
+class Strpos(Func):
+    function = 'STRPOS'
+    output_field = IntegerField()
+
+
+class TrimEspacos(Func):
+    # Equivalente ao str.strip() do Python para os espaços mais comuns.
+    function = 'BTRIM'
+    template = "%(function)s(%(expressions)s, E' \\t\\r\\n')"
+    output_field = CharField()
+
+
+def valor_campo(campo, schema=None):
+    """
+    Valor (texto) de uma coluna em `dados_linha`: dados_linha ->> 'campo' ou,
+    no formato compacto, dados_linha ->> posição da coluna no esquema.
+    """
+    if schema is not None and schema.compacto:
+        if campo not in schema.colunas:
+            return Value(None, output_field=CharField())
+        return KeyTextTransform(schema.colunas.index(campo), 'dados_linha')
+    return KeyTextTransform(campo, 'dados_linha')
+
+
+def expressao_normalizada(expressao, documento=False):
+    """
+    Versão SQL de `normalizar_busca`: remove os acentos (decomposição NFD e
+    remoção das marcas combinantes, como `remover_acentos`, o que vale também
+    para valores gravados já decompostos), passa para minúsculas e, para
+    documentos, mantém apenas letras e números. As minúsculas vêm por último
+    porque, com a collation "C", o LOWER só converte letras sem acento.
+    """
+    normalizada = Lower(RegexpReplace(
+        NormalizarNFD(expressao), Value(MARCAS_COMBINANTES), Value(''), Value('g')
+    ))
+    if documento:
+        normalizada = RegexpReplace(normalizada, Value('[^a-zA-Z0-9]'), Value(''), Value('g'))
+    return normalizada
+
+
+def expressao_cidade_polo(expressao):
+    # Versão SQL de `extrair_cidade_do_polo`.
+    return Coalesce(TrimEspacos(RegexpCaptura(expressao, Value(PADRAO_CIDADE_POLO))), expressao)
+
+
+def ler_filtros(parametros):
+    """
+    Separa os parâmetros GET em filtros de dropdown e de texto.
+    """
+    filtros_ativos = {}
+    filtros_texto = {}
+    for param, valor in parametros.items():
+        if param.startswith('filtro_') and valor:
+            filtros_ativos[param[7:]] = valor
+        elif param.startswith('texto_') and valor:
+            filtros_texto[param[6:]] = valor
+    return filtros_ativos, filtros_texto
+
+
+def possui_filtros(parametros):
+    return any(param.startswith(PREFIXOS_FILTRO) for param, valor in parametros.items() if valor)
+
+
+def condicao_preenchida(expressao):
+    # Equivalente ao teste de veracidade do Python: nem NULL nem texto vazio.
+    return Q(IsNull(expressao, False)) & ~Q(Exact(expressao, ''))
+
+
+def condicao_igual(campo, valor, schema=None):
+    # dados_linha @> '{"campo": "valor"}': a contenção é atendida pelo índice GIN
+    # (jsonb_path_ops) de dados_linha, ao contrário de comparar dados_linha ->> campo.
+    # No formato compacto (lista de valores) a contenção ignoraria a posição, então
+    # a comparação é feita pelo valor na posição da coluna.
+    if schema is not None and schema.compacto:
+        return Q(Exact(valor_campo(campo, schema), valor))
+    return Q(dados_linha__contains={campo: valor})
+
+
+def condicao_contem(expressao, termo):
+    # STRPOS evita que '%' e '_' digitados pelo usuário virem curingas do LIKE.
+    return Q(GreaterThan(Strpos(expressao, Value(termo)), 0))
+
+
+def ids_com_texto(edital_id, campo, termo_normalizado):
+    """
+    Subconsulta com os ids dos inscritos cujo valor normalizado em `BuscaTexto`
+    contém o termo (LIKE '%termo%', atendido pelo índice de trigramas).
+    """
+    return BuscaTexto.objects.filter(
+        edital_id=edital_id,
+        campo=campo,
+        valor__contains=termo_normalizado,
+    ).values('inscrito_id')
+
+
+def construir_filtros(parametros, schema):
+    """
+    Monta o `Q` equivalente aos filtros ativos em `parametros` (normalmente
+    `request.GET`). Do `EditalSchema` vêm as colunas do edital, usadas pelos
+    filtros que valem para qualquer coluna de polo, e os campos de texto já
+    normalizados em `BuscaTexto`.
+    """
+    colunas = schema.colunas
+    condicao = Q()
+    filtros_ativos, filtros_texto = ler_filtros(parametros)
+
+    polo_origem = parametros.get('polo_origem', '')
+    if polo_origem:
+        campos_origem = [campo for campo in colunas if eh_campo_polo_origem(campo)]
+        condicao_origem = Q(pk__in=[])
+        for campo in campos_origem:
+            condicao_origem |= condicao_igual(campo, polo_origem, schema)
+        condicao &= condicao_origem
+
+    for campo, valor in filtros_ativos.items():
+        condicao &= condicao_igual(campo, valor, schema)
+
+    for campo, valor in filtros_texto.items():
+        documento = eh_campo_documento(campo)
+        if campo in schema.campos_busca:
+            condicao &= Q(pk__in=ids_com_texto(schema.edital_id, campo, normalizar_busca(valor, documento)))
+            continue
+        # Editais importados antes de BuscaTexto: normaliza a coluna na própria consulta
+        expressao = valor_campo(campo, schema)
+        condicao &= condicao_preenchida(expressao) & condicao_contem(
+            expressao_normalizada(expressao, documento),
+            normalizar_busca(valor, documento),
+        )
+
+    cidade_polo = parametros.get('cidade_polo', '')
+    if cidade_polo:
+        cidade_normalizada = normalizar_busca(cidade_polo)
+        condicao_cidade = Q(pk__in=[])
+        for campo in colunas:
+            if not eh_campo_polo(campo):
+                continue
+            valor = valor_campo(campo, schema)
+            cidade = expressao_normalizada(expressao_cidade_polo(valor))
+            condicao_cidade |= (
+                condicao_preenchida(valor)
+                & condicao_preenchida(cidade)
+                & condicao_contem(cidade, cidade_normalizada)
+            )
+        condicao &= condicao_cidade
+
+    return condicao
+
+
+def aplicar_filtros(queryset, parametros, schema):
+    if not possui_filtros(parametros):
+        return queryset
+    return queryset.filter(construir_filtros(parametros, schema))
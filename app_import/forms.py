@@ -1,9 +1,58 @@
 from django import forms
+from django.conf import settings
+from .busca import (
+    TAMANHO_MINIMO_TERMO, TIPO_BUSCA_DOCUMENTO, TIPO_BUSCA_NOME, normalizar_termo_global, tipo_da_busca,
+)
+from .importacao import FORMATOS
 from .models import Edital # Importar o modelo Edital
 
 class EditalCSVUploadForm(forms.Form):
     tipo = forms.ChoiceField(choices=Edital.TIPO_CHOICES, label="Tipo de Edital")
     numero_ano = forms.CharField(max_length=50, label="Número/Ano do Edital (Ex: 01/2025)")
-    csv_file = forms.FileField(label="Selecione o arquivo CSV")
+    csv_file = forms.FileField(
+        label="Selecione o arquivo CSV, XLSX ou ODS",
+        widget=forms.ClearableFileInput(attrs={"accept": ",".join(FORMATOS)}),
+    )
     # Campo de confirmação como BooleanField normal (renderiza como checkbox)
     confirmar_substituicao = forms.BooleanField(required=False, label="Confirmar Substituição")
+    # Substituição incremental: linhas comparadas por esta coluna (ou "hash" para a linha inteira)
+    chave_substituicao = forms.CharField(
+        required=False,
+        max_length=255,
+        label="Coluna-chave para substituição incremental (ex: CPF, ou \"hash\" para comparar a linha inteira)",
+        help_text="Deixe em branco para apagar os dados atuais e importar tudo de novo.",
+    )
+
+    # Pré-visualização: analisa o arquivo e mostra o relatório, sem gravar nada
+    apenas_validar = forms.BooleanField(
+        required=False,
+        label="Apenas validar o arquivo (não importa os dados)",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["chave_substituicao"].initial = getattr(settings, "IMPORTACAO_CHAVE_SUBSTITUICAO", "")
+
+
+class BuscaInscritoForm(forms.Form):
+    termo = forms.CharField(
+        min_length=TAMANHO_MINIMO_TERMO,
+        max_length=255,
+        label="CPF, documento ou nome",
+    )
+    # Em branco: documento se o termo tiver só números e pontuação, senão nome
+    tipo = forms.ChoiceField(
+        required=False,
+        choices=[("", "Automático"), (TIPO_BUSCA_DOCUMENTO, "Documento"), (TIPO_BUSCA_NOME, "Nome")],
+        label="Buscar por",
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        termo = cleaned_data.get("termo")
+        if termo:
+            cleaned_data["tipo"] = cleaned_data.get("tipo") or tipo_da_busca(termo)
+            # Sem acentos e, para documentos, sem pontuação, o termo ainda precisa ter o tamanho mínimo
+            if len(normalizar_termo_global(termo, cleaned_data["tipo"])) < TAMANHO_MINIMO_TERMO:
+                self.add_error("termo", f"Digite pelo menos {TAMANHO_MINIMO_TERMO} letras ou números.")
+        return cleaned_data
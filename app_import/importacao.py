@@ -0,0 +1,626 @@
+"""
+Importação de arquivos CSV (ou planilhas .xlsx e .ods) de editais.
+
+O arquivo é lido em streaming: os blocos do upload são decodificados de forma
+incremental, o `csv.DictReader` consome as linhas como um gerador e as
+inscrições são gravadas em lotes de tamanho fixo. Assim o consumo de memória
+não depende do tamanho do arquivo. As planilhas são lidas linha a linha por
+app_import.planilhas e entram no mesmo caminho, com um leitor que se comporta
+como o `csv.DictReader`.
+"""
+import codecs
+import csv
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, F, Func, Q, Sum, TextField
+from django.db.models.functions import Cast, Length
+
+from .busca import indexar_busca
+from .filtros import eh_campo_documento, normalizar_busca
+from .models import BuscaTexto, Edital, EditalSchema, ImportedData, linha_como_dict
+from .particoes import consultar_tabela, criar_tabela_nova, particionado, trocar_particao
+from .planilhas import ERROS_LEITURA, EXTENSOES_PLANILHA, eh_planilha, linhas_da_planilha
+from .schema import CatalogoCampos
+
+# Quantidade de linhas gravadas por vez no banco
+TAMANHO_LOTE = 2000
+
+# Codificações tentadas, em ordem; latin-1 aceita qualquer sequência de bytes
+CODIFICACOES = ('utf-8', 'latin-1')
+
+# Codec usado na leitura: em UTF-8, o BOM que o Excel (e o download em CSV deste sistema)
+# grava no início do arquivo é descartado, em vez de virar parte do nome da primeira coluna
+CODECS_LEITURA = {'utf-8': 'utf-8-sig'}
+
+DELIMITADORES = (';', ',')
+
+# Extensões de arquivo aceitas pela importação
+FORMATOS = ('.csv',) + EXTENSOES_PLANILHA
+
+# Bytes do início do arquivo usados para escolher a codificação antes da leitura completa
+TAMANHO_AMOSTRA_CODIFICACAO = 64 * 1024
+
+# Formas de gravar as linhas: "orm" usa bulk_create; "copy" usa o COPY ... FROM STDIN
+# do PostgreSQL via psycopg 3 e cai para bulk_create nos demais bancos. Na tabela nova
+# de uma troca de partição, onde o bulk_create não grava, "orm" vira um INSERT por lote.
+BACKENDS = ('orm', 'copy')
+
+# Chave da substituição incremental que compara a linha inteira, em vez de uma coluna
+CHAVE_HASH = 'hash'
+
+
+class ErroImportacao(Exception):
+    """
+    Erro de formato do arquivo, com mensagem pronta para exibir ao usuário.
+    """
+
+
+@dataclass
+class DiferencaImportacao:
+    inseridas: int = 0
+    atualizadas: int = 0
+    removidas: int = 0
+    mantidas: int = 0
+
+
+@dataclass
+class ResultadoImportacao:
+    edital: Edital
+    acao: str
+    linhas_importadas: int
+    # Lista de (nível, texto) no formato de django.contrib.messages
+    mensagens: list = field(default_factory=list)
+    # Contagens da substituição incremental, quando usada
+    diferenca: DiferencaImportacao = None
+
+
+def ler_linhas(arquivo, codificacao):
+    """
+    Gera as linhas do arquivo decodificando um bloco do upload por vez.
+    As linhas são quebradas apenas em '\\n' (o '\\r' fica na linha e é
+    tratado pelo módulo csv), como fazia o `io.StringIO` usado antes.
+    """
+    decodificador = codecs.getincrementaldecoder(CODECS_LEITURA.get(codificacao, codificacao))()
+    resto = ''
+    for bloco in arquivo.chunks():
+        texto = resto + decodificador.decode(bloco)
+        linhas = texto.split('\n')
+        resto = linhas.pop()
+        for linha in linhas:
+            yield linha + '\n'
+    resto += decodificador.decode(b'', final=True)
+    if resto:
+        yield resto
+
+
+def detectar_codificacao(arquivo, tamanho_amostra=TAMANHO_AMOSTRA_CODIFICACAO):
+    """
+    Escolhe a codificação pela amostra do início do arquivo: se ela já não é
+    UTF-8 válido, a leitura completa em UTF-8 falharia de qualquer forma.
+    Um byte inválido depois da amostra ainda é tratado por quem lê o arquivo.
+    """
+    decodificador = codecs.getincrementaldecoder(CODIFICACOES[0])()
+    lidos = 0
+    try:
+        for bloco in arquivo.chunks():
+            # Sem final=True: um caractere cortado no fim da amostra não é erro
+            decodificador.decode(bloco[:tamanho_amostra - lidos])
+            lidos += len(bloco)
+            if lidos >= tamanho_amostra:
+                break
+    except UnicodeDecodeError:
+        return CODIFICACOES[-1]
+    return CODIFICACOES[0]
+
+
+def codificacoes_a_tentar(arquivo):
+    # Uma planilha não tem codificação a escolher: é lida uma única vez
+    if eh_planilha(arquivo.name):
+        return (None,)
+    return CODIFICACOES[CODIFICACOES.index(detectar_codificacao(arquivo)):]
+
+
+def formato_aceito(nome):
+    return os.path.splitext(nome or '')[1].lower() in FORMATOS
+
+
+def abrir_leitor_csv(arquivo, codificacao):
+    """
+    Detecta o delimitador pela primeira linha e retorna o `csv.DictReader`
+    posicionado após o cabeçalho, junto com as mensagens para o usuário.
+    """
+    mensagens = []
+
+    delimiter_to_use = None
+    primeira_linha = next(ler_linhas(arquivo, codificacao), '')
+    try:
+        dialect = csv.Sniffer().sniff(primeira_linha, delimiters=''.join(DELIMITADORES))
+        delimiter_to_use = dialect.delimiter
+    except csv.Error:
+        mensagens.append(('warning', "Não foi possível detectar o delimitador. O sistema tentará usar ';' e ',' como padrão."))
+
+    delimiters_to_try = [delimiter_to_use] if delimiter_to_use else list(DELIMITADORES)
+
+    for delim in delimiters_to_try:
+        try:
+            reader = csv.DictReader(ler_linhas(arquivo, codificacao), delimiter=delim, quotechar='"')
+            if reader.fieldnames and len(reader.fieldnames) > 1:
+                if not delimiter_to_use:
+                    mensagens.append(('info', f"Arquivo lido com sucesso usando o delimitador '{delim}'."))
+                else:
+                    mensagens.append(('info', f"Delimitador '{delim}' detectado e usado com sucesso."))
+                return reader, mensagens
+        except csv.Error:
+            continue
+
+    raise ErroImportacao("Não foi possível ler o cabeçalho do CSV. Verifique o formato do arquivo e se o delimitador é ',' ou ';'.")
+
+
+class LeitorPlanilha:
+    """
+    Lê as linhas de uma planilha (ver app_import.planilhas) como o
+    `csv.DictReader` lê as de um CSV: `fieldnames` é a primeira linha
+    preenchida, valores além do cabeçalho ficam na chave None, colunas
+    faltando valem None e `line_num` é o número da última linha lida.
+    """
+
+    def __init__(self, linhas):
+        self._linhas = linhas
+        self.line_num = 0
+        self.fieldnames = self._proxima()
+
+    def _proxima(self):
+        try:
+            self.line_num, valores = next(self._linhas)
+        except StopIteration:
+            return None
+        except ERROS_LEITURA as e:
+            raise ErroImportacao(f"Não foi possível ler a planilha: {e}") from e
+        return valores
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        valores = self._proxima()
+        if valores is None:
+            raise StopIteration
+        row_dict = dict(zip(self.fieldnames, valores))
+        if len(valores) > len(self.fieldnames):
+            row_dict[None] = valores[len(self.fieldnames):]
+        else:
+            for coluna in self.fieldnames[len(valores):]:
+                row_dict.setdefault(coluna, None)
+        return row_dict
+
+
+def abrir_leitor_planilha(arquivo):
+    """
+    Retorna o `LeitorPlanilha` do .xlsx ou .ods posicionado após o cabeçalho,
+    junto com as mensagens para o usuário (como `abrir_leitor_csv`).
+    """
+    try:
+        reader = LeitorPlanilha(linhas_da_planilha(arquivo))
+    except ImportError as e:
+        raise ErroImportacao("A leitura de arquivos .xlsx precisa do pacote openpyxl (pip install openpyxl).") from e
+    if not reader.fieldnames or len(reader.fieldnames) < 2:
+        raise ErroImportacao("Não foi possível ler o cabeçalho da planilha: a primeira linha preenchida deve ter os nomes das colunas.")
+    return reader, [('info', f"Planilha lida com {len(reader.fieldnames)} colunas no cabeçalho.")]
+
+
+def abrir_leitor(arquivo, codificacao):
+    """
+    O leitor de linhas do arquivo conforme o formato: `abrir_leitor_planilha`
+    para .xlsx e .ods, `abrir_leitor_csv` para os demais.
+    """
+    if eh_planilha(arquivo.name):
+        return abrir_leitor_planilha(arquivo)
+    return abrir_leitor_csv(arquivo, codificacao)
+
+
+def limpar_colunas(colunas):
+    return [k for k in colunas if k is not None and k.strip() != '']
+
+
+def linhas_limpas(reader):
+    """
+    Gera as linhas do CSV sem as colunas sem nome, descartando linhas vazias.
+    """
+    for row_dict in reader:
+        cleaned_row_dict = {k: v for k, v in row_dict.items() if k is not None and k.strip() != ''}
+        if cleaned_row_dict:
+            yield cleaned_row_dict
+
+
+def backend_padrao():
+    return getattr(settings, 'IMPORTACAO_BACKEND', 'orm')
+
+
+def compacto_padrao():
+    return getattr(settings, 'IMPORTACAO_FORMATO_COMPACTO', False)
+
+
+def chave_substituicao_padrao():
+    return getattr(settings, 'IMPORTACAO_CHAVE_SUBSTITUICAO', '') or ''
+
+
+def copy_disponivel():
+    """
+    Indica se a conexão atual aceita o COPY do psycopg 3.
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def valores_para_gravar(dados_linha, cabecalho):
+    # Formato compacto: só os valores, na ordem do cabeçalho
+    if cabecalho is None:
+        return dados_linha
+    return [dados_linha.get(coluna) for coluna in cabecalho]
+
+
+def _inserir_com_bulk_create(edital, linhas, catalogo, tamanho_lote, progresso, cabecalho):
+    total = 0
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho_lote))
+        if not lote:
+            break
+        if catalogo is not None:
+            for dados_linha in lote:
+                catalogo.adicionar(dados_linha)
+        ImportedData.objects.bulk_create(
+            [ImportedData(edital=edital, dados_linha=valores_para_gravar(dados_linha, cabecalho)) for dados_linha in lote],
+            batch_size=tamanho_lote,
+        )
+        total += len(lote)
+        if progresso is not None:
+            progresso(total)
+    return total
+
+
+def _inserir_com_insert(edital, linhas, catalogo, tamanho_lote, progresso, cabecalho, tabela):
+    quote_name = connection.ops.quote_name
+    sql = "INSERT INTO {tabela} ({edital}, {dados}) VALUES (%s, %s)".format(
+        tabela=quote_name(tabela),
+        edital=quote_name(ImportedData._meta.get_field('edital').column),
+        dados=quote_name(ImportedData._meta.get_field('dados_linha').column),
+    )
+    campo_dados = ImportedData._meta.get_field('dados_linha')
+    total = 0
+    linhas = iter(linhas)
+    with connection.cursor() as cursor:
+        while True:
+            lote = list(islice(linhas, tamanho_lote))
+            if not lote:
+                break
+            if catalogo is not None:
+                for dados_linha in lote:
+                    catalogo.adicionar(dados_linha)
+            cursor.executemany(sql, [
+                (edital.pk, campo_dados.get_db_prep_save(valores_para_gravar(dados_linha, cabecalho), connection))
+                for dados_linha in lote
+            ])
+            total += len(lote)
+            if progresso is not None:
+                progresso(total)
+    return total
+
+
+def _inserir_com_copy(edital, linhas, catalogo, tamanho_lote, progresso, cabecalho, tabela):
+    # Um único COPY para o arquivo inteiro, em formato texto. O JSON gerado pelo
+    # json.dumps nunca tem tabulação ou quebra de linha literais, então basta
+    # dobrar as barras invertidas; cada lote vira uma única escrita no COPY.
+    quote_name = connection.ops.quote_name
+    sql = "COPY {tabela} ({edital}, {dados}) FROM STDIN".format(
+        tabela=quote_name(tabela or ImportedData._meta.db_table),
+        edital=quote_name(ImportedData._meta.get_field('edital').column),
+        dados=quote_name(ImportedData._meta.get_field('dados_linha').column),
+    )
+    prefixo = f"{edital.pk}\t"
+    total = 0
+    linhas = iter(linhas)
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(sql) as copy:
+            while True:
+                lote = list(islice(linhas, tamanho_lote))
+                if not lote:
+                    break
+                if catalogo is not None:
+                    for dados_linha in lote:
+                        catalogo.adicionar(dados_linha)
+                copy.write(''.join(
+                    prefixo + json.dumps(valores_para_gravar(dados_linha, cabecalho), ensure_ascii=False)
+                    .replace('\\', '\\\\') + '\n'
+                    for dados_linha in lote
+                ))
+                total += len(lote)
+                if progresso is not None:
+                    progresso(total)
+    return total
+
+
+def inserir_linhas(edital, linhas, catalogo=None, tamanho_lote=TAMANHO_LOTE, backend=None, progresso=None,
+                   cabecalho=None, tabela=None):
+    """
+    Grava as linhas do edital, alimentando o catálogo de filtros pelo caminho.
+    Com o backend "orm" as linhas vão em lotes de `tamanho_lote` via
+    bulk_create; com "copy" vão por COPY quando o banco permite.
+    Se informado, `progresso` é chamado com o total gravado após cada lote.
+    Com `cabecalho`, as linhas são gravadas no formato compacto (lista de
+    valores nessa ordem). Com `tabela` (ver `particoes.criar_tabela_nova`),
+    as linhas vão para ela em vez da tabela de `ImportedData`.
+    Retorna a quantidade de linhas gravadas.
+    """
+    backend = backend or backend_padrao()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de importação desconhecido: {backend}")
+
+    if backend == 'copy' and copy_disponivel():
+        return _inserir_com_copy(edital, linhas, catalogo, tamanho_lote, progresso, cabecalho, tabela)
+    if tabela is not None:
+        return _inserir_com_insert(edital, linhas, catalogo, tamanho_lote, progresso, cabecalho, tabela)
+    return _inserir_com_bulk_create(edital, linhas, catalogo, tamanho_lote, progresso, cabecalho)
+
+
+def hash_linha(dados_linha):
+    conteudo = json.dumps(dados_linha, ensure_ascii=False, sort_keys=True)
+    return hashlib.md5(conteudo.encode('utf-8')).hexdigest()
+
+
+def chave_da_linha(dados_linha, chave):
+    """
+    Identificador da linha na substituição incremental: o valor da coluna-chave
+    (documentos comparados só pelos caracteres alfanuméricos) ou, com
+    `CHAVE_HASH` ou coluna vazia, o hash da linha inteira.
+    """
+    if chave != CHAVE_HASH:
+        valor = dados_linha.get(chave)
+        if isinstance(valor, str) and valor.strip():
+            return normalizar_busca(valor.strip(), documento=eh_campo_documento(chave))
+    return '#' + hash_linha(dados_linha)
+
+
+def _linhas_existentes(edital, chave, colunas):
+    # {chave: [(id, hash), ...]}; uma chave pode aparecer em mais de uma linha
+    existentes = {}
+    linhas = ImportedData.objects.filter(edital=edital).values_list('id', 'dados_linha')
+    for id_linha, dados_linha in linhas.iterator(chunk_size=TAMANHO_LOTE):
+        dados_linha = linha_como_dict(dados_linha, colunas)
+        if not isinstance(dados_linha, dict):
+            continue
+        existentes.setdefault(chave_da_linha(dados_linha, chave), []).append((id_linha, hash_linha(dados_linha)))
+    return existentes
+
+
+def substituir_incremental(edital, linhas, chave, catalogo=None, tamanho_lote=TAMANHO_LOTE, backend=None, progresso=None,
+                           cabecalho=None):
+    """
+    Substitui as linhas do edital comparando-as pela `chave`: insere as linhas
+    novas, atualiza as que mudaram, remove as que não vieram no arquivo e não
+    toca nas demais. Todas as linhas do arquivo passam pelo catálogo. O índice
+    de busca é atualizado depois, por `indexar_busca`, com os ids retornados.
+    `cabecalho` tem o mesmo papel que em `inserir_linhas`.
+    Retorna (DiferencaImportacao, ids atualizados, maior id anterior às inserções).
+    """
+    # As linhas atuais são lidas no formato em que foram gravadas; se o formato novo
+    # (ou a ordem das colunas, no compacto) for outro, até as iguais precisam ser regravadas.
+    schema_anterior = EditalSchema.objects.filter(edital=edital).first()
+    colunas_anteriores = schema_anterior.colunas if schema_anterior else []
+    cabecalho_anterior = colunas_anteriores if schema_anterior and schema_anterior.compacto else None
+    regravar = cabecalho_anterior != cabecalho
+
+    existentes = _linhas_existentes(edital, chave, colunas_anteriores)
+    ultimo_id = ImportedData.objects.filter(edital=edital).order_by('-id').values_list('id', flat=True).first() or 0
+    diferenca = DiferencaImportacao()
+    ids_atualizados = []
+    lidas = 0
+
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho_lote))
+        if not lote:
+            break
+        novas = []
+        alteradas = []
+        for dados_linha in lote:
+            if catalogo is not None:
+                catalogo.adicionar(dados_linha)
+            anteriores = existentes.get(chave_da_linha(dados_linha, chave))
+            if not anteriores:
+                novas.append(dados_linha)
+                continue
+            id_linha, hash_anterior = anteriores.pop()
+            if hash_anterior == hash_linha(dados_linha):
+                diferenca.mantidas += 1
+                if not regravar:
+                    continue
+            else:
+                diferenca.atualizadas += 1
+                ids_atualizados.append(id_linha)
+            alteradas.append(ImportedData(pk=id_linha, dados_linha=valores_para_gravar(dados_linha, cabecalho)))
+
+        if novas:
+            diferenca.inseridas += inserir_linhas(
+                edital, novas, tamanho_lote=tamanho_lote, backend=backend, cabecalho=cabecalho
+            )
+        if alteradas:
+            # Filtrar pelo edital restringe o UPDATE à partição dele
+            ImportedData.objects.filter(edital=edital).bulk_update(alteradas, ['dados_linha'], batch_size=500)
+
+        lidas += len(lote)
+        if progresso is not None:
+            progresso(lidas, diferenca.inseridas + diferenca.atualizadas)
+
+    # O que sobrou não veio no arquivo novo
+    ids_removidos = [id_linha for anteriores in existentes.values() for id_linha, _ in anteriores]
+    for inicio in range(0, len(ids_removidos), tamanho_lote):
+        ids = ids_removidos[inicio:inicio + tamanho_lote]
+        BuscaTexto.objects.filter(inscrito_id__in=ids).delete()
+        ImportedData.objects.filter(edital=edital, pk__in=ids).delete()
+    diferenca.removidas = len(ids_removidos)
+
+    return diferenca, ids_atualizados, ultimo_id
+
+
+def tamanho_dos_dados(inscritos):
+    """
+    Bytes ocupados por `dados_linha` nas linhas de `inscritos`: no PostgreSQL,
+    o tamanho gravado (já comprimido); nos demais bancos, o do texto JSON.
+    """
+    if connection.vendor == 'postgresql':
+        tamanho = Func(F('dados_linha'), function='pg_column_size', output_field=BigIntegerField())
+    else:
+        tamanho = Length(Cast('dados_linha', TextField()))
+    return inscritos.aggregate(total=Sum(tamanho))['total'] or 0
+
+
+def atualizar_resumo(edital, schema, inscritos=None):
+    """
+    Grava no edital o resumo exibido na lista de editais: linhas e colunas
+    (do esquema) e bytes dos dados (de `inscritos`, por padrão as linhas do
+    edital). A duração da importação é gravada à parte, no fim dela.
+    """
+    if inscritos is None:
+        inscritos = ImportedData.objects.filter(edital=edital)
+    resumo = {
+        'total_linhas': schema.total_linhas,
+        'total_colunas': len(schema.colunas),
+        'tamanho_bytes': tamanho_dos_dados(inscritos),
+    }
+    Edital.objects.filter(pk=edital.pk).update(**resumo)
+    for campo, valor in resumo.items():
+        setattr(edital, campo, valor)
+
+
+def preparar_edital(tipo, numero_ano, usuario, manter_linhas=False):
+    """
+    Cria o edital ou, se ele já existir, remove as linhas anteriores para
+    substituí-las (a não ser que `manter_linhas` seja True, na substituição
+    incremental ou na troca de partição). Deve ser chamada dentro de uma
+    transação.
+    """
+    edital, created = Edital.objects.get_or_create(
+        tipo=tipo,
+        numero_ano=numero_ano,
+        defaults={'uploaded_by': usuario}
+    )
+    if created:
+        return edital, "importado"
+
+    edital.last_modified_by = usuario
+    edital.save()
+    if not manter_linhas:
+        BuscaTexto.objects.filter(edital=edital).delete()
+        ImportedData.objects.filter(edital=edital).delete()
+    return edital, "substituído"
+
+
+def _importar(arquivo, codificacao, tipo, numero_ano, usuario, tamanho_lote, backend, progresso, chave, compacto,
+              inicio):
+    mensagens = []
+    if codificacao not in (None, CODIFICACOES[0]):
+        mensagens.append(('info', f"Arquivo lido com codificação {codificacao}."))
+
+    reader, mensagens_leitor = abrir_leitor(arquivo, codificacao)
+    mensagens.extend(mensagens_leitor)
+    colunas = limpar_colunas(reader.fieldnames)
+    if chave and chave != CHAVE_HASH and chave not in colunas:
+        raise ErroImportacao(f"A coluna-chave '{chave}' não existe no arquivo.")
+
+    with transaction.atomic():
+        por_particao = particionado()
+        edital, acao = preparar_edital(tipo, numero_ano, usuario, manter_linhas=bool(chave) or por_particao)
+        catalogo = CatalogoCampos(colunas=colunas)
+        # No formato compacto as linhas seguem a ordem das colunas do esquema (já sem repetições)
+        cabecalho = list(catalogo.colunas) if compacto else None
+        diferenca = None
+        if chave and acao == "substituído":
+            diferenca, ids_atualizados, ultimo_id = substituir_incremental(
+                edital, linhas_limpas(reader), chave, catalogo, tamanho_lote, backend, progresso, cabecalho
+            )
+            linhas_importadas = diferenca.inseridas + diferenca.atualizadas + diferenca.mantidas
+            schema = catalogo.salvar(edital, compacto)
+            # Só as linhas inseridas (ids acima do último anterior) e as atualizadas são reindexadas
+            indexar_busca(schema, ids=ImportedData.objects.filter(edital=edital).filter(
+                Q(pk__gt=ultimo_id) | Q(pk__in=ids_atualizados)
+            ).values('pk'))
+            mensagens.append(('info', (
+                f"Substituição incremental pela chave '{chave}': {diferenca.inseridas} linhas inseridas, "
+                f"{diferenca.atualizadas} atualizadas, {diferenca.removidas} removidas e "
+                f"{diferenca.mantidas} sem alteração."
+            )))
+            atualizar_resumo(edital, schema)
+        else:
+            progresso_lote = None
+            if progresso is not None:
+                # line_num conta as linhas do arquivo consumidas, incluindo o cabeçalho
+                progresso_lote = lambda gravadas: progresso(max(reader.line_num - 1, 0), gravadas)
+            # Com a tabela particionada, as linhas vão para uma tabela nova que só no fim
+            # da transação substitui a partição do edital; as anteriores nunca são apagadas
+            tabela = criar_tabela_nova(edital.pk) if por_particao else None
+            linhas_importadas = inserir_linhas(
+                edital, linhas_limpas(reader), catalogo, tamanho_lote, backend, progresso_lote, cabecalho, tabela
+            )
+            # Esquema, catálogo de filtros e valores de busca calculados uma única vez, junto com a importação
+            schema = catalogo.salvar(edital, compacto)
+            indexar_busca(schema, tabela=tabela)
+            inscritos = ImportedData.objects.filter(edital=edital)
+            if tabela is not None:
+                inscritos = consultar_tabela(inscritos, tabela)
+            atualizar_resumo(edital, schema, inscritos)
+            if tabela is not None:
+                trocar_particao(edital.pk, tabela)
+
+        edital.duracao_importacao = timedelta(seconds=time.perf_counter() - inicio)
+        Edital.objects.filter(pk=edital.pk).update(duracao_importacao=edital.duracao_importacao)
+
+    return ResultadoImportacao(edital, acao, linhas_importadas, mensagens, diferenca)
+
+
+def importar_edital(arquivo, tipo, numero_ano, usuario=None, tamanho_lote=TAMANHO_LOTE, backend=None, progresso=None,
+                    chave=None, compacto=None):
+    """
+    Importa (ou substitui) o edital a partir de um arquivo CSV enviado.
+
+    O arquivo é lido primeiro como UTF-8 (a não ser que a amostra inicial já
+    não seja UTF-8); se aparecer um byte inválido no meio do caminho, a
+    transação é desfeita e a leitura recomeça em latin-1, sem nunca manter o
+    arquivo inteiro em memória. Planilhas .xlsx e .ods (pela extensão do nome
+    do arquivo) são lidas uma única vez, sem codificação nem delimitador.
+
+    `backend` escolhe como as linhas são gravadas ("orm" ou "copy"); se omitido,
+    vale o `IMPORTACAO_BACKEND` das configurações. `progresso`, se informado,
+    recebe (linhas lidas, linhas gravadas) após cada lote.
+
+    Com `chave` (uma coluna, como "CPF", ou `CHAVE_HASH`), a substituição de um
+    edital existente é incremental: só as diferenças são gravadas (ver
+    `substituir_incremental`). Sem ela, as linhas anteriores são apagadas e
+    todas são inseridas de novo.
+
+    `compacto` grava as linhas só com os valores (o cabeçalho fica uma única vez
+    no `EditalSchema`); se omitido, vale o `IMPORTACAO_FORMATO_COMPACTO`.
+    """
+    if compacto is None:
+        compacto = compacto_padrao()
+    # A duração gravada no edital inclui as tentativas com outra codificação
+    inicio = time.perf_counter()
+    for codificacao in codificacoes_a_tentar(arquivo):
+        try:
+            return _importar(
+                arquivo, codificacao, tipo, numero_ano, usuario, tamanho_lote, backend, progresso, chave, compacto,
+                inicio,
+            )
+        except UnicodeDecodeError:
+            continue
+    raise ErroImportacao("Não foi possível decodificar o arquivo. Verifique a codificação.")
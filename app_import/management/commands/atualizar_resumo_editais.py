@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app_import.importacao import atualizar_resumo
+from app_import.models import Edital
+from app_import.schema import obter_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula o resumo exibido na lista de editais (linhas, colunas e bytes dos dados). "
+        "Útil para editais importados antes desses campos existirem; a duração da importação "
+        "não pode ser recalculada e fica como está."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("edital_ids", nargs="*", type=int, help="Ids dos editais (padrão: todos).")
+
+    def handle(self, *args, **options):
+        editais = Edital.objects.order_by("id")
+        if options["edital_ids"]:
+            editais = editais.filter(id__in=options["edital_ids"])
+
+        for edital in editais:
+            with transaction.atomic():
+                atualizar_resumo(edital, obter_schema(edital))
+            self.stdout.write(
+                f"{edital}: {edital.total_linhas} linhas, {edital.total_colunas} colunas, {edital.tamanho_bytes} bytes."
+            )
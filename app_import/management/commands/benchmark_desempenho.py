@@ -0,0 +1,174 @@
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app_import.dados_sinteticos import gerar_edital_csv, variacao
+from app_import.models import Edital, ImportedData
+from app_import.views import filtrar_inscritos, identificar_campos_filtro
+
+TAMANHOS = [1000, 10000, 100000]
+
+NUMERO_ANO = "BENCHMARK/0000"
+
+USUARIO = "benchmark"
+
+# Filtros usados nas medições com filtro (um de cada tipo)
+FILTROS = {
+    "filtro_Curso": "Sistemas de Informação",
+    "cidade_polo": "Recife",
+    "texto_Nome": "conceicao",
+}
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o upload (home), filtrar_inscritos, identificar_campos_filtro, a página de detalhes e o "
+        "download do CSV com editais sintéticos de vários tamanhos e grava os tempos em JSON, para "
+        "comparar commits (--comparar)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanhos", type=int, nargs="+", default=TAMANHOS,
+            help="Quantidades de linhas dos editais medidos (padrão: 1000 10000 100000).",
+        )
+        parser.add_argument("--repeticoes", type=int, default=3)
+        parser.add_argument("--saida", help="Arquivo JSON com os resultados (padrão: benchmark_<commit>.json).")
+        parser.add_argument("--comparar", help="JSON de uma execução anterior, para exibir a variação de cada tempo.")
+
+    def handle(self, *args, **options):
+        if Edital.objects.filter(numero_ano=NUMERO_ANO).exists():
+            raise CommandError(f"Já existe um edital '{NUMERO_ANO}'; remova-o antes de rodar o benchmark.")
+
+        # Usuário novo, com nome único: apagá-lo no fim nunca remove uma conta de verdade
+        usuario = User.objects.create_user(f"{USUARIO}_{uuid.uuid4().hex[:12]}")
+        self.client = Client()
+        self.client.force_login(usuario)
+        self.repeticoes = options["repeticoes"]
+        resultados = []
+
+        # Upload síncrono, para medir a importação dentro da própria requisição
+        with override_settings(ALLOWED_HOSTS=["*"], IMPORTACAO_EM_SEGUNDO_PLANO=False):
+            try:
+                for indice, linhas in enumerate(options["tamanhos"]):
+                    resultados.extend(self.medir_tamanho(linhas, *variacao(indice)))
+            finally:
+                Edital.objects.filter(numero_ano=NUMERO_ANO).delete()
+                usuario.delete()
+
+        relatorio = {
+            "commit": commit_atual(),
+            "data": timezone.now().isoformat(),
+            "banco": connection.vendor,
+            "repeticoes": self.repeticoes,
+            "resultados": resultados,
+        }
+        saida = options["saida"] or f"benchmark_{relatorio['commit'] or 'local'}.json"
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {saida}."))
+
+        if options["comparar"]:
+            self.comparar(options["comparar"], resultados)
+
+    def medir_tamanho(self, linhas, delimitador, codificacao):
+        self.stdout.write(f"{linhas} linhas (delimitador '{delimitador}', {codificacao}):")
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = gerar_edital_csv(os.path.join(diretorio, "edital.csv"), linhas, delimitador, codificacao)
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+
+        def upload():
+            resposta = self.client.post(reverse("home"), {
+                "tipo": "Alunos",
+                "numero_ano": NUMERO_ANO,
+                "csv_file": SimpleUploadedFile("edital.csv", conteudo, content_type="text/csv"),
+                "confirmar_substituicao": "on",
+            })
+            assert resposta.status_code == 302, resposta.status_code
+
+        medicoes = [self.medir("home", linhas, upload)]
+        edital = Edital.objects.get(numero_ano=NUMERO_ANO)
+        assert ImportedData.objects.filter(edital=edital).count() == linhas
+
+        fabrica = RequestFactory()
+        requisicao_filtrada = fabrica.get("/", FILTROS)
+        url_detalhe = reverse("detalhe_edital", args=[edital.pk])
+        url_download = reverse("download_edital_csv", args=[edital.pk])
+
+        def download(parametros=None):
+            resposta = self.client.get(url_download, parametros or {})
+            # Sem resultados, a view redireciona em vez de gerar o arquivo
+            if resposta.streaming:
+                for _ in resposta.streaming_content:
+                    pass
+
+        medicoes += [
+            self.medir("filtrar_inscritos", linhas, lambda: list(filtrar_inscritos(requisicao_filtrada, edital))),
+            self.medir(
+                "identificar_campos_filtro", linhas,
+                lambda: identificar_campos_filtro(
+                    ImportedData.objects.filter(edital=edital).select_related('edital__schema').iterator(chunk_size=2000)
+                ),
+            ),
+            self.medir("detalhe_edital", linhas, lambda: self.client.get(url_detalhe).content),
+            self.medir("detalhe_edital_filtrado", linhas, lambda: self.client.get(url_detalhe, FILTROS).content),
+            self.medir("download_edital_csv", linhas, download),
+            self.medir("download_edital_csv_filtrado", linhas, lambda: download(FILTROS)),
+        ]
+        return medicoes
+
+    def medir(self, operacao, linhas, funcao):
+        tempos = []
+        for _ in range(self.repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        resultado = {
+            "operacao": operacao,
+            "linhas": linhas,
+            "melhor": min(tempos),
+            "mediana": statistics.median(tempos),
+            "tempos": tempos,
+        }
+        self.stdout.write(f"  {operacao:<30} melhor {resultado['melhor']:.3f}s  mediana {resultado['mediana']:.3f}s")
+        return resultado
+
+    def comparar(self, caminho, resultados):
+        with open(caminho, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        tempos_anteriores = {(r["operacao"], r["linhas"]): r["mediana"] for r in anterior["resultados"]}
+
+        self.stdout.write(f"Comparação com {caminho} (commit {anterior.get('commit') or '?'}):")
+        for resultado in resultados:
+            chave = (resultado["operacao"], resultado["linhas"])
+            if chave not in tempos_anteriores:
+                continue
+            variacao_percentual = (resultado["mediana"] / tempos_anteriores[chave] - 1) * 100
+            linha = f"  {resultado['operacao']:<30} {resultado['linhas']:>7} linhas: {variacao_percentual:+.1f}%"
+            if variacao_percentual > 10:
+                linha = self.style.WARNING(linha)
+            self.stdout.write(linha)
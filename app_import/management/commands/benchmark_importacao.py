@@ -0,0 +1,63 @@
+import random
+import tempfile
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app_import.dados_sinteticos import COLUNAS, escrever_edital, linha_sintetica
+from app_import.importacao import BACKENDS, copy_disponivel, importar_edital, inserir_linhas
+from app_import.models import Edital
+
+class Command(BaseCommand):
+    help = (
+        "Compara a velocidade de importação dos backends 'orm' (bulk_create) e 'copy' (COPY do PostgreSQL), "
+        "tanto da importação completa quanto só da gravação das linhas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--linhas", type=int, default=50000, help="Quantidade de linhas do CSV sintético.")
+        parser.add_argument("--repeticoes", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not copy_disponivel():
+            self.stdout.write(self.style.WARNING("COPY indisponível neste banco; o backend 'copy' usará bulk_create."))
+
+        with tempfile.NamedTemporaryFile("w+", suffix=".csv", encoding="utf-8", newline="") as temporario:
+            escrever_edital(temporario, options["linhas"])
+            temporario.flush()
+
+            self.stdout.write("Importação completa (leitura do CSV + catálogo + gravação):")
+            tempos = {}
+            for backend in BACKENDS:
+                def importar():
+                    with open(temporario.name, "rb") as arquivo:
+                        return importar_edital(File(arquivo), "Alunos", "BENCHMARK/0000", backend=backend).linhas_importadas
+                tempos[backend] = self.medir(backend, importar, options["repeticoes"])
+            self.stdout.write(self.style.SUCCESS(f"Ganho do COPY: {tempos['orm'] / tempos['copy']:.1f}x"))
+
+        # Só a gravação, com as linhas já lidas em memória
+        rng = random.Random(0)
+        linhas = [dict(zip(COLUNAS, linha_sintetica(i, rng))) for i in range(options["linhas"])]
+        self.stdout.write("Somente gravação das linhas:")
+        tempos = {}
+        for backend in BACKENDS:
+            def gravar():
+                edital = Edital.objects.create(tipo="Alunos", numero_ano="BENCHMARK/0000")
+                return inserir_linhas(edital, linhas, backend=backend)
+            tempos[backend] = self.medir(backend, gravar, options["repeticoes"])
+        self.stdout.write(self.style.SUCCESS(f"Ganho do COPY: {tempos['orm'] / tempos['copy']:.1f}x"))
+
+    def medir(self, backend, funcao, repeticoes):
+        melhor = None
+        for _ in range(repeticoes):
+            # Tudo é desfeito ao final, para não deixar o edital de teste no banco
+            with transaction.atomic():
+                inicio = time.perf_counter()
+                linhas = funcao()
+                duracao = time.perf_counter() - inicio
+                transaction.set_rollback(True)
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        self.stdout.write(f"  {backend:>5}: {linhas} linhas em {melhor:.2f}s ({linhas / melhor:.0f} linhas/s)")
+        return melhor
@@ -0,0 +1,47 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_import.dados_sinteticos import CODIFICACOES, DELIMITADORES, gerar_edital_csv, variacao
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera arquivos CSV de editais sintéticos (nomes acentuados, CPF/RG, polos 'SIGLA - Cidade'). "
+        "Com --quantidade maior que 1, os arquivos alternam delimitador e codificação e recebem nomes "
+        "no formato aceito pelo import_edital ('<tipo>_<numero>-<ano>.csv')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("saida", help="Arquivo CSV (com --quantidade 1) ou diretório de saída.")
+        parser.add_argument("--linhas", type=int, default=1000, help="Linhas por arquivo.")
+        parser.add_argument("--quantidade", type=int, default=1, help="Quantidade de arquivos.")
+        parser.add_argument("--delimitador", choices=DELIMITADORES, help="Padrão: alterna entre ';' e ','.")
+        parser.add_argument("--codificacao", choices=CODIFICACOES, help="Padrão: alterna entre utf-8 e latin-1.")
+        parser.add_argument("--tipo", default="Alunos")
+        parser.add_argument("--ano", type=int, default=2025)
+        parser.add_argument("--semente", type=int, default=0)
+
+    def handle(self, *args, **options):
+        quantidade = options["quantidade"]
+        if quantidade < 1:
+            raise CommandError("--quantidade deve ser pelo menos 1.")
+
+        saida = options["saida"]
+        if quantidade > 1 or os.path.isdir(saida):
+            os.makedirs(saida, exist_ok=True)
+            caminhos = [
+                os.path.join(saida, f"{options['tipo']}_{numero:02d}-{options['ano']}.csv")
+                for numero in range(1, quantidade + 1)
+            ]
+        else:
+            caminhos = [saida]
+
+        for indice, caminho in enumerate(caminhos):
+            delimitador, codificacao = variacao(indice)
+            delimitador = options["delimitador"] or delimitador
+            codificacao = options["codificacao"] or codificacao
+            gerar_edital_csv(caminho, options["linhas"], delimitador, codificacao, options["semente"] + indice)
+            self.stdout.write(
+                f"{caminho}: {options['linhas']} linhas, delimitador '{delimitador}', {codificacao}."
+            )
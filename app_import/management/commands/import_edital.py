@@ -0,0 +1,292 @@
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app_import.importacao import (
+    BACKENDS, FORMATOS, TAMANHO_LOTE, ErroImportacao, chave_substituicao_padrao, importar_edital,
+)
+from app_import.models import Edital
+from app_import.validacao import validar_arquivo
+
+# Nome do arquivo quando vários são importados de uma vez: "<tipo>_<numero>-<ano>.csv",
+# o mesmo formato dos arquivos exportados (ex: "Alunos_01-2025.csv", "edital_Alunos_01-2025.csv").
+PADRAO_NOME_ARQUIVO = re.compile(r"^(?:edital_)?(?:(?P<tipo>[^_]+)_)?(?P<numero>[^_]+)-(?P<ano>\d{4})")
+
+
+def listar_arquivos(caminhos):
+    """
+    Expande diretórios (todos os .csv, .xlsx e .ods dentro dele) e padrões glob em uma
+    lista ordenada de arquivos, sem repetições.
+    """
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            encontrados = [
+                encontrado for formato in FORMATOS for encontrado in glob.glob(os.path.join(caminho, f"*{formato}"))
+            ]
+        elif glob.has_magic(caminho):
+            encontrados = glob.glob(caminho)
+        else:
+            encontrados = [caminho]
+        arquivos.extend(sorted(encontrados))
+    return list(dict.fromkeys(arquivos))
+
+
+def edital_do_arquivo(caminho, tipo=None):
+    """
+    Deduz (tipo, numero_ano) do nome do arquivo; `tipo`, se informado, vale
+    para todos os arquivos.
+    """
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    match = PADRAO_NOME_ARQUIVO.match(nome)
+    if not match:
+        raise CommandError(
+            f"Não foi possível identificar o edital pelo nome do arquivo '{caminho}' "
+            f"(esperado '<tipo>_<numero>-<ano>.csv')."
+        )
+    tipo = tipo or match.group("tipo")
+    tipos_validos = [valor for valor, _ in Edital.TIPO_CHOICES]
+    if tipo not in tipos_validos:
+        raise CommandError(
+            f"Tipo de edital inválido para '{caminho}': {tipo!r} (use --tipo ou um de {', '.join(tipos_validos)})."
+        )
+    return tipo, f"{match.group('numero')}/{match.group('ano')}"
+
+
+def _fechar_conexoes():
+    # Com o pool do psycopg, fechar uma conexão só a devolve ao pool, que continua com
+    # conexões abertas; um processo filho criado por "fork" herdaria os sockets delas
+    for conexao in connections.all():
+        conexao.close()
+        if hasattr(conexao, "close_pool"):
+            conexao.close_pool()
+
+
+def _inicializar_processo():
+    # Com o método "spawn" o processo filho começa sem o Django configurado;
+    # com "fork" ele não pode reaproveitar as conexões abertas pelo processo pai.
+    django.setup()
+    connections.close_all()
+
+
+def importar_arquivo(caminho, tipo, numero_ano, usuario_id, tamanho_lote, backend, chave=None, compacto=None):
+    """
+    Importa um arquivo (em um processo do pool) e devolve um resumo simples,
+    que pode ser enviado de volta ao processo principal.
+    """
+    usuario = User.objects.filter(pk=usuario_id).first() if usuario_id else None
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, "rb") as arquivo:
+            resultado = importar_edital(
+                File(arquivo), tipo, numero_ano, usuario, tamanho_lote=tamanho_lote, backend=backend,
+                chave=chave, compacto=compacto,
+            )
+    except (OSError, ErroImportacao) as e:
+        return {"arquivo": caminho, "erro": str(e)}
+    except Exception as e:
+        return {"arquivo": caminho, "erro": f"Erro ao processar o arquivo: {e}"}
+    finally:
+        connections.close_all()
+
+    return {
+        "arquivo": caminho,
+        "edital": str(resultado.edital),
+        "acao": resultado.acao,
+        "linhas": resultado.linhas_importadas,
+        "bytes": os.path.getsize(caminho),
+        "duracao": time.perf_counter() - inicio,
+        "mensagens": [texto for _, texto in resultado.mensagens],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa arquivos CSV (ou planilhas .xlsx e .ods) de editais, com a mesma lógica do upload da página inicial. "
+        "Aceita um arquivo, vários arquivos, diretórios ou padrões glob; com mais de um "
+        "arquivo, o edital de cada um é deduzido do nome ('<tipo>_<numero>-<ano>.csv') "
+        "e os arquivos são importados em paralelo, um processo e uma transação por edital."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivos", nargs="+", help="Arquivos CSV, XLSX ou ODS, diretórios ou padrões glob.")
+        parser.add_argument(
+            "--tipo",
+            choices=[tipo for tipo, _ in Edital.TIPO_CHOICES],
+            help="Tipo do edital (obrigatório com --numero-ano; senão, deduzido do nome de cada arquivo).",
+        )
+        parser.add_argument(
+            "--numero-ano",
+            help='Número/ano do edital, ex: "01/2025" (somente ao importar um único arquivo).',
+        )
+        parser.add_argument(
+            "--backend",
+            choices=BACKENDS,
+            help="Forma de gravar as linhas (padrão: IMPORTACAO_BACKEND das configurações).",
+        )
+        parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE)
+        parser.add_argument("--usuario", help="Nome do usuário registrado como responsável pelo upload.")
+        parser.add_argument(
+            "--substituir",
+            action="store_true",
+            help="Substitui os dados se o edital já existir (equivale a 'Confirmar Substituição').",
+        )
+        parser.add_argument(
+            "--chave",
+            default=chave_substituicao_padrao(),
+            help=(
+                "Coluna usada na substituição incremental (ex: CPF), ou 'hash' para comparar a "
+                "linha inteira (padrão: IMPORTACAO_CHAVE_SUBSTITUICAO das configurações)."
+            ),
+        )
+        parser.add_argument(
+            "--compacto",
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help=(
+                "Grava cada linha só com os valores, sem repetir o cabeçalho "
+                "(padrão: IMPORTACAO_FORMATO_COMPACTO das configurações)."
+            ),
+        )
+        parser.add_argument(
+            "--validar",
+            action="store_true",
+            help="Apenas valida os arquivos e exibe o relatório de cada um, sem importar nada.",
+        )
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Quantidade máxima de arquivos importados ao mesmo tempo (padrão: número de CPUs).",
+        )
+
+    def handle(self, *args, **options):
+        usuario_id = None
+        if options["usuario"]:
+            try:
+                usuario_id = User.objects.get(username=options["usuario"]).pk
+            except User.DoesNotExist:
+                raise CommandError(f"Usuário '{options['usuario']}' não encontrado.")
+
+        arquivos = listar_arquivos(options["arquivos"])
+        if not arquivos:
+            raise CommandError("Nenhum arquivo CSV, XLSX ou ODS encontrado.")
+
+        if options["numero_ano"]:
+            if len(arquivos) > 1:
+                raise CommandError("--numero-ano só pode ser usado com um único arquivo.")
+            if not options["tipo"]:
+                raise CommandError("Informe --tipo junto com --numero-ano.")
+            editais = {arquivos[0]: (options["tipo"], options["numero_ano"])}
+        else:
+            editais = {caminho: edital_do_arquivo(caminho, options["tipo"]) for caminho in arquivos}
+
+        if options["validar"]:
+            self.validar_arquivos(editais)
+            return
+
+        self.validar_editais(editais, options["substituir"])
+
+        importacoes = [
+            (caminho, tipo, numero_ano, usuario_id, options["tamanho_lote"], options["backend"],
+             options["chave"] or None, options["compacto"])
+            for caminho, (tipo, numero_ano) in editais.items()
+        ]
+        processos = max(1, min(options["processos"], len(importacoes)))
+
+        inicio = time.perf_counter()
+        if processos == 1:
+            resultados = [self.exibir(importar_arquivo(*importacao)) for importacao in importacoes]
+        else:
+            # Os processos filhos abrem as próprias conexões com o banco
+            _fechar_conexoes()
+            with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo) as executor:
+                futuros = [executor.submit(importar_arquivo, *importacao) for importacao in importacoes]
+                resultados = [self.exibir(futuro.result()) for futuro in as_completed(futuros)]
+        duracao = time.perf_counter() - inicio
+
+        self.exibir_resumo(resultados, duracao, processos)
+
+    def validar_editais(self, editais, substituir):
+        vistos = {}
+        for caminho, edital in editais.items():
+            if edital in vistos:
+                raise CommandError(
+                    f"Os arquivos '{vistos[edital]}' e '{caminho}' são do mesmo edital "
+                    f"'{edital[0]} - {edital[1]}'."
+                )
+            vistos[edital] = caminho
+
+        if substituir:
+            return
+        for caminho, (tipo, numero_ano) in editais.items():
+            if Edital.objects.filter(tipo=tipo, numero_ano=numero_ano).exists():
+                raise CommandError(
+                    f"Já existe um edital '{tipo} - {numero_ano}' ({caminho}). "
+                    f"Use --substituir para substituí-lo."
+                )
+
+    def validar_arquivos(self, editais):
+        for caminho, (tipo, numero_ano) in editais.items():
+            edital = Edital.objects.filter(tipo=tipo, numero_ano=numero_ano).first()
+            try:
+                with open(caminho, "rb") as arquivo:
+                    relatorio = validar_arquivo(File(arquivo), edital)
+            except (OSError, ErroImportacao) as e:
+                self.stderr.write(self.style.ERROR(f"{caminho}: {e}"))
+                continue
+
+            formato = (
+                f"codificação {relatorio.codificacao}, delimitador '{relatorio.delimitador}'"
+                if relatorio.codificacao else "planilha"
+            )
+            self.stdout.write(
+                f"{caminho}: {relatorio.total_linhas} linhas, {len(relatorio.colunas)} colunas, {formato}."
+            )
+            self.stdout.write(f"  Cabeçalho: {', '.join(relatorio.colunas)}")
+            for _, texto in relatorio.mensagens:
+                self.stdout.write(f"  {texto}")
+            problemas = relatorio.problemas
+            for problema in problemas:
+                self.stdout.write(self.style.WARNING(f"  {problema}"))
+            if not problemas:
+                self.stdout.write(self.style.SUCCESS("  Nenhum problema encontrado."))
+
+    def exibir(self, resultado):
+        if "erro" in resultado:
+            self.stderr.write(self.style.ERROR(f"{resultado['arquivo']}: {resultado['erro']}"))
+            return resultado
+
+        for texto in resultado["mensagens"]:
+            self.stdout.write(f"{resultado['arquivo']}: {texto}")
+        duracao = resultado["duracao"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Edital '{resultado['edital']}' {resultado['acao']}: {resultado['linhas']} linhas "
+            f"em {duracao:.2f}s ({resultado['linhas'] / duracao if duracao else 0:.0f} linhas/s)."
+        ))
+        return resultado
+
+    def exibir_resumo(self, resultados, duracao, processos):
+        importados = [resultado for resultado in resultados if "erro" not in resultado]
+        falhas = len(resultados) - len(importados)
+        linhas = sum(resultado["linhas"] for resultado in importados)
+        megabytes = sum(resultado["bytes"] for resultado in importados) / (1024 * 1024)
+
+        if len(resultados) > 1:
+            self.stdout.write(
+                f"{len(importados)} de {len(resultados)} arquivos importados com {processos} processo(s): "
+                f"{linhas} linhas, {megabytes:.1f} MB em {duracao:.2f}s "
+                f"({linhas / duracao if duracao else 0:.0f} linhas/s, "
+                f"{megabytes / duracao if duracao else 0:.2f} MB/s)."
+            )
+        if falhas:
+            raise CommandError(f"{falhas} arquivo(s) não foram importados.")
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_import.importacao import BACKENDS
+from app_import.tarefas import pegar_proximo_job, processar_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker da fila de importações: processa os uploads enfileirados pela página inicial. "
+        "Vários workers podem rodar ao mesmo tempo; jobs de um worker que parou no meio voltam para a fila."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--uma-vez",
+            action="store_true",
+            help="Processa os jobs pendentes e termina, em vez de continuar aguardando novos jobs.",
+        )
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos de espera quando a fila está vazia.")
+        parser.add_argument(
+            "--backend",
+            choices=BACKENDS,
+            help="Forma de gravar as linhas (padrão: IMPORTACAO_BACKEND das configurações).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = pegar_proximo_job()
+            if job is None:
+                if options["uma_vez"]:
+                    break
+                time.sleep(options["intervalo"])
+                continue
+
+            self.stdout.write(f"Processando {job} (job {job.pk})...")
+            job = processar_job(job, backend=options["backend"])
+            if job.status == job.STATUS_CONCLUIDO:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Edital '{job.edital}' {job.acao}: {job.linhas_gravadas} linhas importadas."
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f"Falha na importação do job {job.pk}: {job.erro}"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app_import.busca import indexar_busca
+from app_import.models import Edital
+from app_import.schema import obter_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os valores normalizados usados pelos filtros de texto. "
+        "Útil para editais importados antes da tabela de busca existir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("edital_ids", nargs="*", type=int, help="Ids dos editais (padrão: todos).")
+
+    def handle(self, *args, **options):
+        editais = Edital.objects.order_by("id")
+        if options["edital_ids"]:
+            editais = editais.filter(id__in=options["edital_ids"])
+
+        for edital in editais:
+            with transaction.atomic():
+                campos = indexar_busca(obter_schema(edital))
+            self.stdout.write(f"{edital}: {len(campos)} campos de texto indexados.")
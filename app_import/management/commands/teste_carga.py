@@ -0,0 +1,160 @@
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from app_import.models import Edital
+from app_import_django.metricas import percentil
+
+CONCORRENCIAS = [1, 10, 50]
+
+USUARIO = "teste_carga"
+
+# Filtro usado nas requisições filtradas (detalhes e download)
+FILTROS = "filtro_Curso=Sistemas+de+Informa%C3%A7%C3%A3o&cidade_polo=Recife"
+
+TAMANHO_LEITURA = 64 * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga de um servidor já em execução: dispara requisições concorrentes às páginas de "
+        "listagem, detalhes e download de um edital e mostra vazão e latência (p50/p95/p99) para cada "
+        "nível de concorrência. Rode uma vez contra o servidor WSGI (ex: gunicorn "
+        "app_import_django.wsgi -w 2) com --saida e outra contra o ASGI com VIEWS_ASSINCRONAS=True (ex: "
+        "uvicorn app_import_django.asgi:application --workers 2) com --comparar apontando para o JSON da "
+        "primeira, que mostra lado a lado a vazão e a latência dos dois servidores."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="Endereço do servidor, ex: http://127.0.0.1:8000")
+        parser.add_argument("--edital", type=int, help="Id do edital usado (padrão: o último carregado).")
+        parser.add_argument(
+            "--concorrencia", type=int, nargs="+", default=CONCORRENCIAS,
+            help="Quantidades de requisições simultâneas medidas (padrão: 1 10 50).",
+        )
+        parser.add_argument("--requisicoes", type=int, default=200, help="Requisições por nível de concorrência.")
+        parser.add_argument("--saida", help="Arquivo JSON com os resultados.")
+        parser.add_argument("--rotulo", help="Nome do servidor medido, gravado no JSON (ex: wsgi, asgi).")
+        parser.add_argument(
+            "--comparar", help="JSON de uma execução anterior (ex: a do WSGI), para comparar com esta.",
+        )
+
+    def handle(self, *args, **options):
+        if options["edital"]:
+            edital = Edital.objects.filter(pk=options["edital"]).first()
+        else:
+            edital = Edital.objects.order_by("-uploaded_at").first()
+        if edital is None:
+            raise CommandError("Nenhum edital encontrado; importe um (ex: gerar_edital_sintetico) antes do teste.")
+
+        # O servidor usa o mesmo banco, então a sessão criada aqui vale para as requisições.
+        # A conta é descartável e tem nome único, para o DELETE do fim não levar a de ninguém
+        usuario = User.objects.create_user(f"{USUARIO}_{uuid.uuid4().hex[:12]}")
+        cliente = Client()
+        cliente.force_login(usuario)
+        self.cookie = f"{settings.SESSION_COOKIE_NAME}={cliente.cookies[settings.SESSION_COOKIE_NAME].value}"
+        self.url = options["url"].rstrip("/")
+
+        caminhos = [
+            reverse("listar_editais"),
+            reverse("detalhe_edital", args=[edital.pk]),
+            f"{reverse('detalhe_edital', args=[edital.pk])}?{FILTROS}",
+            f"{reverse('download_edital_csv', args=[edital.pk])}?{FILTROS}",
+            reverse("download_edital_csv", args=[edital.pk]),
+        ]
+        self.rotulo = options["rotulo"] or self.url
+        self.stdout.write(f"Edital {edital} em {self.rotulo}:")
+
+        resultados = []
+        try:
+            for concorrencia in options["concorrencia"]:
+                resultados.append(self.medir(concorrencia, options["requisicoes"], caminhos))
+        finally:
+            usuario.delete()
+
+        if options["saida"]:
+            relatorio = {
+                "url": self.url,
+                "rotulo": self.rotulo,
+                "edital": edital.pk,
+                "data": timezone.now().isoformat(),
+                "caminhos": caminhos,
+                "resultados": resultados,
+            }
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {options['saida']}."))
+
+        if options["comparar"]:
+            self.comparar(options["comparar"], resultados)
+
+    def requisitar(self, caminho):
+        requisicao = urllib.request.Request(self.url + caminho, headers={"Cookie": self.cookie})
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(requisicao, timeout=300) as resposta:
+                # O download só termina quando o último bloco chega
+                while resposta.read(TAMANHO_LEITURA):
+                    pass
+                status = resposta.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = None
+        return status, (time.perf_counter() - inicio) * 1000
+
+    def medir(self, concorrencia, quantidade, caminhos):
+        fila = cycle(caminhos)
+        lote = [next(fila) for _ in range(quantidade)]
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            respostas = list(executor.map(self.requisitar, lote))
+        duracao = time.perf_counter() - inicio
+
+        latencias = [tempo for status, tempo in respostas if status == 200]
+        resultado = {
+            "concorrencia": concorrencia,
+            "requisicoes": quantidade,
+            "erros": sum(1 for status, _ in respostas if status != 200),
+            "duracao": duracao,
+            "requisicoes_por_segundo": quantidade / duracao,
+            **{f"p{p}_ms": percentil(latencias, p) for p in (50, 95, 99)},
+        }
+        linha = (
+            f"  concorrência {concorrencia:>4}: {resultado['requisicoes_por_segundo']:7.1f} req/s  "
+            f"p50 {resultado['p50_ms'] or 0:8.1f} ms  p95 {resultado['p95_ms'] or 0:8.1f} ms  "
+            f"p99 {resultado['p99_ms'] or 0:8.1f} ms  erros {resultado['erros']}"
+        )
+        self.stdout.write(self.style.WARNING(linha) if resultado["erros"] else linha)
+        return resultado
+
+    def comparar(self, caminho, resultados):
+        with open(caminho, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        anteriores = {r["concorrencia"]: r for r in anterior["resultados"]}
+        rotulo_anterior = anterior.get("rotulo") or anterior.get("url") or caminho
+
+        self.stdout.write(f"Comparação de {self.rotulo} com {rotulo_anterior} ({caminho}):")
+        for resultado in resultados:
+            outro = anteriores.get(resultado["concorrencia"])
+            if outro is None:
+                continue
+            # Acima de 1: este servidor atendeu mais requisições por segundo que o anterior
+            razao = resultado["requisicoes_por_segundo"] / outro["requisicoes_por_segundo"]
+            linha = (
+                f"  concorrência {resultado['concorrencia']:>4}: "
+                f"{outro['requisicoes_por_segundo']:7.1f} -> {resultado['requisicoes_por_segundo']:7.1f} req/s "
+                f"({razao:.2f}x)  p95 {outro['p95_ms'] or 0:8.1f} -> {resultado['p95_ms'] or 0:8.1f} ms"
+            )
+            self.stdout.write(self.style.WARNING(linha) if razao < 1 else linha)
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0003_remove_importeddata_coluna1_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EditalSchema',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('colunas', models.JSONField(default=list)),
+                ('campos_texto', models.JSONField(default=list)),
+                ('campos_dropdown', models.JSONField(default=list)),
+                ('campos_polo', models.JSONField(default=list)),
+                ('valores_campos', models.JSONField(default=dict)),
+                ('cidades_polo', models.JSONField(default=dict)),
+                ('valores_polo_origem', models.JSONField(default=dict)),
+                ('total_linhas', models.PositiveIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('edital', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='schema', to='app_import.edital')),
+            ],
+            options={
+                'verbose_name': 'Esquema do Edital',
+                'verbose_name_plural': 'Esquemas dos Editais',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0004_editalschema'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('Alunos', 'Alunos'), ('Bolsistas', 'Bolsistas')], max_length=10)),
+                ('numero_ano', models.CharField(max_length=50)),
+                ('arquivo', models.FileField(blank=True, upload_to='importacoes/')),
+                ('nome_arquivo', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluido', 'Concluído'), ('erro', 'Erro')], db_index=True, default='pendente', max_length=20)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('linhas_lidas', models.PositiveIntegerField(default=0)),
+                ('linhas_gravadas', models.PositiveIntegerField(default=0)),
+                ('acao', models.CharField(blank=True, max_length=20)),
+                ('mensagens', models.JSONField(blank=True, default=list)),
+                ('erro', models.TextField(blank=True)),
+                ('criado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='importacoes', to=settings.AUTH_USER_MODEL)),
+                ('edital', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='importacoes', to='app_import.edital')),
+            ],
+            options={
+                'verbose_name': 'Importação',
+                'verbose_name_plural': 'Importações',
+                'ordering': ['-criado_em'],
+            },
+        ),
+    ]
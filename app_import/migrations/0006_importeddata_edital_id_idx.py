@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0005_importjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='importeddata',
+            index=models.Index(fields=['edital', 'id'], name='importeddata_edital_id_idx'),
+        ),
+    ]
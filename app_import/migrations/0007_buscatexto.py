@@ -0,0 +1,59 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+INDICE_TRIGRAMA = "buscatexto_valor_trgm_idx"
+
+
+def criar_indice_trigrama(apps, schema_editor):
+    # O índice GIN de trigramas atende LIKE '%termo%' nas buscas por nome/documento.
+    # Depende da extensão pg_trgm (contrib); sem ela a busca continua funcionando,
+    # apenas sem esse índice.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDICE_TRIGRAMA} ON app_import_buscatexto USING gin (valor gin_trgm_ops)"
+    )
+
+
+def remover_indice_trigrama(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDICE_TRIGRAMA}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0006_importeddata_edital_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='editalschema',
+            name='campos_busca',
+            field=models.JSONField(default=list),
+        ),
+        migrations.CreateModel(
+            name='BuscaTexto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campo', models.TextField()),
+                ('valor', models.TextField()),
+                ('edital', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buscas', to='app_import.edital')),
+                ('inscrito', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='buscas', to='app_import.importeddata')),
+            ],
+            options={
+                'verbose_name': 'Valor de Busca',
+                'verbose_name_plural': 'Valores de Busca',
+                'indexes': [models.Index(fields=['edital', 'campo'], name='buscatexto_edital_campo_idx')],
+            },
+        ),
+        migrations.RunPython(criar_indice_trigrama, remover_indice_trigrama),
+    ]
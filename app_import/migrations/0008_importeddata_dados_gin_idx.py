@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:17
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0007_buscatexto'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='importeddata',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['dados_linha'], name='importeddata_dados_gin_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0008_importeddata_dados_gin_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='chave_substituicao',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
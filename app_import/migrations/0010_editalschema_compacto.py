@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0009_importjob_chave_substituicao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='editalschema',
+            name='compacto',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:34
+
+from django.db import migrations, models
+
+# Mesmo valor de app_import.busca.TAMANHO_MAXIMO_VALOR_BUSCA
+TAMANHO_MAXIMO_VALOR_BUSCA = 500
+
+
+def truncar_valores_longos(apps, schema_editor):
+    # Entradas de um índice B-tree têm limite de tamanho (~2,7 KB); os valores
+    # já gravados são cortados como os novos passam a ser em indexar_busca.
+    BuscaTexto = apps.get_model("app_import", "BuscaTexto")
+    schema_editor.execute(
+        f"UPDATE {BuscaTexto._meta.db_table} SET valor = LEFT(valor, %s) WHERE LENGTH(valor) > %s",
+        [TAMANHO_MAXIMO_VALOR_BUSCA, TAMANHO_MAXIMO_VALOR_BUSCA],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0010_editalschema_compacto'),
+    ]
+
+    operations = [
+        migrations.RunPython(truncar_valores_longos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='buscatexto',
+            index=models.Index(fields=['valor'], name='buscatexto_valor_prefixo_idx', opclasses=['text_pattern_ops']),
+        ),
+    ]
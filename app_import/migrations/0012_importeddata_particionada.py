@@ -0,0 +1,98 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABELA = "app_import_importeddata"
+# Tabela montada ao lado da atual durante a conversão (nos dois sentidos)
+TABELA_NOVA = f"{TABELA}_conversao"
+# Mesmos nomes usados por app_import.particoes
+PARTICAO_PADRAO = f"{TABELA}_padrao"
+CHAVE_ESTRANGEIRA = f"{TABELA}_edital_id_fk"
+
+
+def verificar_linhas_sem_edital(apps, schema_editor):
+    # Na tabela particionada toda linha pertence a um edital (edital_id entra na chave primária)
+    ImportedData = apps.get_model("app_import", "ImportedData")
+    total = ImportedData.objects.filter(edital__isnull=True).count()
+    if total:
+        raise RuntimeError(
+            f"{total} linha(s) de ImportedData sem edital. Apague-as ou associe-as a um edital "
+            f"antes de aplicar esta migração."
+        )
+
+
+def _criar_restricoes_e_indices(apps, schema_editor):
+    ImportedData = apps.get_model("app_import", "ImportedData")
+    schema_editor.execute(
+        f"ALTER TABLE {TABELA} ADD CONSTRAINT {CHAVE_ESTRANGEIRA} FOREIGN KEY (edital_id) "
+        f"REFERENCES app_import_edital (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+    for index in ImportedData._meta.indexes:
+        schema_editor.add_index(ImportedData, index)
+
+
+def particionar(apps, schema_editor):
+    # A tabela de inscritos passa a ser particionada por LIST em edital_id: cada edital
+    # tem a sua partição, e substituir ou apagar um edital troca ou remove a partição
+    # inteira em vez de apagar linha a linha (ver app_import.particoes). A partição
+    # padrão recebe as linhas de editais que ainda não têm partição própria.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Edital = apps.get_model("app_import", "Edital")
+    execute = schema_editor.execute
+
+    execute(
+        f"CREATE TABLE {TABELA_NOVA} (id bigint NOT NULL, edital_id bigint NOT NULL, dados_linha jsonb NOT NULL) "
+        f"PARTITION BY LIST (edital_id)"
+    )
+    execute(f"CREATE TABLE {PARTICAO_PADRAO} PARTITION OF {TABELA_NOVA} DEFAULT")
+    for edital_id in Edital.objects.order_by("pk").values_list("pk", flat=True):
+        execute(f"CREATE TABLE {TABELA}_{edital_id} PARTITION OF {TABELA_NOVA} FOR VALUES IN ({edital_id})")
+    execute(f"INSERT INTO {TABELA_NOVA} (id, edital_id, dados_linha) SELECT id, edital_id, dados_linha FROM {TABELA}")
+    execute(f"DROP TABLE {TABELA}")
+    execute(f"ALTER TABLE {TABELA_NOVA} RENAME TO {TABELA}")
+
+    # A chave primária de uma tabela particionada precisa incluir a coluna de partição;
+    # o id continua vindo de uma sequência única para todas as partições.
+    execute(f"ALTER TABLE {TABELA} ADD PRIMARY KEY (id, edital_id)")
+    execute(f"CREATE SEQUENCE {TABELA}_id_seq OWNED BY {TABELA}.id")
+    execute(f"SELECT setval('{TABELA}_id_seq', COALESCE((SELECT MAX(id) FROM {TABELA}), 0) + 1, false)")
+    execute(f"ALTER TABLE {TABELA} ALTER COLUMN id SET DEFAULT nextval('{TABELA}_id_seq')")
+    _criar_restricoes_e_indices(apps, schema_editor)
+
+
+def desparticionar(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    execute = schema_editor.execute
+
+    execute(
+        f"CREATE TABLE {TABELA_NOVA} (id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, "
+        f"edital_id bigint NOT NULL, dados_linha jsonb NOT NULL)"
+    )
+    execute(f"INSERT INTO {TABELA_NOVA} (id, edital_id, dados_linha) SELECT id, edital_id, dados_linha FROM {TABELA}")
+    # Leva junto as partições e a sequência
+    execute(f"DROP TABLE {TABELA}")
+    execute(f"ALTER TABLE {TABELA_NOVA} RENAME TO {TABELA}")
+    execute(f"ALTER TABLE {TABELA} RENAME CONSTRAINT {TABELA_NOVA}_pkey TO {TABELA}_pkey")
+    execute(f"ALTER SEQUENCE {TABELA_NOVA}_id_seq RENAME TO {TABELA}_id_seq")
+    execute(f"SELECT setval('{TABELA}_id_seq', COALESCE((SELECT MAX(id) FROM {TABELA}), 0) + 1, false)")
+    _criar_restricoes_e_indices(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0011_buscatexto_valor_prefixo_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_linhas_sem_edital, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='importeddata',
+            name='edital',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='dados_importados', to='app_import.edital'),
+        ),
+        migrations.RunPython(particionar, desparticionar),
+    ]
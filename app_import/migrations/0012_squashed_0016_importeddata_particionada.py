@@ -0,0 +1,167 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:30
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Junta as migrações 0012 a 0016. Entre elas a chave estrangeira de ImportedData para Edital
+# foi criada (DEFERRABLE), removida (0014) e recriada fora da tabela particionada (0016); aqui
+# ela vai direto para o estado final:
+# - no PostgreSQL a tabela é particionada e não tem a chave estrangeira: a troca de partição
+#   confere e bloqueia a linha do edital, e apagar o edital remove a partição dele (ver
+#   app_import.particoes);
+# - nos demais bancos a tabela não é particionada e a chave estrangeira continua existindo.
+# Bancos que já aplicaram alguma das migrações substituídas continuam por elas.
+
+TABELA = "app_import_importeddata"
+# Tabela montada ao lado da atual durante a conversão (nos dois sentidos)
+TABELA_NOVA = f"{TABELA}_conversao"
+# Mesmos nomes usados por app_import.particoes
+PARTICAO_PADRAO = f"{TABELA}_padrao"
+CHAVE_ESTRANGEIRA = f"{TABELA}_edital_id_fk"
+
+INDICE_PREFIXO = models.Index(
+    django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Left('valor', 500), name='text_pattern_ops'),
+    name='buscatexto_valor_prefixo_idx',
+)
+
+
+def verificar_linhas_sem_edital(apps, schema_editor):
+    # Na tabela particionada toda linha pertence a um edital (edital_id entra na chave primária)
+    ImportedData = apps.get_model("app_import", "ImportedData")
+    total = ImportedData.objects.filter(edital__isnull=True).count()
+    if total:
+        raise RuntimeError(
+            f"{total} linha(s) de ImportedData sem edital. Apague-as ou associe-as a um edital "
+            f"antes de aplicar esta migração."
+        )
+
+
+def _criar_indices(apps, schema_editor):
+    ImportedData = apps.get_model("app_import", "ImportedData")
+    for index in ImportedData._meta.indexes:
+        schema_editor.add_index(ImportedData, index)
+
+
+def particionar(apps, schema_editor):
+    # A tabela de inscritos passa a ser particionada por LIST em edital_id: cada edital
+    # tem a sua partição, e substituir ou apagar um edital troca ou remove a partição
+    # inteira em vez de apagar linha a linha. A partição padrão recebe as linhas de
+    # editais que ainda não têm partição própria.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Edital = apps.get_model("app_import", "Edital")
+    execute = schema_editor.execute
+
+    execute(
+        f"CREATE TABLE {TABELA_NOVA} (id bigint NOT NULL, edital_id bigint NOT NULL, dados_linha jsonb NOT NULL) "
+        f"PARTITION BY LIST (edital_id)"
+    )
+    execute(f"CREATE TABLE {PARTICAO_PADRAO} PARTITION OF {TABELA_NOVA} DEFAULT")
+    for edital_id in Edital.objects.order_by("pk").values_list("pk", flat=True):
+        execute(f"CREATE TABLE {TABELA}_{edital_id} PARTITION OF {TABELA_NOVA} FOR VALUES IN ({edital_id})")
+    execute(f"INSERT INTO {TABELA_NOVA} (id, edital_id, dados_linha) SELECT id, edital_id, dados_linha FROM {TABELA}")
+    # Leva junto a chave estrangeira da tabela anterior
+    execute(f"DROP TABLE {TABELA}")
+    execute(f"ALTER TABLE {TABELA_NOVA} RENAME TO {TABELA}")
+
+    # A chave primária de uma tabela particionada precisa incluir a coluna de partição;
+    # o id continua vindo de uma sequência única para todas as partições.
+    execute(f"ALTER TABLE {TABELA} ADD PRIMARY KEY (id, edital_id)")
+    execute(f"CREATE SEQUENCE {TABELA}_id_seq OWNED BY {TABELA}.id")
+    execute(f"SELECT setval('{TABELA}_id_seq', COALESCE((SELECT MAX(id) FROM {TABELA}), 0) + 1, false)")
+    execute(f"ALTER TABLE {TABELA} ALTER COLUMN id SET DEFAULT nextval('{TABELA}_id_seq')")
+    _criar_indices(apps, schema_editor)
+
+
+def desparticionar(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    execute = schema_editor.execute
+
+    execute(
+        f"CREATE TABLE {TABELA_NOVA} (id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, "
+        f"edital_id bigint NOT NULL, dados_linha jsonb NOT NULL)"
+    )
+    execute(f"INSERT INTO {TABELA_NOVA} (id, edital_id, dados_linha) SELECT id, edital_id, dados_linha FROM {TABELA}")
+    # Leva junto as partições e a sequência
+    execute(f"DROP TABLE {TABELA}")
+    execute(f"ALTER TABLE {TABELA_NOVA} RENAME TO {TABELA}")
+    execute(f"ALTER TABLE {TABELA} RENAME CONSTRAINT {TABELA_NOVA}_pkey TO {TABELA}_pkey")
+    execute(f"ALTER SEQUENCE {TABELA_NOVA}_id_seq RENAME TO {TABELA}_id_seq")
+    execute(f"SELECT setval('{TABELA}_id_seq', COALESCE((SELECT MAX(id) FROM {TABELA}), 0) + 1, false)")
+    # A tabela sem partições volta a ter a chave estrangeira, como antes da 0012
+    execute(
+        f"ALTER TABLE {TABELA} ADD CONSTRAINT {CHAVE_ESTRANGEIRA} FOREIGN KEY (edital_id) "
+        f"REFERENCES app_import_edital (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+    _criar_indices(apps, schema_editor)
+
+
+def _indice_do_banco(schema_editor):
+    # text_pattern_ops (LIKE 'termo%' em qualquer collation) só existe no PostgreSQL
+    if schema_editor.connection.vendor == "postgresql":
+        return INDICE_PREFIXO
+    return models.Index(django.db.models.functions.text.Left('valor', 500), name=INDICE_PREFIXO.name)
+
+
+def criar_indice_prefixo(apps, schema_editor):
+    schema_editor.add_index(apps.get_model("app_import", "BuscaTexto"), _indice_do_banco(schema_editor))
+
+
+def remover_indice_prefixo(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model("app_import", "BuscaTexto"), _indice_do_banco(schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('app_import', '0012_importeddata_particionada'),
+        ('app_import', '0013_edital_resumo'),
+        ('app_import', '0014_importeddata_edital_sem_restricao'),
+        ('app_import', '0015_buscatexto_valor_inteiro'),
+        ('app_import', '0016_importeddata_edital_restricao'),
+    ]
+
+    dependencies = [
+        ('app_import', '0011_buscatexto_valor_prefixo_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_linhas_sem_edital, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='importeddata',
+            name='edital',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='dados_importados', to='app_import.edital'),
+        ),
+        migrations.RunPython(particionar, desparticionar),
+        migrations.AddField(
+            model_name='edital',
+            name='duracao_importacao',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='edital',
+            name='tamanho_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='edital',
+            name='total_colunas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='edital',
+            name='total_linhas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RemoveIndex(
+            model_name='buscatexto',
+            name='buscatexto_valor_prefixo_idx',
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name='buscatexto', index=INDICE_PREFIXO)],
+            database_operations=[migrations.RunPython(criar_indice_prefixo, remover_indice_prefixo)],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0012_importeddata_particionada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='edital',
+            name='duracao_importacao',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='edital',
+            name='tamanho_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='edital',
+            name='total_colunas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='edital',
+            name='total_linhas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0013_edital_resumo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importeddata',
+            name='edital',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='dados_importados', to='app_import.edital'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:51
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+INDICE_PREFIXO = models.Index(
+    django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Left('valor', 500), name='text_pattern_ops'),
+    name='buscatexto_valor_prefixo_idx',
+)
+
+
+def _indice_do_banco(schema_editor):
+    # text_pattern_ops (LIKE 'termo%' em qualquer collation) só existe no PostgreSQL
+    if schema_editor.connection.vendor == "postgresql":
+        return INDICE_PREFIXO
+    return models.Index(django.db.models.functions.text.Left('valor', 500), name=INDICE_PREFIXO.name)
+
+
+def criar_indice_prefixo(apps, schema_editor):
+    schema_editor.add_index(apps.get_model("app_import", "BuscaTexto"), _indice_do_banco(schema_editor))
+
+
+def remover_indice_prefixo(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model("app_import", "BuscaTexto"), _indice_do_banco(schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0014_importeddata_edital_sem_restricao'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='buscatexto',
+            name='buscatexto_valor_prefixo_idx',
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name='buscatexto', index=INDICE_PREFIXO)],
+            database_operations=[migrations.RunPython(criar_indice_prefixo, remover_indice_prefixo)],
+        ),
+    ]
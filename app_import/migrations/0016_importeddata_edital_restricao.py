@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:20
+
+import copy
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABELA = "app_import_importeddata"
+
+
+def _particionada(schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABELA])
+        linha = cursor.fetchone()
+    return linha is not None and linha[0] == "p"
+
+
+def _alterar_restricao(apps, schema_editor, antes, depois):
+    # A chave estrangeira volta em todos os bancos, menos na tabela particionada do PostgreSQL:
+    # lá ela teria de ser criada em cada partição nova, bloqueando a tabela de editais durante a
+    # troca de partição, e importações em paralelo passariam a esperar umas pelas outras
+    # (ver app_import.particoes). A migração 0014 a tinha removido em todos os bancos.
+    if _particionada(schema_editor):
+        return
+    ImportedData = apps.get_model("app_import", "ImportedData")
+    campo_antes = copy.copy(ImportedData._meta.get_field("edital"))
+    campo_depois = copy.copy(campo_antes)
+    campo_antes.db_constraint, campo_depois.db_constraint = antes, depois
+    schema_editor.alter_field(ImportedData, campo_antes, campo_depois)
+
+
+def criar_restricao(apps, schema_editor):
+    _alterar_restricao(apps, schema_editor, False, True)
+
+
+def remover_restricao(apps, schema_editor):
+    _alterar_restricao(apps, schema_editor, True, False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0015_buscatexto_valor_inteiro'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='importeddata',
+                    name='edital',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='dados_importados', to='app_import.edital'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(criar_restricao, remover_restricao),
+            ],
+        ),
+    ]
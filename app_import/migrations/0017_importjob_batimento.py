@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0016_importeddata_edital_restricao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='batimento_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='tentativas',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
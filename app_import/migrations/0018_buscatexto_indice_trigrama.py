@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:10
+
+import logging
+
+from django.db import migrations
+
+INDICE_TRIGRAMA = "buscatexto_valor_trgm_idx"
+
+SQL_INDICE_TRIGRAMA = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {INDICE_TRIGRAMA} ON app_import_buscatexto USING gin (valor gin_trgm_ops)",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def criar_indice_trigrama(apps, schema_editor):
+    # A 0007 deixava de criar o índice em silêncio quando faltava a extensão pg_trgm. Sem
+    # ele, cada busca por texto lê a tabela inteira: cria o índice se a extensão tiver sido
+    # instalada depois e, se ainda faltar, avisa como criá-lo.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning(
+                "A extensão pg_trgm não está disponível neste PostgreSQL: o índice %s não foi criado "
+                "e as buscas por texto vão ler a tabela inteira. Instale o pacote contrib do "
+                "PostgreSQL e crie o índice com: %s",
+                INDICE_TRIGRAMA, "; ".join(SQL_INDICE_TRIGRAMA),
+            )
+            return
+    for sql in SQL_INDICE_TRIGRAMA:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_import', '0017_importjob_batimento'),
+    ]
+
+    operations = [
+        # O índice continua sendo removido pela reversão da 0007
+        migrations.RunPython(criar_indice_trigrama, migrations.RunPython.noop),
+    ]
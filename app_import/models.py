@@ -1,5 +1,11 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Left
+
+# Caracteres do início de BuscaTexto.valor guardados no índice de prefixo (as entradas de
+# um índice B-tree têm limite de tamanho, ~2,7 KB); o valor em si é gravado inteiro
+TAMANHO_PREFIXO_BUSCA = 500
 
 # Modelo para armazenar informações sobre o Edital
 class Edital(models.Model):
@@ -14,6 +20,13 @@ class Edital(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     last_modified_at = models.DateTimeField(auto_now=True)
     last_modified_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="editais_modified")
+    # Resumo da última importação (importacao.atualizar_resumo; para editais antigos, o comando
+    # atualizar_resumo_editais), para a lista de editais não precisar consultar os inscritos
+    total_linhas = models.PositiveIntegerField(default=0)
+    total_colunas = models.PositiveIntegerField(default=0)
+    # Bytes ocupados pelos dados das linhas no banco
+    tamanho_bytes = models.BigIntegerField(default=0)
+    duracao_importacao = models.DurationField(null=True, blank=True)
 
     class Meta:
         # Garante que a combinação de tipo e numero_ano seja única
@@ -25,13 +38,172 @@ class Edital(models.Model):
         return f"{self.get_tipo_display()} - {self.numero_ano}"
 
 # Modelo para armazenar os dados importados do CSV, agora usando JSONField
+def linha_como_dict(dados_linha, colunas):
+    # Linhas no formato compacto são listas de valores na ordem das colunas do esquema
+    if isinstance(dados_linha, list):
+        return dict(zip(colunas, dados_linha))
+    return dados_linha
+
+
 class ImportedData(models.Model):
-    edital = models.ForeignKey(Edital, on_delete=models.CASCADE, related_name="dados_importados", null=True, blank=True) 
-    # Campo JSON para armazenar os dados da linha do CSV (chave=cabeçalho, valor=dado da linha)
+    # No PostgreSQL a tabela é particionada por LIST em edital_id, uma partição por edital
+    # (ver particoes.py); edital_id faz parte da chave primária no banco e por isso é obrigatório.
+    # Dentro de cada partição um índice só de edital_id não ajudaria; importeddata_edital_id_idx basta.
+    # A tabela particionada não tem a chave estrangeira no banco (migração 0016): criá-la em cada
+    # partição nova bloquearia a tabela de editais e faria importações em paralelo esperarem umas
+    # pelas outras. Lá a troca de partição bloqueia a linha do edital, e apagar o edital remove a
+    # partição (particoes.py). Nos demais bancos a chave estrangeira continua existindo.
+    edital = models.ForeignKey(Edital, on_delete=models.CASCADE, related_name="dados_importados", db_index=False)
+    # Campo JSON para armazenar os dados da linha do CSV (chave=cabeçalho, valor=dado da linha).
+    # No formato compacto (EditalSchema.compacto), guarda apenas a lista de valores, na ordem
+    # de EditalSchema.colunas; use "dados" para ler a linha sempre como dicionário.
     dados_linha = models.JSONField()
 
+    class Meta:
+        indexes = [
+            # Atende a paginação por cursor: WHERE edital_id = ... AND id > ... ORDER BY id
+            models.Index(fields=["edital", "id"], name="importeddata_edital_id_idx"),
+            # Atende os filtros de igualdade (dropdowns e polo de origem), feitos com @> (contenção)
+            GinIndex(fields=["dados_linha"], opclasses=["jsonb_path_ops"], name="importeddata_dados_gin_idx"),
+        ]
+
     def __str__(self):
         # Tenta obter um nome ou identificador dos dados JSON para melhor representação
-        nome = self.dados_linha.get("Nome") or self.dados_linha.get("nome") or list(self.dados_linha.values())[0] or "N/A"
+        dados = self.dados
+        nome = dados.get("Nome") or dados.get("nome") or next(iter(dados.values()), None) or "N/A"
         return f"Dado para {self.edital} - {nome}"
 
+    @property
+    def dados(self):
+        """
+        A linha como dicionário {coluna: valor}, qualquer que seja o formato
+        gravado. No formato compacto as colunas vêm do esquema do edital, então
+        ao listar muitas linhas convém trazer `edital` e `edital__schema` junto.
+        """
+        if isinstance(self.dados_linha, list):
+            return linha_como_dict(self.dados_linha, self.edital.schema.colunas)
+        return self.dados_linha
+
+
+# Modelo com os valores dos campos de texto (nome, CPF, RG...) já normalizados para busca:
+# sem acentos, em minúsculas e, nos documentos, só com letras e números.
+# É preenchido na importação e consultado pelos filtros "texto_" com um índice de trigramas.
+class BuscaTexto(models.Model):
+    # Sem restrição no banco e sem cascata pelo ORM, para que apagar as linhas de um edital
+    # continue sendo um único DELETE; as linhas de busca são apagadas junto, pelo edital.
+    inscrito = models.ForeignKey(ImportedData, on_delete=models.DO_NOTHING, db_constraint=False, related_name="buscas")
+    edital = models.ForeignKey(Edital, on_delete=models.CASCADE, related_name="buscas")
+    campo = models.TextField()
+    valor = models.TextField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["edital", "campo"], name="buscatexto_edital_campo_idx"),
+            # Busca em todos os editais: igualdade e prefixo (LIKE 'termo%') do valor normalizado
+            models.Index(
+                OpClass(Left("valor", TAMANHO_PREFIXO_BUSCA), name="text_pattern_ops"),
+                name="buscatexto_valor_prefixo_idx",
+            ),
+        ]
+        verbose_name = "Valor de Busca"
+        verbose_name_plural = "Valores de Busca"
+
+    def __str__(self):
+        return f"{self.campo}: {self.valor}"
+
+# Modelo para armazenar o esquema de colunas e o catálogo de valores dos filtros de um Edital.
+# É calculado uma única vez na importação (e refeito a cada substituição),
+# para que a página de detalhes não precise percorrer todas as linhas do edital.
+class EditalSchema(models.Model):
+    edital = models.OneToOneField(Edital, on_delete=models.CASCADE, related_name="schema")
+    # Colunas na ordem em que aparecem no cabeçalho do CSV
+    colunas = models.JSONField(default=list)
+    # Classificação dos campos usada pelos filtros da página de detalhes
+    campos_texto = models.JSONField(default=list)
+    campos_dropdown = models.JSONField(default=list)
+    campos_polo = models.JSONField(default=list)
+    # Campos de texto com valores normalizados em BuscaTexto
+    campos_busca = models.JSONField(default=list)
+    # Se True, as linhas do edital guardam só a lista de valores, na ordem de "colunas"
+    compacto = models.BooleanField(default=False)
+    # Valores distintos com suas contagens: {campo: {valor: quantidade}}
+    valores_campos = models.JSONField(default=dict)
+    # Cidades extraídas dos campos de polo e valores de "Polo de Origem": {valor: quantidade}
+    cidades_polo = models.JSONField(default=dict)
+    valores_polo_origem = models.JSONField(default=dict)
+    total_linhas = models.PositiveIntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Esquema do Edital"
+        verbose_name_plural = "Esquemas dos Editais"
+
+    def __str__(self):
+        return f"Esquema de {self.edital}"
+
+    def como_dict(self, dados_linha):
+        return linha_como_dict(dados_linha, self.colunas)
+
+    @property
+    def campos_filtro(self):
+        # Mesmo formato retornado por identificar_campos_filtro: {campo: [valores ordenados]}
+        return {campo: sorted(valores) for campo, valores in self.valores_campos.items()}
+
+    @property
+    def cidades_disponiveis(self):
+        return sorted(self.cidades_polo)
+
+    @property
+    def lista_polo_origem(self):
+        return sorted(self.valores_polo_origem)
+
+# Modelo para a fila de importações processadas em segundo plano.
+# O upload apenas grava o arquivo e cria o job; o comando "processar_importacoes"
+# pega os jobs pendentes, importa os dados e vai registrando o progresso.
+class ImportJob(models.Model):
+    STATUS_PENDENTE = "pendente"
+    STATUS_PROCESSANDO = "processando"
+    STATUS_CONCLUIDO = "concluido"
+    STATUS_ERRO = "erro"
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, "Pendente"),
+        (STATUS_PROCESSANDO, "Processando"),
+        (STATUS_CONCLUIDO, "Concluído"),
+        (STATUS_ERRO, "Erro"),
+    ]
+
+    tipo = models.CharField(max_length=10, choices=Edital.TIPO_CHOICES)
+    numero_ano = models.CharField(max_length=50)
+    arquivo = models.FileField(upload_to="importacoes/", blank=True)
+    nome_arquivo = models.CharField(max_length=255)
+    # Coluna (ou "hash") usada na substituição incremental; vazio apaga e reinsere tudo
+    chave_substituicao = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDENTE, db_index=True)
+    criado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="importacoes")
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+    # Progresso, atualizado a cada lote gravado
+    linhas_lidas = models.PositiveIntegerField(default=0)
+    linhas_gravadas = models.PositiveIntegerField(default=0)
+    # Último sinal de vida do worker enquanto processa o job (ver tarefas.Batimento); sem ele
+    # por muito tempo, o worker morreu e o job volta para a fila. Tentativas conta as retomadas.
+    batimento_em = models.DateTimeField(null=True, blank=True)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    # Resultado: edital criado/substituído, mensagens no formato [nível, texto] e erro, se houver
+    edital = models.ForeignKey(Edital, on_delete=models.SET_NULL, null=True, blank=True, related_name="importacoes")
+    acao = models.CharField(max_length=20, blank=True)
+    mensagens = models.JSONField(default=list, blank=True)
+    erro = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-criado_em"]
+        verbose_name = "Importação"
+        verbose_name_plural = "Importações"
+
+    def __str__(self):
+        return f"Importação de {self.nome_arquivo} ({self.get_status_display()})"
+
+    @property
+    def finalizado(self):
+        return self.status in (self.STATUS_CONCLUIDO, self.STATUS_ERRO)
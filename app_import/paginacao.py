@@ -0,0 +1,150 @@
+"""
+Paginação por cursor (keyset) da tabela de inscritos.
+
+Em vez de OFFSET, cada página guarda o id do último (ou primeiro) inscrito
+exibido, e a próxima consulta pede apenas os ids depois (ou antes) dele.
+Assim a página 1.000 custa o mesmo que a primeira e não é preciso rodar um
+COUNT(*) para paginar.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+TAMANHO_PAGINA = 50
+
+# Parâmetros GET que carregam o cursor
+PARAMETRO_APOS = 'apos'
+PARAMETRO_ANTES = 'antes'
+
+# Tempo de vida dos resultados guardados em cache (a chave já muda quando o edital é substituído)
+TEMPO_CACHE_CONTAGEM = 60 * 60
+
+# Tempo de vida do HTML da tabela de inscritos de uma página (fragmento do template de detalhes)
+TEMPO_CACHE_TABELA = 10 * 60
+
+
+class PaginaCursor:
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def cursor_proximo(self):
+        return chave_do_item(self.object_list[-1]) if self.object_list else None
+
+    @property
+    def cursor_anterior(self):
+        return chave_do_item(self.object_list[0]) if self.object_list else None
+
+
+def chave_do_item(item):
+    # Instância de modelo ou dicionário de .values() com o "id"
+    return item['id'] if isinstance(item, dict) else item.pk
+
+
+def ler_cursor(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _consulta_da_pagina(queryset, apos, antes, tamanho):
+    # Um item a mais que o tamanho da página indica se existe a página seguinte (ou anterior)
+    if antes is not None:
+        return queryset.filter(pk__lt=antes).order_by('-pk')[:tamanho + 1]
+    if apos is not None:
+        queryset = queryset.filter(pk__gt=apos)
+    return queryset.order_by('pk')[:tamanho + 1]
+
+
+def _montar_pagina(itens, apos, antes, tamanho):
+    if antes is not None:
+        has_previous = len(itens) > tamanho
+        itens = itens[:tamanho]
+        itens.reverse()
+        return PaginaCursor(itens, has_next=True, has_previous=has_previous)
+
+    has_next = len(itens) > tamanho
+    return PaginaCursor(itens[:tamanho], has_next=has_next, has_previous=apos is not None)
+
+
+def paginar_por_cursor(queryset, apos=None, antes=None, tamanho=TAMANHO_PAGINA):
+    """
+    Retorna a página de `queryset` imediatamente depois do id `apos` ou
+    imediatamente antes do id `antes` (sem nenhum dos dois, a primeira página).
+    """
+    itens = list(_consulta_da_pagina(queryset, apos, antes, tamanho))
+    return _montar_pagina(itens, apos, antes, tamanho)
+
+
+async def apaginar_por_cursor(queryset, apos=None, antes=None, tamanho=TAMANHO_PAGINA):
+    # Versão assíncrona de `paginar_por_cursor`, para as views ASGI
+    itens = [item async for item in _consulta_da_pagina(queryset, apos, antes, tamanho)]
+    return _montar_pagina(itens, apos, antes, tamanho)
+
+
+def chave_cache_filtros(prefixo, edital, parametros):
+    """
+    Chave de cache de um resultado calculado para um edital com um conjunto de
+    filtros. Inclui `last_modified_at`, então substituir o edital invalida os
+    resultados antigos.
+    """
+    filtros = sorted(
+        (param, valor) for param, valor in parametros.items()
+        if valor and param not in (PARAMETRO_APOS, PARAMETRO_ANTES, 'page')
+    )
+    assinatura = hashlib.sha1(repr(filtros).encode('utf-8')).hexdigest()
+    return f"app_import:{prefixo}:{edital.pk}:{edital.last_modified_at.timestamp()}:{assinatura}"
+
+
+def chave_cache_pagina(edital, parametros):
+    """
+    Chave do fragmento em cache com a tabela de uma página: a dos filtros,
+    mais o cursor da página.
+    """
+    cursor = f"{ler_cursor(parametros.get(PARAMETRO_APOS))}:{ler_cursor(parametros.get(PARAMETRO_ANTES))}"
+    return f"{chave_cache_filtros('tabela', edital, parametros)}:{cursor}"
+
+
+def chave_contagem(edital, parametros):
+    return chave_cache_filtros('contagem', edital, parametros)
+
+
+def contar_com_cache(edital, queryset, parametros):
+    chave = chave_contagem(edital, parametros)
+    total = cache.get(chave)
+    if total is None:
+        total = queryset.count()
+        cache.set(chave, total, TEMPO_CACHE_CONTAGEM)
+    return total
+
+
+async def acontar_com_cache(edital, queryset, parametros):
+    chave = chave_contagem(edital, parametros)
+    total = await cache.aget(chave)
+    if total is None:
+        total = await queryset.acount()
+        await cache.aset(chave, total, TEMPO_CACHE_CONTAGEM)
+    return total
+
+
+def querystring_sem_cursor(parametros):
+    """
+    Parâmetros atuais (filtros) sem o cursor, já codificados para compor os links.
+    """
+    copia = parametros.copy()
+    for param in (PARAMETRO_APOS, PARAMETRO_ANTES, 'page'):
+        copia.pop(param, None)
+    return copia.urlencode()
@@ -0,0 +1,193 @@
+"""
+Partições por edital da tabela de inscritos (`ImportedData`).
+
+No PostgreSQL a tabela é particionada por LIST em `edital_id` (migração
+0012): cada edital tem a sua partição, e a partição padrão recebe as linhas
+de editais que ainda não têm uma. Assim, substituir ou apagar um edital não
+depende do tamanho dos dados anteriores nem deixa linhas mortas para o VACUUM:
+
+- a importação grava as linhas numa tabela nova, fora da tabela
+  particionada; os índices e as restrições são criados depois da carga e, só
+  no fim da transação, a partição antiga é removida e a nova entra no lugar
+  (DROP TABLE + ATTACH PARTITION). Até o COMMIT os coordenadores continuam
+  lendo a partição anterior;
+- apagar um edital remove a partição dele com um DROP TABLE, antes do
+  DELETE em cascata do ORM, que então não encontra nada para apagar.
+
+Importações em paralelo não se bloqueiam durante a carga: a tabela nova não
+referencia a tabela particionada nem a de editais, e só a troca em si, que
+precisa de bloqueio exclusivo da tabela particionada, é feita por uma
+importação de cada vez. Por isso a tabela particionada não tem a chave
+estrangeira para a de editais (migração 0016): criá-la na partição nova
+exigiria um bloqueio da tabela de editais incompatível com o de qualquer
+outra importação em andamento, que já gravou na linha do seu edital, e as
+duas esperariam uma pela outra. No lugar dela, a troca confere e bloqueia a
+linha do edital até o COMMIT, e a restrição CHECK garante que a partição só
+tem linhas desse edital.
+
+Em outros bancos `particionado()` é falso e a importação apaga e insere as
+linhas como antes.
+"""
+import re
+
+from django.db import IntegrityError, connection
+from django.db.models.sql.datastructures import BaseTable
+
+from .models import BuscaTexto, Edital, ImportedData
+
+TABELA = ImportedData._meta.db_table
+
+COLUNA_EDITAL = ImportedData._meta.get_field('edital').column
+
+PARTICAO_PADRAO = f"{TABELA}_padrao"
+
+# "CREATE INDEX nome ON ONLY tabela USING ..." (pg_get_indexdef de um índice da tabela particionada)
+PADRAO_INDICE = re.compile(r'^CREATE (UNIQUE )?INDEX \S+ ON ONLY \S+ ')
+
+# Chave do pg_advisory_xact_lock que serializa as trocas de partição
+BLOQUEIO_TROCA = 7_210_012
+
+
+def particionado():
+    """
+    Indica se a tabela de `ImportedData` é particionada (PostgreSQL, com a
+    migração 0012 aplicada).
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABELA])
+        linha = cursor.fetchone()
+    return linha is not None and linha[0] == 'p'
+
+
+def nome_particao(edital_id):
+    return f"{TABELA}_{int(edital_id)}"
+
+
+def nome_tabela_nova(edital_id):
+    return f"{nome_particao(edital_id)}_nova"
+
+
+def _restricao_do_edital(tabela):
+    return f"{tabela}_edital_check"
+
+
+def criar_tabela_nova(edital_id):
+    """
+    Cria, vazia e ainda sem índices, a tabela que receberá as linhas novas do
+    edital (mesmas colunas e valores padrão da tabela particionada, inclusive
+    a sequência dos ids). Deve ser chamada dentro de uma transação, que
+    termina com `trocar_particao`. Retorna o nome da tabela.
+    """
+    tabela = nome_tabela_nova(edital_id)
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        # As colunas vêm do catálogo, e não de um CREATE TABLE ... (LIKE tabela): o LIKE manteria
+        # a tabela particionada bloqueada até o COMMIT, e a troca de partição de outra
+        # importação, que precisa dela com exclusividade, esperaria por esta
+        cursor.execute(
+            "SELECT string_agg(format('%%I %%s', a.attname, format_type(a.atttypid, a.atttypmod)) "
+            "|| CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END "
+            "|| coalesce(' DEFAULT ' || pg_get_expr(d.adbin, d.adrelid), ''), ', ' ORDER BY a.attnum) "
+            "FROM pg_attribute a LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum "
+            "WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped",
+            [TABELA],
+        )
+        colunas = cursor.fetchone()[0]
+        cursor.execute(f"CREATE TABLE {quote_name(tabela)} ({colunas})")
+        # Com esta restrição o ATTACH PARTITION não precisa percorrer a tabela para validá-la
+        cursor.execute(
+            f"ALTER TABLE {quote_name(tabela)} ADD CONSTRAINT {quote_name(_restricao_do_edital(tabela))} "
+            f"CHECK ({quote_name(COLUNA_EDITAL)} = {int(edital_id)})"
+        )
+    return tabela
+
+
+def consultar_tabela(queryset, tabela):
+    """
+    A mesma consulta de `queryset` (de `ImportedData`), mas lendo de `tabela`,
+    que tem as mesmas colunas (a tabela nova de uma substituição, antes da troca).
+    """
+    queryset = queryset.all()
+    query = queryset.query
+    query.alias_map[query.base_table] = BaseTable(tabela, query.base_table)
+    return queryset
+
+
+def _preparar_tabela_nova(cursor, tabela):
+    # Mesmas restrições (chave primária) e índices da tabela particionada. Criados
+    # aqui, depois da carga e antes da troca, o ATTACH só precisa associá-los aos da
+    # tabela particionada, sem construir nada enquanto ela está bloqueada.
+    quote_name = connection.ops.quote_name
+    cursor.execute(
+        "SELECT pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'f') ORDER BY contype DESC",
+        [TABELA],
+    )
+    for (definicao,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {quote_name(tabela)} ADD {definicao}")
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = %s::regclass "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)",
+        [TABELA],
+    )
+    for (definicao,) in cursor.fetchall():
+        cursor.execute(PADRAO_INDICE.sub(
+            lambda encontrado: f"CREATE {encontrado.group(1) or ''}INDEX ON {quote_name(tabela)} ", definicao
+        ))
+    # Sem estatísticas o planejador trataria a partição nova como vazia até o autovacuum passar
+    cursor.execute(f"ANALYZE {quote_name(tabela)}")
+
+
+def trocar_particao(edital_id, tabela):
+    """
+    Coloca `tabela` (criada por `criar_tabela_nova` e já carregada) no lugar
+    da partição do edital. Deve ser o último passo da transação: a remoção da
+    partição antiga bloqueia a tabela particionada até o COMMIT.
+    """
+    quote_name = connection.ops.quote_name
+    particao = nome_particao(edital_id)
+    with connection.cursor() as cursor:
+        _preparar_tabela_nova(cursor, tabela)
+        # Duas trocas ao mesmo tempo se bloqueariam mutuamente (cada uma espera pela
+        # partição padrão e pela tabela particionada que a outra já bloqueou)
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [BLOQUEIO_TROCA])
+        # O que a chave estrangeira garantiria: o edital existe e não pode ser apagado até o COMMIT
+        cursor.execute(
+            f"SELECT 1 FROM {quote_name(Edital._meta.db_table)} WHERE {quote_name(Edital._meta.pk.column)} = %s "
+            f"FOR KEY SHARE",
+            [edital_id],
+        )
+        if cursor.fetchone() is None:
+            raise IntegrityError(f"O edital {edital_id} não existe.")
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_name(particao)}")
+        # Linhas do edital gravadas antes de ele ter partição própria impediriam o ATTACH
+        cursor.execute(
+            f"DELETE FROM {quote_name(PARTICAO_PADRAO)} WHERE {quote_name(COLUNA_EDITAL)} = %s",
+            [edital_id],
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote_name(TABELA)} ATTACH PARTITION {quote_name(tabela)} FOR VALUES IN ({int(edital_id)})"
+        )
+        cursor.execute(f"ALTER TABLE {quote_name(tabela)} DROP CONSTRAINT {quote_name(_restricao_do_edital(tabela))}")
+        cursor.execute(f"ALTER TABLE {quote_name(tabela)} RENAME TO {quote_name(particao)}")
+
+
+def remover_particao(edital_id):
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_name(nome_particao(edital_id))}")
+
+
+def remover_particao_do_edital(sender, instance, **kwargs):
+    """
+    Receptor de `pre_delete` do `Edital` (registrado em apps.py): remove a
+    partição do edital antes da cascata do ORM.
+    """
+    if not particionado():
+        return
+    # O índice de busca sai antes para que a tabela particionada, bloqueada a partir
+    # da remoção da partição, fique assim o menor tempo possível
+    BuscaTexto.objects.filter(edital=instance).delete()
+    remover_particao(instance.pk)
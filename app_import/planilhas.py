@@ -0,0 +1,188 @@
+"""
+Leitura em streaming de planilhas (.xlsx e .ods) para a importação.
+
+As linhas saem como listas de textos, do mesmo jeito que o módulo csv as
+entregaria se a planilha fosse exportada para CSV, e seguem pelo mesmo
+caminho de gravação em lotes (ver `importacao.abrir_leitor_planilha`). Não há
+codificação nem delimitador a adivinhar: os dois formatos são XML dentro de
+um zip, lidos uma linha por vez sem nunca montar a planilha em memória.
+
+- .xlsx: openpyxl em modo somente leitura (`read_only=True`). A única parte
+  mantida inteira em memória é a tabela de textos compartilhados do arquivo,
+  que tem cada texto diferente uma única vez;
+- .ods: o content.xml é percorrido com `iterparse`, descartando cada linha
+  depois de lida. Só a primeira tabela (aba) é importada.
+
+Nos dois formatos as linhas totalmente vazias são ignoradas (como as linhas
+em branco de um CSV), sem expandir as repetições que os editores gravam até
+o fim da planilha.
+"""
+import os
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from xml.etree import ElementTree
+
+EXTENSOES_PLANILHA = ('.xlsx', '.ods')
+
+# Erros de um arquivo que não é uma planilha válida do formato indicado pela extensão
+ERROS_LEITURA = (zipfile.BadZipFile, KeyError, ValueError, ElementTree.ParseError)
+
+# Formato de número só com zeros ("00000000000"): os zeros à esquerda fazem parte do
+# valor exibido, como nos CPFs gravados como número
+PADRAO_ZEROS = re.compile(r'^0+$')
+
+FORMATO_DATA = '%d/%m/%Y'
+
+FORMATO_DATA_HORA = '%d/%m/%Y %H:%M:%S'
+
+FORMATO_HORA = '%H:%M:%S'
+
+TABLE = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+TEXT = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+OFFICE = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+
+# Valor da célula do .ods sem texto exibido (text:p), na ordem em que são procurados
+ATRIBUTOS_VALOR_ODS = ('value', 'date-value', 'time-value', 'boolean-value')
+
+
+def eh_planilha(nome):
+    return os.path.splitext(nome or '')[1].lower() in EXTENSOES_PLANILHA
+
+
+def texto_da_celula(valor, formato=None):
+    """
+    O texto de um valor de célula do .xlsx como ele apareceria num CSV: datas
+    no formato dd/mm/aaaa, números inteiros sem ".0" e vazio para células vazias.
+    """
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'VERDADEIRO' if valor else 'FALSO'
+    if isinstance(valor, datetime):
+        return valor.strftime(FORMATO_DATA if valor.time() == time() else FORMATO_DATA_HORA)
+    if isinstance(valor, date):
+        return valor.strftime(FORMATO_DATA)
+    if isinstance(valor, time):
+        return valor.strftime(FORMATO_HORA)
+    if isinstance(valor, timedelta):
+        return str(valor)
+    if isinstance(valor, float):
+        if not valor.is_integer():
+            # As mesmas 15 casas significativas que o Excel exibe
+            return f'{valor:.15g}'
+        valor = int(valor)
+    if isinstance(valor, int) and formato and PADRAO_ZEROS.match(formato):
+        return str(valor).zfill(len(formato))
+    return str(valor)
+
+
+def _sem_vazias_no_fim(valores):
+    while valores and valores[-1] == '':
+        valores.pop()
+    return valores
+
+
+def linhas_xlsx(arquivo):
+    """
+    Gera (número da linha na planilha, valores) das linhas preenchidas da
+    primeira aba do .xlsx.
+    """
+    from openpyxl import load_workbook
+
+    arquivo.seek(0)
+    planilha = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        aba = planilha.worksheets[0]
+        # A dimensão gravada no arquivo nem sempre está certa; sem ela cada linha
+        # vem só com as células que existem, sem preencher até a última coluna
+        aba.reset_dimensions()
+        for numero, celulas in enumerate(aba.iter_rows(), start=1):
+            valores = _sem_vazias_no_fim([
+                texto_da_celula(celula.value, getattr(celula, 'number_format', None)) for celula in celulas
+            ])
+            if valores:
+                yield numero, valores
+    finally:
+        planilha.close()
+
+
+def _texto_ods(elemento):
+    # Texto de um text:p, com os espaços (text:s), tabulações e quebras que o ODF grava como elementos
+    partes = [elemento.text or '']
+    for filho in elemento:
+        if filho.tag == f'{TEXT}s':
+            partes.append(' ' * int(filho.get(f'{TEXT}c', 1)))
+        elif filho.tag == f'{TEXT}tab':
+            partes.append('\t')
+        elif filho.tag == f'{TEXT}line-break':
+            partes.append('\n')
+        else:
+            partes.append(_texto_ods(filho))
+        partes.append(filho.tail or '')
+    return ''.join(partes)
+
+
+def _texto_celula_ods(celula):
+    paragrafos = celula.findall(f'{TEXT}p')
+    if paragrafos:
+        return '\n'.join(_texto_ods(paragrafo) for paragrafo in paragrafos)
+    for atributo in ATRIBUTOS_VALOR_ODS:
+        valor = celula.get(f'{OFFICE}{atributo}')
+        if valor is not None:
+            return valor
+    return ''
+
+
+def linhas_ods(arquivo):
+    """
+    Gera (número da linha na planilha, valores) das linhas preenchidas da
+    primeira tabela do .ods, com o texto exibido de cada célula.
+    """
+    arquivo.seek(0)
+    with zipfile.ZipFile(arquivo) as pacote, pacote.open('content.xml') as conteudo:
+        # Pilha dos elementos abertos: o pai de cada linha, de onde ela sai depois de lida
+        abertos = []
+        profundidade_tabela = None
+        numero = 0
+        valores = []
+        # Células vazias só entram na linha se houver uma preenchida depois delas
+        vazias = 0
+        for evento, elemento in ElementTree.iterparse(conteudo, events=('start', 'end')):
+            if evento == 'start':
+                abertos.append(elemento)
+                if elemento.tag == f'{TABLE}table' and profundidade_tabela is None:
+                    profundidade_tabela = len(abertos)
+                continue
+
+            abertos.pop()
+            if profundidade_tabela is None:
+                continue
+            if elemento.tag == f'{TABLE}table' and len(abertos) + 1 == profundidade_tabela:
+                break
+            if elemento.tag in (f'{TABLE}table-cell', f'{TABLE}covered-table-cell'):
+                texto = _texto_celula_ods(elemento)
+                repeticoes = int(elemento.get(f'{TABLE}number-columns-repeated', 1))
+                if texto == '':
+                    vazias += repeticoes
+                else:
+                    valores.extend([''] * vazias)
+                    valores.extend([texto] * repeticoes)
+                    vazias = 0
+                elemento.clear()
+            elif elemento.tag == f'{TABLE}table-row':
+                repeticoes = int(elemento.get(f'{TABLE}number-rows-repeated', 1))
+                if valores:
+                    for indice in range(repeticoes):
+                        yield numero + indice + 1, list(valores)
+                numero += repeticoes
+                valores = []
+                vazias = 0
+                elemento.clear()
+                abertos[-1].remove(elemento)
+
+
+def linhas_da_planilha(arquivo):
+    if os.path.splitext(arquivo.name)[1].lower() == '.ods':
+        return linhas_ods(arquivo)
+    return linhas_xlsx(arquivo)
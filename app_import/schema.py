@@ -0,0 +1,132 @@
+"""
+Esquema de colunas e catálogo de valores dos filtros de cada edital.
+
+O catálogo é montado linha a linha durante a importação e gravado em
+`EditalSchema`, de modo que a página de detalhes leia uma única linha em vez
+de percorrer todas as inscrições do edital a cada requisição.
+"""
+from collections import Counter, defaultdict
+
+from .filtros import CAMPOS_DADOS_PESSOAIS, CAMPOS_POLO, eh_campo_polo_origem, extrair_cidade_do_polo
+from .models import EditalSchema, ImportedData
+
+# Valores maiores que isso não viram opção de filtro
+TAMANHO_MAXIMO_VALOR_FILTRO = 100
+
+# Classificação de um campo para os filtros da página de detalhes
+CAMPO_POLO_ORIGEM = 'polo_origem'
+CAMPO_TEXTO = 'texto'
+CAMPO_POLO = 'polo'
+CAMPO_DROPDOWN = 'dropdown'
+
+
+def classificar_campo(campo):
+    if eh_campo_polo_origem(campo):
+        return CAMPO_POLO_ORIGEM
+    campo_lower = campo.lower()
+    if any(keyword in campo_lower for keyword in CAMPOS_DADOS_PESSOAIS):
+        return CAMPO_TEXTO
+    if any(keyword in campo_lower for keyword in CAMPOS_POLO):
+        return CAMPO_POLO
+    return CAMPO_DROPDOWN
+
+
+class CatalogoCampos:
+    """
+    Acumula a classificação dos campos e as contagens de valores à medida que
+    as linhas são importadas.
+    """
+
+    def __init__(self, colunas=None):
+        self.colunas = []
+        self._colunas_vistas = {}
+        for campo in colunas or []:
+            self._registrar_coluna(campo)
+        self.total_linhas = 0
+        self.campos_texto = set()
+        self.campos_dropdown = set()
+        self.campos_polo = set()
+        self.valores_campos = defaultdict(Counter)
+        self.cidades_polo = Counter()
+        self.valores_polo_origem = Counter()
+
+    def _registrar_coluna(self, campo):
+        # A classificação é calculada uma vez por coluna, não uma vez por célula
+        if campo not in self._colunas_vistas:
+            self._colunas_vistas[campo] = classificar_campo(campo)
+            self.colunas.append(campo)
+        return self._colunas_vistas[campo]
+
+    def adicionar(self, dados_linha):
+        if not isinstance(dados_linha, dict):
+            return
+        self.total_linhas += 1
+
+        for campo, valor in dados_linha.items():
+            classificacao = self._registrar_coluna(campo)
+
+            if not valor or not isinstance(valor, str) or len(valor) > TAMANHO_MAXIMO_VALOR_FILTRO:
+                continue
+
+            if classificacao == CAMPO_POLO_ORIGEM:
+                self.valores_polo_origem[valor] += 1
+                continue
+
+            if classificacao == CAMPO_TEXTO:
+                self.campos_texto.add(campo)
+                continue
+
+            if classificacao == CAMPO_POLO:
+                self.campos_polo.add(campo)
+                cidade = extrair_cidade_do_polo(valor)
+                if cidade:
+                    self.cidades_polo[cidade.strip()] += 1
+
+            self.campos_dropdown.add(campo)
+            self.valores_campos[campo][valor] += 1
+
+    def salvar(self, edital, compacto=False):
+        """
+        Grava (ou substitui) o `EditalSchema` do edital com o que foi acumulado.
+        `compacto` indica o formato em que as linhas foram gravadas.
+        """
+        schema, _ = EditalSchema.objects.update_or_create(
+            edital=edital,
+            defaults={
+                'colunas': self.colunas,
+                'compacto': compacto,
+                'campos_texto': sorted(self.campos_texto),
+                'campos_dropdown': sorted(self.campos_dropdown),
+                'campos_polo': sorted(self.campos_polo),
+                'valores_campos': {campo: dict(valores) for campo, valores in self.valores_campos.items()},
+                'cidades_polo': dict(self.cidades_polo),
+                'valores_polo_origem': dict(self.valores_polo_origem),
+                'total_linhas': self.total_linhas,
+            },
+        )
+        return schema
+
+
+def construir_schema(edital):
+    """
+    Recalcula o esquema de um edital a partir das linhas já gravadas.
+    """
+    catalogo = CatalogoCampos()
+    linhas = ImportedData.objects.filter(edital=edital).order_by('id').values_list('dados_linha', flat=True)
+    for dados_linha in linhas.iterator(chunk_size=2000):
+        catalogo.adicionar(dados_linha)
+    return catalogo.salvar(edital)
+
+
+def obter_schema(edital):
+    """
+    Retorna o esquema do edital, calculando-o na primeira vez para editais
+    importados antes da existência de `EditalSchema`.
+    """
+    try:
+        schema = EditalSchema.objects.get(edital=edital)
+    except EditalSchema.DoesNotExist:
+        return construir_schema(edital)
+    # Deixa o esquema em cache no próprio edital (edital.schema), usado por ImportedData.dados
+    schema.edital = edital
+    return schema
@@ -0,0 +1,210 @@
+"""
+Fila de importações em segundo plano.
+
+A fila é a própria tabela de `ImportJob`: o upload grava o arquivo e cria um
+job pendente, e o comando `processar_importacoes` pega os jobs um a um
+(com SELECT ... FOR UPDATE SKIP LOCKED, então vários workers podem rodar ao
+mesmo tempo) e executa a mesma importação do upload síncrono.
+
+Enquanto importa, o worker grava a cada `INTERVALO_BATIMENTO` segundos um
+sinal de vida no job. Se o worker morrer no meio da importação, o banco
+desfaz a transação dela, mas o job ficaria "processando" para sempre: o
+próximo worker a procurar trabalho devolve para a fila os jobs sem sinal de
+vida há mais de `IMPORTACAO_TEMPO_SEM_BATIMENTO` segundos, até
+`MAXIMO_TENTATIVAS` vezes; depois disso o job é marcado como erro.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .importacao import ErroImportacao, importar_edital
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre dois sinais de vida do worker durante a importação
+INTERVALO_BATIMENTO = 30
+
+TEMPO_SEM_BATIMENTO = 300
+
+MAXIMO_TENTATIVAS = 3
+
+
+def enfileirar_importacao(arquivo, tipo, numero_ano, usuario=None, chave=''):
+    """
+    Grava o arquivo enviado e cria o job pendente correspondente.
+    """
+    job = ImportJob(
+        tipo=tipo,
+        numero_ano=numero_ano,
+        nome_arquivo=arquivo.name,
+        criado_por=usuario,
+        chave_substituicao=chave or '',
+    )
+    job.arquivo.save(arquivo.name, arquivo, save=False)
+    job.save()
+    return job
+
+
+def recuperar_jobs_abandonados():
+    """
+    Devolve para a fila os jobs "processando" sem sinal de vida do worker há
+    mais de `IMPORTACAO_TEMPO_SEM_BATIMENTO` segundos, ou os marca como erro
+    se já foram tentados `MAXIMO_TENTATIVAS` vezes. Retorna os jobs alterados.
+    """
+    agora = timezone.now()
+    limite = agora - timedelta(seconds=getattr(settings, "IMPORTACAO_TEMPO_SEM_BATIMENTO", TEMPO_SEM_BATIMENTO))
+    with transaction.atomic():
+        # Jobs marcados antes de existir o sinal de vida contam a partir do início
+        jobs = list(
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ImportJob.STATUS_PROCESSANDO)
+            .filter(Q(batimento_em__lt=limite) | Q(batimento_em__isnull=True, iniciado_em__lt=limite))
+        )
+        for job in jobs:
+            if job.tentativas >= MAXIMO_TENTATIVAS:
+                job.status = ImportJob.STATUS_ERRO
+                job.erro = (
+                    f"O worker parou de responder durante a importação {job.tentativas} vezes. "
+                    f"Verifique o arquivo e envie-o novamente."
+                )
+                job.concluido_em = agora
+                job.arquivo.delete(save=False)
+            else:
+                job.status = ImportJob.STATUS_PENDENTE
+                job.linhas_lidas = job.linhas_gravadas = 0
+            job.save()
+    return jobs
+
+
+def pegar_proximo_job():
+    """
+    Marca o job pendente mais antigo como "processando" e o retorna, ou
+    retorna None se a fila estiver vazia. Antes, devolve para a fila os jobs
+    de workers que morreram (ver `recuperar_jobs_abandonados`).
+    """
+    recuperar_jobs_abandonados()
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ImportJob.STATUS_PENDENTE)
+            .order_by("criado_em", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ImportJob.STATUS_PROCESSANDO
+        job.iniciado_em = job.batimento_em = timezone.now()
+        job.tentativas += 1
+        job.save(update_fields=["status", "iniciado_em", "batimento_em", "tentativas"])
+    return job
+
+
+class Batimento(threading.Thread):
+    """
+    Grava o sinal de vida do job a cada `intervalo` segundos enquanto a
+    importação roda, inclusive nas etapas que não atualizam o progresso (o
+    índice de busca, a troca de partição). Usa a conexão da própria thread,
+    em autocommit.
+    """
+
+    def __init__(self, job, intervalo=INTERVALO_BATIMENTO):
+        super().__init__(name=f"batimento-job-{job.pk}", daemon=True)
+        self.job_id = job.pk
+        self.intervalo = intervalo
+        self.parado = threading.Event()
+
+    def run(self):
+        try:
+            while not self.parado.wait(self.intervalo):
+                ImportJob.objects.filter(pk=self.job_id, status=ImportJob.STATUS_PROCESSANDO).update(
+                    batimento_em=timezone.now()
+                )
+        finally:
+            connections.close_all()
+
+    def parar(self):
+        self.parado.set()
+        self.join()
+
+
+class RegistroProgresso:
+    """
+    Atualiza o progresso do job por uma conexão separada, em autocommit.
+    A importação roda dentro de uma transação, então gravar o progresso pela
+    conexão principal só o tornaria visível no final.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.conexao = connections.create_connection(DEFAULT_DB_ALIAS)
+        quote_name = self.conexao.ops.quote_name
+        self.sql = "UPDATE {tabela} SET {lidas} = %s, {gravadas} = %s WHERE {id} = %s".format(
+            tabela=quote_name(ImportJob._meta.db_table),
+            lidas=quote_name("linhas_lidas"),
+            gravadas=quote_name("linhas_gravadas"),
+            id=quote_name("id"),
+        )
+
+    def __call__(self, linhas_lidas, linhas_gravadas):
+        self.job.linhas_lidas = linhas_lidas
+        self.job.linhas_gravadas = linhas_gravadas
+        with self.conexao.cursor() as cursor:
+            cursor.execute(self.sql, [linhas_lidas, linhas_gravadas, self.job.pk])
+
+    def fechar(self):
+        self.conexao.close()
+
+
+def processar_job(job, backend=None):
+    """
+    Executa a importação de um job já marcado como "processando" e grava o
+    resultado (ou o erro) no próprio job.
+    """
+    progresso = RegistroProgresso(job)
+    batimento = Batimento(job)
+    batimento.start()
+    try:
+        with job.arquivo.open("rb") as arquivo:
+            resultado = importar_edital(
+                arquivo,
+                job.tipo,
+                job.numero_ano,
+                job.criado_por,
+                backend=backend,
+                progresso=progresso,
+                chave=job.chave_substituicao or None,
+            )
+    except ErroImportacao as e:
+        job.status = ImportJob.STATUS_ERRO
+        job.erro = str(e)
+    except Exception as e:
+        job.status = ImportJob.STATUS_ERRO
+        job.erro = f"Erro ao processar o arquivo: {e}"
+        logger.exception("Erro na importação do job %s (%s)", job.pk, job.nome_arquivo)
+    else:
+        job.status = ImportJob.STATUS_CONCLUIDO
+        job.edital = resultado.edital
+        job.acao = resultado.acao
+        job.linhas_gravadas = resultado.linhas_importadas
+        job.mensagens = [list(mensagem) for mensagem in resultado.mensagens]
+        job.mensagens.append([
+            "success",
+            f"Arquivo {resultado.acao} com sucesso para o edital "
+            f"'{resultado.edital.get_tipo_display()} - {resultado.edital.numero_ano}'! "
+            f"{resultado.linhas_importadas} linhas importadas.",
+        ])
+    finally:
+        batimento.parar()
+        progresso.fechar()
+
+    # O arquivo só é necessário durante o processamento
+    job.arquivo.delete(save=False)
+    job.concluido_em = timezone.now()
+    job.save()
+    return job
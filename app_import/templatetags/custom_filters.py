@@ -1,4 +1,7 @@
 from django import template
+from django.utils.formats import number_format
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 
 register = template.Library()
 
@@ -11,3 +14,28 @@ def get_item(dictionary, key):
     if dictionary is None:
         return None
     return dictionary.get(key)
+
+
+@register.filter
+def celulas(valores):
+    """
+    As células (<td>, com os valores escapados) de uma linha da tabela, numa
+    única chamada por linha em vez de um laço do template por célula.
+    Uso: <tr>{{ linha|celulas }}</tr>
+    """
+    return mark_safe(''.join(f'<td>{escape(valor)}</td>' for valor in valores))
+
+
+@register.filter
+def duracao(valor):
+    """
+    Um timedelta curto por extenso, ex: "4.2 s" ou "3 min 12 s".
+    Uso: {{ edital.duracao_importacao|duracao }}
+    """
+    if valor is None:
+        return None
+    segundos = valor.total_seconds()
+    if segundos < 60:
+        return f"{number_format(segundos, 1)} s"
+    minutos, segundos = divmod(round(segundos), 60)
+    return f"{minutos} min {segundos} s"
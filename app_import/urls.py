@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import api, views, views_async
+
+# Sob ASGI, listagem, detalhes e download usam as versões assíncronas (views_async.py)
+paginas = views_async if getattr(settings, "VIEWS_ASSINCRONAS", False) else views
 
 urlpatterns = [
     # Rota raiz (homepage) aponta para a view de login
@@ -9,11 +13,20 @@ urlpatterns = [
     path("signup/", views.SignUpView.as_view(), name="signup"),
     # Rota para a página inicial após o login (onde fica o upload)
     path("home/", views.home, name="home"),
+    # Rotas para acompanhar uma importação feita em segundo plano
+    path("importacoes/<int:job_id>/", views.status_importacao, name="status_importacao"),
+    path("importacoes/<int:job_id>/status/", views.status_importacao_json, name="status_importacao_json"),
     # Rota para listar os editais carregados
-    path("editais/", views.listar_editais, name="listar_editais"),
+    path("editais/", paginas.listar_editais, name="listar_editais"),
     # Rota para detalhes e filtros de um edital específico
-    path("editais/<int:edital_id>/", views.detalhe_edital, name="detalhe_edital"),
+    path("editais/<int:edital_id>/", paginas.detalhe_edital, name="detalhe_edital"),
+    # Rota para as estatísticas (contagens por campo) de um edital específico
+    path("editais/<int:edital_id>/estatisticas/", views.estatisticas_edital, name="estatisticas_edital"),
     # Rota para download do CSV de um edital específico
-    path("editais/download/<int:edital_id>/", views.download_edital_csv, name="download_edital_csv"),
+    path("editais/download/<int:edital_id>/", paginas.download_edital_csv, name="download_edital_csv"),
+    # Rota para buscar um inscrito (CPF ou nome) em todos os editais
+    path("busca/", views.busca_global, name="busca_global"),
+    # API de leitura dos inscritos (JSON), com os mesmos filtros da página de detalhes
+    path("api/editais/<int:edital_id>/inscritos/", api.api_inscritos, name="api_inscritos"),
     # Django já fornece URLs para logout, mudança de senha, etc. em django.contrib.auth.urls
 ]
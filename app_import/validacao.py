@@ -0,0 +1,161 @@
+"""
+Validação de um CSV (ou planilha) de edital sem importá-lo (modo "apenas validar").
+
+O arquivo é lido com as mesmas funções da importação (`ler_linhas`,
+`abrir_leitor`), então codificação, delimitador e cabeçalho são
+exatamente os que a importação usaria. Tudo é apurado numa única passada em
+streaming e nada é gravado no banco: o coordenador descobre um delimitador,
+uma codificação ou um cabeçalho errado antes de pagar por uma importação.
+
+A memória usada não depende do tamanho do arquivo, exceto pelas linhas
+duplicadas: cada linha vira um hash de 8 bytes guardado num set, o que custa
+perto de 95 bytes por linha (o objeto bytes e a entrada do set), e por isso só
+as primeiras `LIMITE_LINHAS_DUPLICADAS` linhas são comparadas (cerca de 19 MB).
+"""
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from .importacao import ErroImportacao, abrir_leitor, codificacoes_a_tentar, limpar_colunas
+from .models import EditalSchema
+from .schema import CAMPO_TEXTO, TAMANHO_MAXIMO_VALOR_FILTRO, classificar_campo
+
+LIMITE_LINHAS_DUPLICADAS = 200_000
+
+LINHAS_EXEMPLO = 5
+
+# Um cabeçalho com células assim (CPF, datas, números) provavelmente é uma linha de dados
+PADRAO_VALOR_DE_DADOS = re.compile(r'^\d[\d.\-/ ]*$')
+
+
+@dataclass
+class RelatorioValidacao:
+    # Ambos None numa planilha (.xlsx ou .ods)
+    codificacao: str
+    delimitador: str
+    colunas: list
+    total_linhas: int = 0
+    linhas_vazias: int = 0
+    linhas_duplicadas: int = 0
+    linhas_comparadas: int = 0
+    linhas_colunas_a_mais: int = 0
+    linhas_colunas_a_menos: int = 0
+    colunas_sem_nome: int = 0
+    colunas_repetidas: list = field(default_factory=list)
+    # Colunas de filtro com valores acima de TAMANHO_MAXIMO_VALOR_FILTRO: {coluna: quantidade}
+    valores_longos: dict = field(default_factory=dict)
+    # Diferenças para o cabeçalho do edital já carregado, se houver
+    colunas_novas: list = field(default_factory=list)
+    colunas_ausentes: list = field(default_factory=list)
+    exemplos: list = field(default_factory=list)
+    # Lista de (nível, texto) no formato de django.contrib.messages
+    mensagens: list = field(default_factory=list)
+
+    @property
+    def problemas(self):
+        problemas = []
+        if any(PADRAO_VALOR_DE_DADOS.match(coluna.strip()) for coluna in self.colunas):
+            problemas.append("O cabeçalho tem valores que parecem dados (números, CPF ou datas): a primeira linha do arquivo é mesmo o cabeçalho?")
+        if self.colunas_sem_nome:
+            problemas.append(f"{self.colunas_sem_nome} coluna(s) sem nome no cabeçalho serão ignoradas.")
+        if self.colunas_repetidas:
+            problemas.append(f"Colunas repetidas no cabeçalho (só a última é mantida): {', '.join(self.colunas_repetidas)}.")
+        if self.linhas_colunas_a_mais:
+            problemas.append(f"{self.linhas_colunas_a_mais} linha(s) com mais valores que o cabeçalho; os valores extras serão ignorados.")
+        if self.linhas_colunas_a_menos:
+            problemas.append(f"{self.linhas_colunas_a_menos} linha(s) com menos valores que o cabeçalho.")
+        if self.linhas_vazias:
+            problemas.append(f"{self.linhas_vazias} linha(s) sem nenhum valor preenchido.")
+        if self.linhas_duplicadas:
+            problemas.append(f"{self.linhas_duplicadas} linha(s) repetidas.")
+        for coluna, quantidade in self.valores_longos.items():
+            problemas.append(
+                f"{quantidade} valor(es) da coluna '{coluna}' com mais de {TAMANHO_MAXIMO_VALOR_FILTRO} "
+                f"caracteres não aparecerão como opção de filtro."
+            )
+        if self.colunas_ausentes:
+            problemas.append(f"Colunas do edital atual que não estão no arquivo: {', '.join(self.colunas_ausentes)}.")
+        return problemas
+
+
+def hash_valores(valores):
+    conteudo = "\x1f".join(valor or '' for valor in valores)
+    return hashlib.blake2b(conteudo.encode('utf-8'), digest_size=8).digest()
+
+
+def _analisar(arquivo, codificacao, edital):
+    reader, mensagens = abrir_leitor(arquivo, codificacao)
+    nomeadas = limpar_colunas(reader.fieldnames)
+    # Como no esquema do edital, cada coluna aparece uma vez, na ordem do cabeçalho
+    colunas = list(dict.fromkeys(nomeadas))
+    relatorio = RelatorioValidacao(
+        codificacao=codificacao,
+        delimitador=reader.reader.dialect.delimiter if codificacao else None,
+        colunas=colunas,
+        colunas_sem_nome=len(reader.fieldnames) - len(nomeadas),
+        colunas_repetidas=sorted(coluna for coluna, total in Counter(nomeadas).items() if total > 1),
+        mensagens=mensagens,
+    )
+
+    # Os valores longos só importam nas colunas que viram opção de filtro
+    colunas_filtro = {coluna for coluna in colunas if classificar_campo(coluna) != CAMPO_TEXTO}
+    valores_longos = Counter()
+    vistas = set()
+
+    for row_dict in reader:
+        if None in row_dict:
+            relatorio.linhas_colunas_a_mais += 1
+        dados_linha = {k: v for k, v in row_dict.items() if k is not None and k.strip() != ''}
+        # Mesma regra de linhas_limpas: linhas sem nenhuma coluna com nome não são importadas
+        if not dados_linha:
+            continue
+        relatorio.total_linhas += 1
+
+        if any(valor is None for valor in dados_linha.values()):
+            relatorio.linhas_colunas_a_menos += 1
+        if all(not valor or not valor.strip() for valor in dados_linha.values()):
+            relatorio.linhas_vazias += 1
+        for coluna, valor in dados_linha.items():
+            if valor and len(valor) > TAMANHO_MAXIMO_VALOR_FILTRO and coluna in colunas_filtro:
+                valores_longos[coluna] += 1
+
+        if relatorio.linhas_comparadas < LIMITE_LINHAS_DUPLICADAS:
+            relatorio.linhas_comparadas += 1
+            digest = hash_valores(dados_linha.values())
+            if digest in vistas:
+                relatorio.linhas_duplicadas += 1
+            else:
+                vistas.add(digest)
+
+        if len(relatorio.exemplos) < LINHAS_EXEMPLO:
+            relatorio.exemplos.append([dados_linha.get(coluna) or '' for coluna in colunas])
+
+    relatorio.valores_longos = dict(valores_longos)
+
+    if edital is not None:
+        colunas_atuais = EditalSchema.objects.filter(edital=edital).values_list('colunas', flat=True).first()
+        if colunas_atuais:
+            relatorio.colunas_novas = [coluna for coluna in colunas if coluna not in colunas_atuais]
+            relatorio.colunas_ausentes = [coluna for coluna in colunas_atuais if coluna not in colunas]
+
+    if relatorio.linhas_comparadas < relatorio.total_linhas:
+        relatorio.mensagens.append((
+            'info',
+            f"Linhas repetidas verificadas apenas nas primeiras {relatorio.linhas_comparadas} linhas.",
+        ))
+    return relatorio
+
+
+def validar_arquivo(arquivo, edital=None):
+    """
+    Analisa o CSV como a importação o leria, sem gravar nada, e devolve um
+    `RelatorioValidacao`. Com `edital` (já existente), o cabeçalho também é
+    comparado com o das linhas carregadas hoje.
+    """
+    for codificacao in codificacoes_a_tentar(arquivo):
+        try:
+            return _analisar(arquivo, codificacao, edital)
+        except UnicodeDecodeError:
+            continue
+    raise ErroImportacao("Não foi possível decodificar o arquivo. Verifique a codificação.")
@@ -4,18 +4,43 @@ from django.urls import reverse_lazy, reverse
 from django.views import generic
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-import csv
-import io
-from django.db import transaction
-import traceback # Import traceback for better error logging
-from django.http import HttpResponse # Needed for CSV download
-from collections import defaultdict
-from django.core.paginator import Paginator # Importação para paginação
-import re
-import unicodedata # Para normalização de acentos
-
-from .forms import EditalCSVUploadForm
-from .models import ImportedData, Edital
+import logging
+from functools import partial
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import urlencode
+from django.conf import settings
+from django.db.models import F
+
+from app_import_django.replicas import fixar_no_primario, usar_replica
+
+from .busca import LIMITE_RESULTADOS_GLOBAIS, buscar_em_todos_editais
+from .exportacao import gerar_csv, linhas_para_exportar, nome_arquivo_exportacao
+from .facetas import contar_facetas_com_cache, estatisticas_do_schema, opcoes_com_contagem
+from .filtros import aplicar_filtros, ler_filtros, possui_filtros
+from .forms import BuscaInscritoForm, EditalCSVUploadForm
+from .importacao import ErroImportacao, formato_aceito, importar_edital
+from .models import ImportedData, Edital, ImportJob
+from .paginacao import (
+    PARAMETRO_ANTES, PARAMETRO_APOS, TEMPO_CACHE_TABELA, chave_cache_pagina, contar_com_cache, ler_cursor,
+    paginar_por_cursor, querystring_sem_cursor,
+)
+from .schema import CatalogoCampos, obter_schema
+from .tarefas import enfileirar_importacao
+from .validacao import validar_arquivo
+
+logger = logging.getLogger(__name__)
+
+# Usuários exibidos na lista e nos detalhes; carregados junto para não consultar o banco no template
+USUARIOS_EDITAL = ('uploaded_by', 'last_modified_by')
+
+# Campos pelos quais a lista de editais pode ser ordenada (parâmetro "ordem"; "-" na frente para decrescente)
+ORDENACOES_EDITAIS = (
+    'numero_ano', 'uploaded_at', 'last_modified_at', 'total_linhas', 'total_colunas', 'tamanho_bytes',
+    'duracao_importacao',
+)
+ORDEM_PADRAO_EDITAIS = '-uploaded_at'
+
+EDITAIS_POR_PAGINA = 50
 
 # View para cadastro de usuário
 class SignUpView(generic.CreateView):
@@ -34,12 +59,16 @@ def home(request):
         numero_ano = form.cleaned_data["numero_ano"]
         csv_file = request.FILES["csv_file"]
         confirmar_substituicao = form.cleaned_data.get("confirmar_substituicao", False)
+        chave_substituicao = form.cleaned_data.get("chave_substituicao", "").strip()
 
         try:
             edital_existente = Edital.objects.get(tipo=tipo, numero_ano=numero_ano)
         except Edital.DoesNotExist:
             edital_existente = None
 
+        if form.cleaned_data.get("apenas_validar"):
+            return validar_upload(request, form, csv_file, edital_existente)
+
         if edital_existente and not confirmar_substituicao:
             uploader_original = edital_existente.uploaded_by.username if edital_existente.uploaded_by else "desconhecido"
             messages.warning(request, 
@@ -50,104 +79,36 @@ def home(request):
             return render(request, "home.html", {"form": form, "pedir_confirmacao": True, "edital_existente": edital_existente})
 
         try:
-            if not csv_file.name.endswith(".csv"):
-                messages.error(request, "Este não é um arquivo CSV.")
+            if not formato_aceito(csv_file.name):
+                messages.error(request, "Este não é um arquivo CSV, XLSX ou ODS.")
                 return redirect("home")
 
-            try:
-                data_set = csv_file.read().decode("utf-8")
-            except UnicodeDecodeError:
-                try:
-                    csv_file.seek(0)
-                    data_set = csv_file.read().decode("latin-1")
-                    messages.info(request, "Arquivo lido com codificação latin-1.")
-                except Exception as decode_error:
-                    messages.error(request, f"Não foi possível decodificar o arquivo. Verifique a codificação. Erro: {decode_error}")
-                    return redirect("home")
-            
-            io_string = io.StringIO(data_set)
-            
-            delimiter_to_use = None
-            try:
-                dialect = csv.Sniffer().sniff(io_string.readline(), delimiters=';,')
-                delimiter_to_use = dialect.delimiter
-            except csv.Error:
-                messages.warning(request, "Não foi possível detectar o delimitador. O sistema tentará usar ';' e ',' como padrão.")
-            
-            io_string.seek(0)
-
-            delimiters_to_try = [delimiter_to_use] if delimiter_to_use else [';', ',']
-            
-            reader = None
-            for delim in delimiters_to_try:
-                try:
-                    reader = csv.DictReader(io_string, delimiter=delim, quotechar='"')
-                    if reader.fieldnames and len(reader.fieldnames) > 1:
-                        if not delimiter_to_use:
-                            messages.info(request, f"Arquivo lido com sucesso usando o delimitador '{delim}'.")
-                        else:
-                            messages.info(request, f"Delimitador '{delim}' detectado e usado com sucesso.")
-                        break 
-                    else:
-                        io_string.seek(0)
-                        reader = None
-                except Exception:
-                    io_string.seek(0)
-                    reader = None
-
-            if not reader or not reader.fieldnames:
-                 messages.error(request, "Não foi possível ler o cabeçalho do CSV. Verifique o formato do arquivo e se o delimitador é ',' ou ';'.")
-                 return redirect("home")
-
-            with transaction.atomic():
-                if edital_existente and confirmar_substituicao:
-                    edital = edital_existente
-                    edital.last_modified_by = request.user
-                    edital.save()
-                    ImportedData.objects.filter(edital=edital).delete()
-                    acao = "substituído"
-                else:
-                    edital, created = Edital.objects.get_or_create(
-                        tipo=tipo, 
-                        numero_ano=numero_ano,
-                        defaults={'uploaded_by': request.user}
-                    )
-                    if not created:
-                        edital.last_modified_by = request.user
-                        edital.save()
-                        ImportedData.objects.filter(edital=edital).delete()
-                        acao = "substituído"
-                    else: 
-                        acao = "importado"
-
-                dados_para_criar = []
-                linhas_processadas = 0
-                for row_dict in reader:
-                    cleaned_row_dict = {k: v for k, v in row_dict.items() if k is not None and k.strip() != ''}
-                    if not cleaned_row_dict:
-                        continue 
-                        
-                    dados_para_criar.append(
-                        ImportedData(
-                            edital=edital,
-                            dados_linha=cleaned_row_dict
-                        )
-                    )
-                    linhas_processadas += 1
-                
-                if dados_para_criar:
-                    ImportedData.objects.bulk_create(dados_para_criar)
-                
-                messages.success(
-                    request, 
-                    f"Arquivo CSV {acao} com sucesso para o edital "
-                    f"'{edital.get_tipo_display()} - {edital.numero_ano}'! "
-                    f"{linhas_processadas} linhas importadas."
-                )
+            if getattr(settings, "IMPORTACAO_EM_SEGUNDO_PLANO", True):
+                # O arquivo é apenas gravado; o worker "processar_importacoes" faz a importação
+                job = enfileirar_importacao(csv_file, tipo, numero_ano, request.user, chave_substituicao)
+                messages.info(request, "Arquivo recebido. A importação está sendo feita em segundo plano.")
+                return redirect("status_importacao", job_id=job.id)
+
+            # O arquivo é lido em streaming e gravado em lotes (ver importacao.py)
+            resultado = importar_edital(csv_file, tipo, numero_ano, request.user, chave=chave_substituicao or None)
+
+            for nivel, texto in resultado.mensagens:
+                messages.add_message(request, getattr(messages, nivel.upper()), texto)
+
+            edital = resultado.edital
+            messages.success(
+                request, 
+                f"Arquivo {resultado.acao} com sucesso para o edital "
+                f"'{edital.get_tipo_display()} - {edital.numero_ano}'! "
+                f"{resultado.linhas_importadas} linhas importadas."
+            )
+
+        except ErroImportacao as e:
+            messages.error(request, str(e))
 
         except Exception as e:
-            messages.error(request, f"Erro ao processar o arquivo CSV: {e}")
-            traceback.print_exc()
+            messages.error(request, f"Erro ao processar o arquivo: {e}")
+            logger.exception("Erro ao importar o arquivo %s", csv_file.name)
         
         return redirect("home")
 
@@ -160,250 +121,276 @@ def home(request):
 
     return render(request, "home.html", {"form": form})
 
+def validar_upload(request, form, csv_file, edital_existente):
+    # Modo "apenas validar": lê o arquivo como a importação leria, sem tocar em ImportedData
+    if not formato_aceito(csv_file.name):
+        messages.error(request, "Este não é um arquivo CSV, XLSX ou ODS.")
+        return redirect("home")
+
+    try:
+        relatorio = validar_arquivo(csv_file, edital_existente)
+    except ErroImportacao as e:
+        messages.error(request, str(e))
+        return redirect("home")
+
+    for nivel, texto in relatorio.mensagens:
+        messages.add_message(request, getattr(messages, nivel.upper()), texto)
+
+    # O arquivo precisa ser escolhido de novo; os demais campos continuam preenchidos
+    dados = {campo: valor for campo, valor in form.cleaned_data.items() if campo not in ("csv_file", "apenas_validar")}
+    context = {
+        "form": EditalCSVUploadForm(initial=dados),
+        "relatorio": relatorio,
+        "nome_arquivo": csv_file.name,
+        "pedir_confirmacao": edital_existente is not None,
+        "edital_existente": edital_existente,
+    }
+    return render(request, "home.html", context)
+
+@login_required
+def status_importacao(request, job_id):
+    job = get_object_or_404(ImportJob, pk=job_id)
+    response = render(request, "status_importacao.html", {"job": job})
+    # O edital recém-importado pode ainda não ter chegado à réplica
+    return fixar_no_primario(response) if job.finalizado else response
+
 @login_required
+def status_importacao_json(request, job_id):
+    # Endpoint leve consultado periodicamente pela página de status
+    job = get_object_or_404(ImportJob, pk=job_id)
+    response = JsonResponse({
+        "id": job.id,
+        "status": job.status,
+        "status_display": job.get_status_display(),
+        "finalizado": job.finalizado,
+        "linhas_lidas": job.linhas_lidas,
+        "linhas_gravadas": job.linhas_gravadas,
+        "mensagens": job.mensagens,
+        "erro": job.erro,
+        "edital_url": reverse("detalhe_edital", args=[job.edital_id]) if job.edital_id else None,
+    })
+    return fixar_no_primario(response) if job.finalizado else response
+
+@login_required
+@usar_replica
 def listar_editais(request):
-    editais = Edital.objects.all().order_by("-uploaded_at")
-    return render(request, "listar_editais.html", {"editais": editais})
+    editais, ordem, pagina = consulta_editais(request.GET)
+    return render(request, "listar_editais.html", contexto_listagem(list(editais), ordem, pagina))
+
+
+def consulta_editais(parametros):
+    """
+    Página da lista de editais pedida em `parametros` ("ordem" e "pagina"), numa
+    única consulta com os usuários junto. Retorna (queryset, ordem, pagina); o
+    queryset traz um edital a mais, que indica se existe a página seguinte.
+    """
+    ordem = parametros.get("ordem") or ORDEM_PADRAO_EDITAIS
+    if ordem.lstrip("-") not in ORDENACOES_EDITAIS:
+        ordem = ORDEM_PADRAO_EDITAIS
+    pagina = max(ler_cursor(parametros.get("pagina")) or 1, 1)
+
+    campo = F(ordem.lstrip("-"))
+    if ordem.startswith("-"):
+        ordenacao = (campo.desc(nulls_last=True), "-pk")
+    else:
+        ordenacao = (campo.asc(nulls_last=True), "pk")
+    inicio = (pagina - 1) * EDITAIS_POR_PAGINA
+    editais = Edital.objects.select_related(*USUARIOS_EDITAL).order_by(*ordenacao)
+    return editais[inicio:inicio + EDITAIS_POR_PAGINA + 1], ordem, pagina
+
+
+def contexto_listagem(editais, ordem, pagina):
+    """
+    Contexto do template da lista de editais (views síncrona e assíncrona), a
+    partir da lista vinda de `consulta_editais`.
+    """
+    # Clicar na coluna já ordenada inverte o sentido; nas demais, começa pelo maior
+    links_ordem = {}
+    for campo in ORDENACOES_EDITAIS:
+        if ordem == f"-{campo}":
+            links_ordem[campo] = {"ordem": campo, "seta": "▼"}
+        else:
+            links_ordem[campo] = {"ordem": f"-{campo}", "seta": "▲" if ordem == campo else ""}
+    return {
+        "editais": editais[:EDITAIS_POR_PAGINA],
+        "ordem": ordem,
+        "pagina": pagina,
+        "tem_anterior": pagina > 1,
+        "tem_proxima": len(editais) > EDITAIS_POR_PAGINA,
+        "links_ordem": links_ordem,
+    }
 
 @login_required
+@usar_replica
 def download_edital_csv(request, edital_id):
     edital = get_object_or_404(Edital, pk=edital_id)
     
-    inscritos_filtrados = filtrar_inscritos(request, edital)
+    schema = obter_schema(edital)
+    inscritos_filtrados = filtrar_inscritos(request, edital, schema)
     
     if not inscritos_filtrados.exists():
         messages.error(request, "Não há dados para exportar com os filtros atuais.")
         return redirect('detalhe_edital', edital_id=edital_id)
 
-    response = HttpResponse(
+    # O cabeçalho vem do esquema gravado na importação, sem uma passada extra pelas linhas,
+    # e o arquivo é gerado em streaming enquanto as linhas são lidas do banco.
+    cabecalho = sorted(schema.colunas)
+    response = StreamingHttpResponse(
+        gerar_csv(cabecalho, linhas_para_exportar(inscritos_filtrados, schema)),
         content_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=\"edital_{edital.tipo}_{edital.numero_ano.replace('/', '-')}_filtrado.csv\""},
+        headers={"Content-Disposition": f"attachment; filename=\"{nome_arquivo_exportacao(edital)}\""},
     )
-    response.write(u"\ufeff".encode("utf8"))
-    
-    writer = csv.writer(response, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL)
-
-    headers = set()
-    all_rows_data = [item.dados_linha for item in inscritos_filtrados]
-    for row_data in all_rows_data:
-        if isinstance(row_data, dict):
-             headers.update(row_data.keys())
-    
-    sorted_headers = sorted(list(headers))
-    writer.writerow(sorted_headers)
-
-    for row_data in all_rows_data:
-        if isinstance(row_data, dict):
-            writer.writerow([row_data.get(header, '') for header in sorted_headers])
 
     return response
 
-CAMPOS_DADOS_PESSOAIS = [
-    'nome', 'cpf', 'rg', 'identidade', 'documento', 'endereco', 'endereço', 
-    'email', 'e-mail', 'telefone', 'celular', 'contato', 'nascimento', 
-    'data de nascimento', 'filiação', 'mae', 'mãe', 'pai'
-]
-
-CAMPOS_DOCUMENTO = ['cpf', 'rg', 'identidade', 'documento']
-
-CAMPOS_POLO = ['polo', 'pólo']
-
-def remover_acentos(texto):
-    if not texto or not isinstance(texto, str):
-        return texto
-    return ''.join(c for c in unicodedata.normalize('NFD', texto) 
-                  if unicodedata.category(c) != 'Mn')
-
 @login_required
+@usar_replica
 def detalhe_edital(request, edital_id):
     edital = get_object_or_404(Edital, pk=edital_id)
     
-    todos_inscritos = ImportedData.objects.filter(edital=edital)
-    total_inscritos = todos_inscritos.count()
+    schema = obter_schema(edital)
     
-    if total_inscritos == 0:
+    if schema.total_linhas == 0:
         messages.warning(request, "Este edital não possui inscritos.")
         return redirect("listar_editais")
     
-    campos_filtro, campos_texto, campos_dropdown, campos_polo, cidades_disponiveis, valores_polo_origem = identificar_campos_filtro(todos_inscritos)
-    
-    filtros_ativos = {}
-    filtros_texto = {}
-    cidade_polo_selecionada = request.GET.get('cidade_polo', '')
-    polo_origem_selecionado = request.GET.get('polo_origem', '')
-    
-    for param, valor in request.GET.items():
-        if param.startswith('filtro_') and valor:
-            campo = param[7:]
-            filtros_ativos[campo] = valor
-        elif param.startswith('texto_') and valor:
-            campo = param[6:]
-            filtros_texto[campo] = valor
-    
-    inscritos = filtrar_inscritos(request, edital)
-    
-    colunas = set()
-    dados_para_exibir = inscritos if inscritos.exists() else todos_inscritos
-    for inscrito in dados_para_exibir[:100]:
-        if isinstance(inscrito.dados_linha, dict):
-            colunas.update(inscrito.dados_linha.keys())
-    colunas = sorted(list(colunas))
-
-    paginator = Paginator(inscritos, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    inscritos = filtrar_inscritos(request, edital, schema)
+
+    # Paginação por cursor (id do inscrito): o custo de cada página não depende da posição
+    page_obj = paginar_por_cursor(
+        inscritos,
+        apos=ler_cursor(request.GET.get(PARAMETRO_APOS)),
+        antes=ler_cursor(request.GET.get(PARAMETRO_ANTES)),
+    )
+    if possui_filtros(request.GET):
+        total_filtrado = contar_com_cache(edital, inscritos, request.GET)
+    else:
+        total_filtrado = schema.total_linhas
+
+    # Quantidade de inscritos (com os filtros atuais) em cada opção dos filtros
+    contagens = contar_facetas_com_cache(edital, schema, inscritos, request.GET)
     
-    context = {
+    context = contexto_detalhe(request, edital, schema, page_obj, total_filtrado, contagens)
+    return render(request, "detalhe_edital.html", context)
+
+
+def linhas_da_tabela(inscritos, colunas):
+    """
+    Valores de cada inscrito já na ordem de `colunas`, com "-" nos vazios: o
+    template só percorre as listas, sem um filtro por célula.
+    """
+    return [[dados.get(coluna) or "-" for coluna in colunas] for dados in (inscrito.dados for inscrito in inscritos)]
+
+
+def contexto_detalhe(request, edital, schema, page_obj, total_filtrado, contagens):
+    """
+    Contexto do template de detalhes, compartilhado pela view síncrona e pela
+    assíncrona (views_async), que diferem só na forma de consultar o banco.
+    """
+    # O edital (com o esquema já em cache) permite ler linhas compactas sem novas consultas
+    for inscrito in page_obj.object_list:
+        inscrito.edital = edital
+
+    filtros_ativos, filtros_texto = ler_filtros(request.GET)
+    opcoes = opcoes_com_contagem(schema, contagens)
+    colunas = sorted(schema.colunas)
+    return {
         'edital': edital,
         'inscritos': page_obj.object_list,
-        'total_inscritos': total_inscritos,
-        'campos_filtro': campos_filtro,
-        'campos_texto': campos_texto,
-        'campos_dropdown': campos_dropdown,
-        'campos_polo': campos_polo,
-        'cidades_disponiveis': cidades_disponiveis,
+        'total_inscritos': schema.total_linhas,
+        'campos_filtro': schema.campos_filtro,
+        'campos_texto': schema.campos_texto,
+        'campos_dropdown': schema.campos_dropdown,
+        'campos_polo': schema.campos_polo,
+        'cidades_disponiveis': schema.cidades_disponiveis,
         'filtros_ativos': filtros_ativos,
         'filtros_texto': filtros_texto,
-        'cidade_polo_selecionada': cidade_polo_selecionada,
-        'valores_polo_origem': valores_polo_origem,
-        'polo_origem_selecionado': polo_origem_selecionado,
+        'cidade_polo_selecionada': request.GET.get('cidade_polo', ''),
+        'valores_polo_origem': schema.lista_polo_origem,
+        'polo_origem_selecionado': request.GET.get('polo_origem', ''),
         'colunas': colunas,
+        # Chamada pelo template só quando a tabela da página não está no cache
+        'linhas_tabela': partial(linhas_da_tabela, page_obj.object_list, colunas),
+        'chave_tabela': chave_cache_pagina(edital, request.GET),
+        'tempo_cache_tabela': TEMPO_CACHE_TABELA,
         'page_obj': page_obj,
+        'total_filtrado': total_filtrado,
+        'querystring_filtros': querystring_sem_cursor(request.GET),
+        'opcoes_campos': opcoes['campos'],
+        'opcoes_cidades': opcoes['cidades'],
+        'opcoes_polo_origem': opcoes['polo_origem'],
     }
-    
-    return render(request, "detalhe_edital.html", context)
 
 
-def identificar_campos_filtro(inscritos):
-    campos_valores = defaultdict(set)
-    campos_texto = set()
-    campos_dropdown = set()
-    campos_polo = set()
-    todas_cidades = set()
-    valores_polo_origem = set()
+@login_required
+@usar_replica
+def estatisticas_edital(request, edital_id):
+    edital = get_object_or_404(Edital, pk=edital_id)
+
+    # As contagens são gravadas no esquema durante a importação: uma leitura, sem varrer os inscritos
+    schema = obter_schema(edital)
+    context = {
+        'edital': edital,
+        'total_inscritos': schema.total_linhas,
+        'grupos': estatisticas_do_schema(schema),
+        'atualizado_em': schema.atualizado_em,
+    }
+    return render(request, "estatisticas_edital.html", context)
+
+@login_required
+@usar_replica
+def busca_global(request):
+    form = BuscaInscritoForm(request.GET or None)
+    resultados = None
+
+    if form.is_valid():
+        resultados = []
+        for busca in buscar_em_todos_editais(form.cleaned_data["termo"], form.cleaned_data["tipo"]):
+            # O edital já veio com o esquema (select_related), usado para ler linhas compactas
+            busca.inscrito.edital = busca.edital
+            dados = busca.inscrito.dados
+            valor = dados.get(busca.campo, "")
+            # Link para o edital já filtrado pelo valor encontrado
+            url_edital = reverse("detalhe_edital", args=[busca.edital_id])
+            resultados.append({
+                'edital': busca.edital,
+                'campo': busca.campo,
+                'valor': valor,
+                # Primeira coluna de nome do inscrito, para identificar a pessoa em buscas por documento
+                'nome': next((v for c, v in dados.items() if c.strip().lower().startswith('nome')), ''),
+                'url': f"{url_edital}?{urlencode({f'texto_{busca.campo}': valor})}",
+            })
+
+    context = {
+        'form': form,
+        'resultados': resultados,
+        'limite_atingido': resultados is not None and len(resultados) >= LIMITE_RESULTADOS_GLOBAIS,
+    }
+    return render(request, "busca_global.html", context)
 
+
+def identificar_campos_filtro(inscritos):
+    catalogo = CatalogoCampos()
     for inscrito in inscritos:
-        if not isinstance(inscrito.dados_linha, dict):
-            continue
-            
-        for campo, valor in inscrito.dados_linha.items():
-            if not valor or not isinstance(valor, str) or len(valor) > 100:
-                continue
-            
-            if campo.strip().lower() == 'polo de origem':
-                valores_polo_origem.add(valor)
-                continue 
-
-            campo_lower = campo.lower()
-                
-            if any(keyword in campo_lower for keyword in CAMPOS_DADOS_PESSOAIS):
-                campos_texto.add(campo)
-            else:
-                if any(keyword in campo_lower for keyword in CAMPOS_POLO):
-                    campos_polo.add(campo)
-                    cidade = extrair_cidade_do_polo(valor)
-                    if cidade:
-                        todas_cidades.add(cidade.strip())
-                
-                campos_dropdown.add(campo)
-                campos_valores[campo].add(valor)
-    
-    cidades_disponiveis = sorted(list(todas_cidades))
-    
-    return {campo: sorted(list(valores)) for campo, valores in campos_valores.items()}, \
-           sorted(list(campos_texto)), \
-           sorted(list(campos_dropdown)), \
-           sorted(list(campos_polo)), \
-           cidades_disponiveis, \
-           sorted(list(valores_polo_origem))
+        catalogo.adicionar(inscrito.dados)
 
+    return {campo: sorted(list(valores)) for campo, valores in catalogo.valores_campos.items()}, \
+           sorted(list(catalogo.campos_texto)), \
+           sorted(list(catalogo.campos_dropdown)), \
+           sorted(list(catalogo.campos_polo)), \
+           sorted(list(catalogo.cidades_polo)), \
+           sorted(list(catalogo.valores_polo_origem))
 
-def extrair_cidade_do_polo(valor_polo):
-    padrao = r'[A-Z]+\s*-\s*(.+)'
-    match = re.search(padrao, valor_polo)
-    if match:
-        return match.group(1).strip()
-    return valor_polo
 
+def filtrar_inscritos(request, edital, schema=None):
+    inscritos = ImportedData.objects.filter(edital=edital).order_by('id')
 
-def filtrar_inscritos(request, edital):
-    inscritos = ImportedData.objects.filter(edital=edital)
-    
-    if not any(param.startswith(('filtro_', 'texto_', 'cidade_polo', 'polo_origem')) for param, v in request.GET.items() if v):
+    if not possui_filtros(request.GET):
         return inscritos
-    
-    ids_filtrados = []
-    
-    cidade_polo = request.GET.get('cidade_polo', '')
-    polo_origem_selecionado = request.GET.get('polo_origem', '')
-    
-    if cidade_polo:
-        cidade_polo_normalizada = remover_acentos(cidade_polo.lower())
-    
-    for inscrito in inscritos.iterator():
-        if not isinstance(inscrito.dados_linha, dict):
-            continue
-            
-        atende_todos_filtros = True
-        
-        # ===== CORREÇÃO APLICADA AQUI =====
-        # Lógica para aplicar o filtro de Polo de Origem de forma flexível
-        if polo_origem_selecionado:
-            polo_origem_encontrado_no_inscrito = False
-            for campo, valor in inscrito.dados_linha.items():
-                if campo.strip().lower() == 'polo de origem' and valor == polo_origem_selecionado:
-                    polo_origem_encontrado_no_inscrito = True
-                    break
-            if not polo_origem_encontrado_no_inscrito:
-                atende_todos_filtros = False
-        
-        if not atende_todos_filtros:
-            continue
-        
-        # Filtros dropdown
-        for param, valor in request.GET.items():
-            if param.startswith('filtro_') and valor:
-                campo = param[7:]
-                if campo not in inscrito.dados_linha or str(inscrito.dados_linha.get(campo)) != valor:
-                    atende_todos_filtros = False
-                    break
-        if not atende_todos_filtros: continue
-        
-        # Filtros de texto
-        for param, valor in request.GET.items():
-            if param.startswith('texto_') and valor:
-                campo = param[6:]
-                valor_campo_db = inscrito.dados_linha.get(campo)
-                if not valor_campo_db:
-                    atende_todos_filtros = False
-                    break
-                
-                valor_campo_normalizado = remover_acentos(str(valor_campo_db).lower())
-                valor_busca_normalizado = remover_acentos(str(valor).lower())
-                
-                if any(keyword in campo.lower() for keyword in CAMPOS_DOCUMENTO):
-                    valor_campo_normalizado = re.sub(r'[^a-zA-Z0-9]', '', valor_campo_normalizado)
-                    valor_busca_normalizado = re.sub(r'[^a-zA-Z0-9]', '', valor_busca_normalizado)
-                
-                if valor_busca_normalizado not in valor_campo_normalizado:
-                    atende_todos_filtros = False
-                    break
-        if not atende_todos_filtros: continue
-        
-        # Filtro de cidade do polo
-        if cidade_polo:
-            atende_filtro_cidade = False
-            for campo, valor in inscrito.dados_linha.items():
-                if any(keyword in campo.lower() for keyword in CAMPOS_POLO) and valor and campo.strip().lower() != 'polo de origem':
-                    cidade_extraida = extrair_cidade_do_polo(str(valor))
-                    cidade_extraida_normalizada = remover_acentos(cidade_extraida.lower()) if cidade_extraida else ''
-                    if cidade_extraida_normalizada and cidade_polo_normalizada in cidade_extraida_normalizada:
-                        atende_filtro_cidade = True
-                        break
-            if not atende_filtro_cidade:
-                atende_todos_filtros = False
-        
-        if atende_todos_filtros:
-            ids_filtrados.append(inscrito.id)
-    
-    return inscritos.filter(id__in=ids_filtrados)
\ No newline at end of file
+
+    if schema is None:
+        schema = obter_schema(edital)
+
+    # Os filtros viram condições SQL sobre dados_linha; só as linhas
+    # que atendem a todos eles saem do banco.
+    return aplicar_filtros(inscritos, request.GET, schema)
@@ -0,0 +1,88 @@
+"""
+Versões assíncronas das views mais pesadas, para rodar sob ASGI.
+
+Com `VIEWS_ASSINCRONAS = True` as URLs de `listar_editais`, `detalhe_edital`
+e `download_edital_csv` apontam para estas funções. Enquanto esperam o banco
+(ORM assíncrono: `aget`, `acount`, `aiterator`), elas liberam o loop de
+eventos, então um download longo ou uma busca filtrada não prendem o worker:
+poucos processos ASGI atendem muitos coordenadores ao mesmo tempo.
+
+O que ainda é só síncrono (o esquema montado na primeira visita e a consulta
+agrupada das facetas) roda em `sync_to_async`. Já o `render` é chamado
+direto: o contexto chega com tudo lido do banco (os usuários do edital vêm
+no select_related), então o template não faz consultas. Sob WSGI as
+versões síncronas de `views.py` continuam sendo as indicadas: lá uma
+resposta em streaming assíncrona seria lida inteira em memória antes do envio.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+
+from app_import_django.replicas import usar_replica
+
+from .exportacao import agerar_csv, alinhas_para_exportar, nome_arquivo_exportacao
+from .facetas import contar_facetas_com_cache
+from .filtros import possui_filtros
+from .models import Edital
+from .paginacao import PARAMETRO_ANTES, PARAMETRO_APOS, acontar_com_cache, apaginar_por_cursor, ler_cursor
+from .schema import obter_schema
+from .views import USUARIOS_EDITAL, consulta_editais, contexto_detalhe, contexto_listagem, filtrar_inscritos
+
+
+@login_required
+@usar_replica
+async def listar_editais(request):
+    editais, ordem, pagina = consulta_editais(request.GET)
+    editais = [edital async for edital in editais]
+    return render(request, "listar_editais.html", contexto_listagem(editais, ordem, pagina))
+
+
+@login_required
+@usar_replica
+async def download_edital_csv(request, edital_id):
+    edital = await aget_object_or_404(Edital, pk=edital_id)
+
+    schema = await sync_to_async(obter_schema)(edital)
+    inscritos_filtrados = filtrar_inscritos(request, edital, schema)
+
+    if not await inscritos_filtrados.aexists():
+        messages.error(request, "Não há dados para exportar com os filtros atuais.")
+        return redirect('detalhe_edital', edital_id=edital_id)
+
+    cabecalho = sorted(schema.colunas)
+    return StreamingHttpResponse(
+        agerar_csv(cabecalho, alinhas_para_exportar(inscritos_filtrados, schema)),
+        content_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=\"{nome_arquivo_exportacao(edital)}\""},
+    )
+
+
+@login_required
+@usar_replica
+async def detalhe_edital(request, edital_id):
+    edital = await aget_object_or_404(Edital.objects.select_related(*USUARIOS_EDITAL), pk=edital_id)
+
+    schema = await sync_to_async(obter_schema)(edital)
+
+    if schema.total_linhas == 0:
+        messages.warning(request, "Este edital não possui inscritos.")
+        return redirect("listar_editais")
+
+    inscritos = filtrar_inscritos(request, edital, schema)
+
+    page_obj = await apaginar_por_cursor(
+        inscritos,
+        apos=ler_cursor(request.GET.get(PARAMETRO_APOS)),
+        antes=ler_cursor(request.GET.get(PARAMETRO_ANTES)),
+    )
+    if possui_filtros(request.GET):
+        total_filtrado = await acontar_com_cache(edital, inscritos, request.GET)
+    else:
+        total_filtrado = schema.total_linhas
+
+    contagens = await sync_to_async(contar_facetas_com_cache)(edital, schema, inscritos, request.GET)
+
+    context = contexto_detalhe(request, edital, schema, page_obj, total_filtrado, contagens)
+    return render(request, "detalhe_edital.html", context)
@@ -0,0 +1,223 @@
+"""
+Métricas de desempenho por requisição.
+
+O `MetricasMiddleware` mede, para cada view, o tempo total, a quantidade e o
+tempo das consultas SQL, as linhas devolvidas pelo banco e o pico de memória
+do Python. Os valores vão no cabeçalho `Server-Timing` (visível na aba
+Network do navegador), ficam num histórico circular em memória, exibido em
+/metricas/ para a equipe, e as requisições acima de `METRICAS_LIMITE_LENTO_MS`
+geram uma linha de log em JSON.
+
+Nas respostas em streaming (download do CSV) o cabeçalho só pode conter o que
+aconteceu antes do primeiro byte; o histórico e o log recebem os totais
+quando o envio termina.
+
+O middleware funciona nos dois modos: sob ASGI ele é assíncrono, para não
+obrigar as views assíncronas a rodarem numa thread.
+"""
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+LIMITE_LENTO_MS = 1000
+
+TAMANHO_HISTORICO = 1000
+
+PERCENTIS = (50, 90, 95, 99)
+
+
+class Historico:
+    """
+    Últimas medições de todas as views, num buffer circular protegido por lock.
+    """
+
+    def __init__(self, tamanho):
+        self.medicoes = deque(maxlen=tamanho)
+        self.lock = threading.Lock()
+
+    def adicionar(self, medicao):
+        with self.lock:
+            self.medicoes.append(medicao)
+
+    def limpar(self):
+        with self.lock:
+            self.medicoes.clear()
+
+    def por_view(self):
+        with self.lock:
+            medicoes = list(self.medicoes)
+        agrupadas = defaultdict(list)
+        for medicao in medicoes:
+            agrupadas[medicao["view"]].append(medicao)
+        return dict(agrupadas)
+
+
+historico = Historico(getattr(settings, "METRICAS_TAMANHO_HISTORICO", TAMANHO_HISTORICO))
+
+
+def percentil(valores, p):
+    # Método "nearest rank": o menor valor com pelo menos p% dos valores abaixo ou iguais
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    posicao = max(0, -(-len(ordenados) * p // 100) - 1)
+    return ordenados[posicao]
+
+
+def resumo_por_view():
+    """
+    Percentis de tempo total, tempo de SQL, quantidade de consultas e pico de
+    memória de cada view, a partir do histórico.
+    """
+    resumo = []
+    for view, medicoes in sorted(historico.por_view().items()):
+        linha = {"view": view, "requisicoes": len(medicoes)}
+        for metrica in ("tempo_ms", "sql_ms", "consultas", "memoria_kb"):
+            valores = [medicao[metrica] for medicao in medicoes if medicao[metrica] is not None]
+            linha[metrica] = {f"p{p}": percentil(valores, p) for p in PERCENTIS}
+            linha[metrica]["max"] = max(valores) if valores else None
+        resumo.append(linha)
+    return resumo
+
+
+class MedicaoRequisicao:
+    """
+    Acumula as métricas de uma requisição. Usado como execute_wrapper de todas
+    as conexões do banco enquanto a requisição está em andamento.
+    """
+
+    def __init__(self, medir_memoria):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.sql = 0.0
+        self.linhas = 0
+        self.medir_memoria = medir_memoria and tracemalloc.is_tracing()
+        self.memoria_inicial = 0
+        if self.medir_memoria:
+            # O pico é do processo todo: com várias threads, inclui as outras requisições
+            tracemalloc.reset_peak()
+            self.memoria_inicial = tracemalloc.get_traced_memory()[0]
+        self.pilha = ExitStack()
+        for conexao in connections.all():
+            self.pilha.enter_context(conexao.execute_wrapper(self))
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - inicio
+            self.consultas += 1
+            # Cursores do lado do servidor (.iterator()) não informam as linhas aqui
+            rowcount = getattr(context["cursor"], "rowcount", -1)
+            if rowcount and rowcount > 0:
+                self.linhas += rowcount
+
+    def memoria_kb(self):
+        if not self.medir_memoria:
+            return None
+        return max(tracemalloc.get_traced_memory()[1] - self.memoria_inicial, 0) // 1024
+
+    def tempo_ms(self):
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def server_timing(self):
+        metricas = [
+            f"total;dur={self.tempo_ms():.1f}",
+            f'sql;dur={self.sql * 1000:.1f};desc="{self.consultas} consultas"',
+            f'linhas;desc="{self.linhas} linhas"',
+        ]
+        memoria = self.memoria_kb()
+        if memoria is not None:
+            metricas.append(f'memoria;desc="{memoria} KB"')
+        return ", ".join(metricas)
+
+    def finalizar(self, request, response):
+        self.pilha.close()
+        match = getattr(request, "resolver_match", None)
+        medicao = {
+            "view": match.view_name if match else "(sem view)",
+            "metodo": request.method,
+            "caminho": request.path,
+            "status": response.status_code,
+            "tempo_ms": round(self.tempo_ms(), 1),
+            "sql_ms": round(self.sql * 1000, 1),
+            "consultas": self.consultas,
+            "linhas": self.linhas,
+            "memoria_kb": self.memoria_kb(),
+        }
+        historico.adicionar(medicao)
+        if medicao["tempo_ms"] >= getattr(settings, "METRICAS_LIMITE_LENTO_MS", LIMITE_LENTO_MS):
+            logger.warning("requisicao_lenta %s", json.dumps(medicao, ensure_ascii=False))
+        return medicao
+
+
+class MetricasMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+        self.medir_memoria = getattr(settings, "METRICAS_MEMORIA", False)
+        if self.medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        medicao = MedicaoRequisicao(self.medir_memoria)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            medicao.pilha.close()
+            raise
+        return self.concluir(medicao, request, response)
+
+    async def __acall__(self, request):
+        # As conexões do banco são por thread: o ORM assíncrono executa as consultas na
+        # thread de sync_to_async desta requisição, então os wrappers são instalados lá
+        medicao = await sync_to_async(MedicaoRequisicao)(self.medir_memoria)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            medicao.pilha.close()
+            raise
+        return self.concluir(medicao, request, response)
+
+    def concluir(self, medicao, request, response):
+        response["Server-Timing"] = medicao.server_timing()
+        if response.streaming:
+            if response.is_async:
+                acompanhar = self.acompanhar_streaming_async
+            else:
+                acompanhar = self.acompanhar_streaming
+            response.streaming_content = acompanhar(response.streaming_content, medicao, request, response)
+        else:
+            medicao.finalizar(request, response)
+        return response
+
+    def acompanhar_streaming(self, conteudo, medicao, request, response):
+        try:
+            yield from conteudo
+        finally:
+            medicao.finalizar(request, response)
+
+    async def acompanhar_streaming_async(self, conteudo, medicao, request, response):
+        try:
+            async for parte in conteudo:
+                yield parte
+        finally:
+            medicao.finalizar(request, response)
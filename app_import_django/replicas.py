@@ -0,0 +1,167 @@
+"""
+Leituras na réplica do banco.
+
+As views somente leitura mais acessadas (listagem, detalhes, estatísticas,
+busca e download dos editais, e a API de inscritos) são marcadas com `@usar_replica`: as consultas
+feitas por elas, inclusive durante o envio de uma resposta em streaming, vão
+para o alias `BANCO_REPLICA` das configurações. O `RoteadorReplica`
+(DATABASE_ROUTERS) manda todas as escritas, e as leituras fora dessas views,
+para o 'default'. Com `BANCO_REPLICA = None` tudo continua no 'default'.
+
+A réplica pode estar alguns segundos atrás do primário. Para que quem acabou
+de gravar veja o que gravou, toda requisição que grava (POST, PUT, PATCH,
+DELETE) deixa no navegador o cookie `COOKIE_PRIMARIO`, que dura
+`BANCO_REPLICA_FIXACAO` segundos; enquanto ele existir, as views marcadas
+leem do primário. O mesmo vale para a importação em segundo plano: a página
+de status chama `fixar_no_primario` quando o job termina.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+
+COOKIE_PRIMARIO = "ler_do_primario"
+
+# Segundos em que o navegador que gravou algo continua lendo do primário
+FIXACAO = 15
+
+METODOS_SEGUROS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+# Alias das leituras da view em andamento (None: decide o Django, em geral o 'default')
+_banco_leitura = ContextVar("banco_leitura", default=None)
+
+_FIM = object()
+
+
+def banco_replica():
+    banco = getattr(settings, "BANCO_REPLICA", None)
+    return banco if banco in settings.DATABASES else None
+
+
+@contextmanager
+def ler_de(banco):
+    """
+    Manda para `banco` as leituras do ORM feitas dentro do bloco (None não muda nada).
+    """
+    token = _banco_leitura.set(banco)
+    try:
+        yield
+    finally:
+        _banco_leitura.reset(token)
+
+
+def fixado_no_primario(request):
+    return COOKIE_PRIMARIO in request.COOKIES
+
+
+def fixar_no_primario(response):
+    """
+    Faz o navegador ler do primário nos próximos `BANCO_REPLICA_FIXACAO` segundos.
+    """
+    if banco_replica() is not None:
+        response.set_cookie(
+            COOKIE_PRIMARIO, "1", max_age=getattr(settings, "BANCO_REPLICA_FIXACAO", FIXACAO),
+            httponly=True, samesite="Lax",
+        )
+    return response
+
+
+def banco_da_requisicao(request):
+    if fixado_no_primario(request):
+        return None
+    return banco_replica()
+
+
+def _iterar_em(banco, conteudo):
+    # Cada parte é gerada dentro do bloco, sem deixar o alias ativo entre uma parte e outra
+    iterador = iter(conteudo)
+    while True:
+        with ler_de(banco):
+            parte = next(iterador, _FIM)
+        if parte is _FIM:
+            return
+        yield parte
+
+
+async def _aiterar_em(banco, conteudo):
+    iterador = aiter(conteudo)
+    while True:
+        with ler_de(banco):
+            parte = await anext(iterador, _FIM)
+        if parte is _FIM:
+            return
+        yield parte
+
+
+def _streaming_em(banco, response):
+    # O conteúdo de uma resposta em streaming é consultado depois que a view retorna
+    if banco is not None and response.streaming:
+        iterar = _aiterar_em if response.is_async else _iterar_em
+        response.streaming_content = iterar(banco, response.streaming_content)
+    return response
+
+
+def usar_replica(view):
+    """
+    Marca uma view somente leitura (síncrona ou assíncrona) para ler da réplica.
+    Use abaixo do `login_required`, para a sessão e o usuário continuarem
+    vindo do primário.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def view_na_replica(request, *args, **kwargs):
+            banco = banco_da_requisicao(request)
+            with ler_de(banco):
+                response = await view(request, *args, **kwargs)
+            return _streaming_em(banco, response)
+    else:
+        @wraps(view)
+        def view_na_replica(request, *args, **kwargs):
+            banco = banco_da_requisicao(request)
+            with ler_de(banco):
+                response = view(request, *args, **kwargs)
+            return _streaming_em(banco, response)
+    return view_na_replica
+
+
+class RoteadorReplica:
+    """
+    Leituras dentro de `ler_de` (ver `usar_replica`) vão para a réplica;
+    todas as escritas vão para o 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _banco_leitura.get()
+
+    def db_for_write(self, model, **hints):
+        # Sem isso, um objeto lido da réplica seria gravado de volta nela
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        bancos = {DEFAULT_DB_ALIAS, banco_replica()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # A réplica recebe as migrações pela replicação do primário
+        if db == banco_replica():
+            return False
+        return None
+
+
+class FixacaoPrimarioMiddleware(MiddlewareMixin):
+    """
+    Fixa no primário, por `BANCO_REPLICA_FIXACAO` segundos, as leituras do
+    navegador que acabou de fazer uma requisição que grava.
+    """
+
+    def process_response(self, request, response):
+        if request.method not in METODOS_SEGUROS:
+            fixar_no_primario(response)
+        return response
@@ -37,11 +37,16 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'app_import_django',
     'app_import',
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista, para medir também o tempo dos demais middlewares
+    'app_import_django.metricas.MetricasMiddleware',
+    # Quem grava algo passa a ler do primário por BANCO_REPLICA_FIXACAO segundos
+    'app_import_django.replicas.FixacaoPrimarioMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,7 +61,7 @@ ROOT_URLCONF = 'app_import_django.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [BASE_DIR / 'app_import_django' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -74,6 +79,11 @@ WSGI_APPLICATION = 'app_import_django.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Pool de conexões do psycopg 3 (pacote psycopg-pool), por processo e por banco: as
+# requisições pegam uma conexão já aberta em vez de abrir uma nova a cada vez.
+# Exige CONN_MAX_AGE = 0 (o padrão); timeout é a espera, em segundos, por uma conexão livre.
+POOL_CONEXOES = {'min_size': 2, 'max_size': 10, 'timeout': 10}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -82,9 +92,31 @@ DATABASES = {
         'PASSWORD': '1234',
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+        'OPTIONS': {'pool': POOL_CONEXOES},
+    },
+    # Réplica de leitura (streaming replication do PostgreSQL). Aqui aponta para o mesmo
+    # banco; em produção, use o HOST/PORT da réplica e ative BANCO_REPLICA abaixo.
+    'replica': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': 'import_ufrpe',
+        'USER': 'postgres',
+        'PASSWORD': '1234',
+        'HOST': 'localhost',
+        'PORT': '5432',
+        'OPTIONS': {'pool': POOL_CONEXOES},
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+# Leituras na réplica (app_import_django/replicas.py): as views marcadas com @usar_replica
+# (listagem, detalhes, estatísticas, busca e download dos editais) leem do banco
+# BANCO_REPLICA; as escritas e as demais views usam sempre o 'default'. None desativa.
+DATABASE_ROUTERS = ['app_import_django.replicas.RoteadorReplica']
+BANCO_REPLICA = None
+# Segundos em que quem acabou de gravar algo (ex: um upload) continua lendo do
+# primário, para não ver a réplica ainda sem a sua alteração.
+BANCO_REPLICA_FIXACAO = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -122,6 +154,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Arquivos enviados (uploads aguardando importação em segundo plano)
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -129,3 +164,62 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'login'
+
+
+# Importação de editais
+# Forma de gravar as linhas importadas: 'copy' usa o COPY do PostgreSQL (psycopg 3)
+# e cai para bulk_create em outros bancos; 'orm' usa sempre bulk_create.
+IMPORTACAO_BACKEND = 'copy'
+# Se True (padrão), o upload apenas enfileira a importação, que é feita pelo comando
+# "python manage.py processar_importacoes": deixe ao menos um worker rodando, sem ele os
+# uploads ficam pendentes. False importa durante a própria requisição (desenvolvimento e testes).
+IMPORTACAO_EM_SEGUNDO_PLANO = True
+# Segundos sem sinal de vida do worker após os quais um job "processando" volta para a
+# fila (o worker morreu no meio da importação, que o banco já desfez).
+IMPORTACAO_TEMPO_SEM_BATIMENTO = 300
+# Coluna sugerida no upload para a substituição incremental de um edital existente
+# (ex: 'CPF', ou 'hash' para comparar a linha inteira); vazio apaga e reinsere tudo.
+IMPORTACAO_CHAVE_SUBSTITUICAO = ''
+# Se True, cada linha guarda só a lista de valores e o cabeçalho fica uma única vez
+# no esquema do edital (tabela menor); vale para as próximas importações.
+IMPORTACAO_FORMATO_COMPACTO = False
+
+# True ao servir o projeto por ASGI (asgi.py, ex: uvicorn): listagem, detalhes e
+# download dos editais passam a usar as views assíncronas de app_import/views_async.py.
+# Mantenha False sob WSGI, onde o download em streaming assíncrono seria lido
+# inteiro em memória antes de ser enviado.
+VIEWS_ASSINCRONAS = False
+
+# Cache das contagens de inscritos e das opções dos filtros de cada edital.
+# As chaves incluem a data da última modificação do edital, então uma nova
+# importação invalida as entradas antigas sem precisar limpar o cache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'app_import',
+    }
+}
+
+# Métricas de desempenho por requisição (app_import_django/metricas.py)
+# Requisições mais lentas que isso geram uma linha de log "requisicao_lenta".
+METRICAS_LIMITE_LENTO_MS = 1000
+# Quantidade de requisições guardadas para os percentis da página /metricas/.
+METRICAS_TAMANHO_HISTORICO = 1000
+# Mede o pico de memória com tracemalloc (deixa as requisições mais lentas).
+METRICAS_MEMORIA = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'app_import_django.metricas': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
@@ -17,8 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include # Import include
 
+from .views import painel_metricas
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metricas/', painel_metricas, name='painel_metricas'), # Desempenho das views (somente equipe)
     path('accounts/', include('django.contrib.auth.urls')), # Include default auth urls
     path('', include('app_import.urls')), # Include app_import urls
 ]
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.shortcuts import redirect, render
+
+from .metricas import LIMITE_LENTO_MS, PERCENTIS, historico, resumo_por_view
+
+
+# Página da equipe com os percentis de desempenho de cada view (ver metricas.py)
+@staff_member_required
+def painel_metricas(request):
+    if request.method == "POST":
+        historico.limpar()
+        return redirect("painel_metricas")
+
+    context = {
+        "resumo": resumo_por_view(),
+        "percentis": [f"p{p}" for p in PERCENTIS] + ["max"],
+        "limite_lento_ms": getattr(settings, "METRICAS_LIMITE_LENTO_MS", LIMITE_LENTO_MS),
+        "tamanho_historico": historico.medicoes.maxlen,
+    }
+    return render(request, "metricas.html", context)